@@ -0,0 +1,21 @@
+-- ============================================================================
+-- GraphRAG Node Ranking Migration
+-- Purpose: Support query-time ranking by precomputed node importance
+-- Date: 2026-10-18
+-- Issue: node_degree / pagerank / rank_score are maintained per tenant by the
+--        incremental centrality updater; listings and search sort and boost by them
+-- ============================================================================
+
+BEGIN;
+
+ALTER TABLE graph.nodes
+ADD COLUMN IF NOT EXISTS node_degree INTEGER DEFAULT 0,
+ADD COLUMN IF NOT EXISTS pagerank REAL,
+ADD COLUMN IF NOT EXISTS rank_score REAL;
+
+CREATE INDEX IF NOT EXISTS idx_nodes_rank_score ON graph.nodes(rank_score DESC NULLS LAST);
+CREATE INDEX IF NOT EXISTS idx_nodes_client_rank_score ON graph.nodes(client_id, rank_score DESC NULLS LAST);
+
+COMMENT ON COLUMN graph.nodes.rank_score IS 'Tenant-level importance in [0, 1] (degree and PageRank relative to the tenant maximum), maintained by the centrality updater';
+
+COMMIT;
@@ -0,0 +1,144 @@
+-- ============================================================================
+-- GraphRAG Tenant Analytics Migration
+-- Purpose: Materialized per-tenant graph analytics with change tracking
+-- Date: 2026-10-18
+-- Issue: Analytics were only computed per document and discarded; tenant-level
+--        results are now materialized and recomputed only when the tenant's
+--        graph changes
+-- ============================================================================
+
+BEGIN;
+
+-- 1. Change counter per tenant (client_id + optional case_id), bumped once per
+--    statement that touches graph.nodes or graph.edges for that tenant (node
+--    updates only when node_id, client_id or case_id change). The
+--    client-wide key (client_id || ':') covers every case of the client, so it
+--    is bumped for case-scoped rows as well.
+CREATE TABLE IF NOT EXISTS graph.tenant_change_counters (
+    tenant_key TEXT PRIMARY KEY,  -- client_id || ':' || COALESCE(case_id, '')
+    client_id TEXT NOT NULL,
+    case_id TEXT,
+    change_counter BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE OR REPLACE FUNCTION graph.bump_tenant_change_counters()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO graph.tenant_change_counters AS counters (tenant_key, client_id, case_id, change_counter, updated_at)
+    SELECT tenants.tenant_key, tenants.client_id, tenants.case_id, 1, NOW()
+    FROM (
+        SELECT
+            changed.client_id || ':' || COALESCE(changed.case_id::TEXT, '') AS tenant_key,
+            changed.client_id,
+            changed.case_id::TEXT AS case_id
+        FROM changed_rows AS changed
+        WHERE changed.client_id IS NOT NULL
+        UNION
+        SELECT
+            changed.client_id || ':' AS tenant_key,
+            changed.client_id,
+            NULL AS case_id
+        FROM changed_rows AS changed
+        WHERE changed.client_id IS NOT NULL
+    ) AS tenants
+    ON CONFLICT (tenant_key) DO UPDATE
+        SET change_counter = counters.change_counter + 1,
+            updated_at = NOW();
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Node updates only count when a row's identity or tenant changes; ranking and
+-- text columns (e.g. update_node_centrality writes) leave the analytics valid.
+-- A node moved between tenants bumps both its old and new tenant.
+CREATE OR REPLACE FUNCTION graph.bump_tenant_change_counters_on_node_update()
+RETURNS TRIGGER AS $$
+BEGIN
+    WITH moved_rows AS (
+        SELECT old_row.client_id AS old_client_id, old_row.case_id::TEXT AS old_case_id,
+               new_row.client_id AS new_client_id, new_row.case_id::TEXT AS new_case_id
+        FROM old_rows AS old_row
+        JOIN new_rows AS new_row ON new_row.id = old_row.id
+        WHERE (old_row.node_id, old_row.client_id, old_row.case_id)
+              IS DISTINCT FROM (new_row.node_id, new_row.client_id, new_row.case_id)
+    ),
+    moved AS (
+        SELECT old_client_id AS client_id, old_case_id AS case_id FROM moved_rows
+        UNION
+        SELECT new_client_id AS client_id, new_case_id AS case_id FROM moved_rows
+    )
+    INSERT INTO graph.tenant_change_counters AS counters (tenant_key, client_id, case_id, change_counter, updated_at)
+    SELECT tenants.tenant_key, tenants.client_id, tenants.case_id, 1, NOW()
+    FROM (
+        SELECT
+            changed.client_id || ':' || COALESCE(changed.case_id, '') AS tenant_key,
+            changed.client_id,
+            changed.case_id
+        FROM moved AS changed
+        WHERE changed.client_id IS NOT NULL
+        UNION
+        SELECT
+            changed.client_id || ':' AS tenant_key,
+            changed.client_id,
+            NULL AS case_id
+        FROM moved AS changed
+        WHERE changed.client_id IS NOT NULL
+    ) AS tenants
+    ON CONFLICT (tenant_key) DO UPDATE
+        SET change_counter = counters.change_counter + 1,
+            updated_at = NOW();
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Statement-level triggers with transition tables: one bump per tenant per statement
+DROP TRIGGER IF EXISTS nodes_tenant_change_insert ON graph.nodes;
+CREATE TRIGGER nodes_tenant_change_insert AFTER INSERT ON graph.nodes
+    REFERENCING NEW TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION graph.bump_tenant_change_counters();
+
+DROP TRIGGER IF EXISTS nodes_tenant_change_update ON graph.nodes;
+CREATE TRIGGER nodes_tenant_change_update AFTER UPDATE ON graph.nodes
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION graph.bump_tenant_change_counters_on_node_update();
+
+DROP TRIGGER IF EXISTS nodes_tenant_change_delete ON graph.nodes;
+CREATE TRIGGER nodes_tenant_change_delete AFTER DELETE ON graph.nodes
+    REFERENCING OLD TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION graph.bump_tenant_change_counters();
+
+DROP TRIGGER IF EXISTS edges_tenant_change_insert ON graph.edges;
+CREATE TRIGGER edges_tenant_change_insert AFTER INSERT ON graph.edges
+    REFERENCING NEW TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION graph.bump_tenant_change_counters();
+
+DROP TRIGGER IF EXISTS edges_tenant_change_update ON graph.edges;
+CREATE TRIGGER edges_tenant_change_update AFTER UPDATE ON graph.edges
+    REFERENCING NEW TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION graph.bump_tenant_change_counters();
+
+DROP TRIGGER IF EXISTS edges_tenant_change_delete ON graph.edges;
+CREATE TRIGGER edges_tenant_change_delete AFTER DELETE ON graph.edges
+    REFERENCING OLD TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION graph.bump_tenant_change_counters();
+
+-- 2. Materialized analytics, one row per tenant
+CREATE TABLE IF NOT EXISTS graph.tenant_analytics (
+    tenant_key TEXT PRIMARY KEY,
+    client_id TEXT NOT NULL,
+    case_id TEXT,
+    tier TEXT NOT NULL,
+    analytics JSONB NOT NULL DEFAULT '{}',
+    node_count INTEGER DEFAULT 0,
+    edge_count INTEGER DEFAULT 0,
+    source_change_counter BIGINT NOT NULL DEFAULT 0,  -- tenant change_counter the analytics reflect
+    computation_seconds REAL,
+    computed_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_tenant_analytics_client ON graph.tenant_analytics(client_id);
+
+COMMENT ON TABLE graph.tenant_analytics IS 'Tenant-level graph analytics materialized by the tenant analytics job';
+
+COMMIT;
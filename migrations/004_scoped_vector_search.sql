@@ -0,0 +1,81 @@
+-- ============================================================================
+-- GraphRAG Scoped Vector Search Migration
+-- Purpose: Vector similarity search over graph nodes and community summaries
+-- Date: 2026-10-18
+-- Issue: search_scope=nodes / communities / all fell back to chunk search;
+--        these RPCs mirror search_similar_chunks for the other two scopes
+-- ============================================================================
+
+BEGIN;
+
+-- 1. Entity (node) similarity search
+CREATE OR REPLACE FUNCTION public.search_similar_nodes(
+    query_embedding vector,
+    filter_client_id TEXT,
+    match_threshold FLOAT DEFAULT 0.7,
+    match_count INT DEFAULT 10
+)
+RETURNS TABLE (
+    node_id TEXT,
+    name TEXT,
+    type TEXT,
+    description TEXT,
+    rank_score REAL,
+    similarity FLOAT,
+    created_at TIMESTAMP WITH TIME ZONE
+) AS $$
+    SELECT
+        n.node_id,
+        n.name,
+        n.type,
+        n.description,
+        n.rank_score,
+        1 - (n.embeddings <=> query_embedding) AS similarity,
+        n.created_at
+    FROM graph.nodes AS n
+    WHERE n.client_id = filter_client_id
+      AND n.embeddings IS NOT NULL
+      AND 1 - (n.embeddings <=> query_embedding) >= match_threshold
+    ORDER BY n.embeddings <=> query_embedding
+    LIMIT match_count;
+$$ LANGUAGE sql STABLE;
+
+-- 2. Community summary similarity search
+CREATE OR REPLACE FUNCTION public.search_similar_communities(
+    query_embedding vector,
+    filter_client_id TEXT,
+    match_threshold FLOAT DEFAULT 0.7,
+    match_count INT DEFAULT 10
+)
+RETURNS TABLE (
+    community_id TEXT,
+    title TEXT,
+    summary TEXT,
+    level INTEGER,
+    size INTEGER,
+    similarity FLOAT,
+    created_at TIMESTAMP WITH TIME ZONE
+) AS $$
+    SELECT
+        c.community_id,
+        c.title,
+        c.summary,
+        c.level,
+        c.size,
+        1 - (c.embeddings <=> query_embedding) AS similarity,
+        c.created_at
+    FROM graph.communities AS c
+    WHERE c.client_id = filter_client_id
+      AND c.embeddings IS NOT NULL
+      AND 1 - (c.embeddings <=> query_embedding) >= match_threshold
+    ORDER BY c.embeddings <=> query_embedding
+    LIMIT match_count;
+$$ LANGUAGE sql STABLE;
+
+CREATE INDEX IF NOT EXISTS idx_nodes_client_id ON graph.nodes(client_id);
+CREATE INDEX IF NOT EXISTS idx_communities_client_id ON graph.communities(client_id);
+
+COMMENT ON FUNCTION public.search_similar_nodes IS 'Cosine similarity search over graph.nodes embeddings for one client';
+COMMENT ON FUNCTION public.search_similar_communities IS 'Cosine similarity search over graph.communities summary embeddings for one client';
+
+COMMIT;
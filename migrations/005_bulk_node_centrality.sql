@@ -0,0 +1,34 @@
+-- ============================================================================
+-- GraphRAG Bulk Node Centrality Migration
+-- Purpose: Write tenant-level degree / PageRank / rank_score for many nodes in one call
+-- Date: 2026-10-18
+-- Issue: the incremental centrality updater sent one UPDATE per changed node;
+--        a partial upsert is not possible because name/type are NOT NULL
+-- ============================================================================
+
+BEGIN;
+
+CREATE OR REPLACE FUNCTION public.update_node_centrality(
+    filter_client_id TEXT,
+    updates JSONB
+)
+RETURNS INTEGER AS $$
+DECLARE
+    updated_count INTEGER;
+BEGIN
+    UPDATE graph.nodes AS n
+    SET node_degree = u.node_degree,
+        pagerank = u.pagerank,
+        rank_score = u.rank_score
+    FROM jsonb_to_recordset(updates) AS u(node_id TEXT, node_degree INTEGER, pagerank REAL, rank_score REAL)
+    WHERE n.node_id = u.node_id
+      AND n.client_id = filter_client_id;
+
+    GET DIAGNOSTICS updated_count = ROW_COUNT;
+    RETURN updated_count;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON FUNCTION public.update_node_centrality IS 'Bulk-update one client''s node_degree, pagerank and rank_score from a JSON array of {node_id, node_degree, pagerank, rank_score}';
+
+COMMIT;
@@ -0,0 +1,60 @@
+-- ============================================================================
+-- GraphRAG Local Entity Search Migration
+-- Purpose: Entity similarity search scoped to one community for local search
+-- Date: 2026-10-18
+-- Issue: local search passed the community id to local_search as entity_id and
+--        its rows carried no node ids, so hits could not seed graph expansion
+-- ============================================================================
+
+BEGIN;
+
+CREATE OR REPLACE FUNCTION public.search_local_entities(
+    query_embedding vector,
+    filter_client_id TEXT,
+    filter_community_id TEXT DEFAULT NULL,
+    match_count INT DEFAULT 10
+)
+RETURNS TABLE (
+    node_id TEXT,
+    name TEXT,
+    type TEXT,
+    description TEXT,
+    community_id TEXT,
+    rank_score REAL,
+    relationship_count INTEGER,
+    similarity FLOAT,
+    created_at TIMESTAMP WITH TIME ZONE
+) AS $$
+    SELECT
+        n.node_id,
+        n.name,
+        n.type,
+        n.description,
+        m.community_id,
+        n.rank_score,
+        n.node_degree AS relationship_count,
+        1 - (n.embeddings <=> query_embedding) AS similarity,
+        n.created_at
+    FROM graph.nodes AS n
+    -- Finest community the node belongs to (or the requested one)
+    LEFT JOIN LATERAL (
+        SELECT nc.community_id
+        FROM graph.node_communities AS nc
+        JOIN graph.communities AS c ON c.community_id = nc.community_id
+        WHERE nc.node_id = n.node_id
+          AND (filter_community_id IS NULL OR nc.community_id = filter_community_id)
+        ORDER BY c.level
+        LIMIT 1
+    ) AS m ON TRUE
+    WHERE n.client_id = filter_client_id
+      AND n.embeddings IS NOT NULL
+      AND (filter_community_id IS NULL OR m.community_id IS NOT NULL)
+    ORDER BY n.embeddings <=> query_embedding
+    LIMIT match_count;
+$$ LANGUAGE sql STABLE;
+
+CREATE INDEX IF NOT EXISTS idx_node_communities_node_id ON graph.node_communities(node_id);
+
+COMMENT ON FUNCTION public.search_local_entities IS 'Cosine similarity search over one client''s entities, optionally restricted to the members of one community';
+
+COMMIT;
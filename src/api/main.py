@@ -15,6 +15,10 @@ from ..core.config import get_settings
 from ..core.graph_constructor import GraphConstructor
 from ..core.vector_search_service import VectorSearchService
 from ..core.rag_orchestrator import RAGOrchestrator
+from ..core.case_community_job import CaseCommunityJobRunner
+from ..core.incremental_centrality import TenantCentralityUpdater
+from ..core.tenant_analytics_job import TenantAnalyticsJobRunner
+from ..core.worker_pool import shutdown_process_pool
 from ..clients.supabase_client import SupabaseClient
 from .routes import graph, health, nodes, edges, communities, search, entity
 
@@ -67,6 +71,22 @@ async def lifespan(app: FastAPI):
         app.state.rag_orchestrator = rag_orchestrator
         app.state.supabase_client = supabase_client
         app.state.settings = settings
+        app.state.case_community_jobs = CaseCommunityJobRunner(
+            settings,
+            graph_constructor.supabase_client,
+            graph_constructor.community_detector
+        )
+        app.state.case_community_jobs.search_service = vector_search_service
+        app.state.tenant_centrality = TenantCentralityUpdater(
+            settings,
+            graph_constructor.supabase_client
+        )
+        graph_constructor.centrality_updater = app.state.tenant_centrality
+        app.state.tenant_analytics_jobs = TenantAnalyticsJobRunner(
+            settings,
+            graph_constructor.supabase_client
+        )
+        app.state.tenant_analytics_jobs.start_scheduler()
         
         print("✅ GraphRAG Service (with Vector Search & RAG) started successfully")
         
@@ -80,13 +100,15 @@ async def lifespan(app: FastAPI):
     print("🛑 Shutting down GraphRAG Service...")
     
     try:
+        if getattr(app.state, "tenant_analytics_jobs", None):
+            await app.state.tenant_analytics_jobs.stop_scheduler()
+        
         if rag_orchestrator:
             # RAG orchestrator doesn't need explicit cleanup currently
             pass
         
         if vector_search_service:
-            # Vector search service doesn't need explicit cleanup currently
-            pass
+            await vector_search_service.close()
         
         if graph_constructor:
             await graph_constructor.close()
@@ -94,6 +116,8 @@ async def lifespan(app: FastAPI):
         if supabase_client:
             await supabase_client.close()
         
+        shutdown_process_pool()
+        
         print("✅ GraphRAG Service shutdown complete")
     except Exception as e:
         print(f"⚠️ Shutdown error: {str(e)}")
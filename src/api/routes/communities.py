@@ -8,10 +8,23 @@ from typing import Dict, Any, List, Optional
 from datetime import datetime
 import uuid
 
+from ...models.requests import CaseCommunityDetectionRequest
 
 router = APIRouter()
 
 
+def _invalidate_search_cache(req: Request, *communities: Optional[Dict[str, Any]]) -> None:
+    """Drop cached vector search results for the tenants owning changed communities."""
+    search_service = getattr(req.app.state, "vector_search_service", None)
+    if search_service:
+        client_ids = {
+            community.get("client_id") or (community.get("metadata") or {}).get("client_id")
+            for community in communities if community
+        }
+        for client_id in client_ids - {None}:
+            search_service.invalidate_client(client_id)
+
+
 @router.get("/")
 async def list_communities(
     req: Request,
@@ -81,6 +94,52 @@ async def list_communities(
         raise HTTPException(status_code=500, detail=f"Failed to list communities: {str(e)}")
 
 
+@router.post("/case-detection", status_code=202)
+async def start_case_community_detection(
+    req: Request,
+    request: CaseCommunityDetectionRequest
+) -> Dict[str, Any]:
+    """
+    Start case-wide community detection as a background job.
+    
+    Streams every stored node and edge for the client/case, runs
+    hierarchical Leiden over the whole graph and replaces the case's
+    communities and memberships. Poll the returned job_id for progress.
+    """
+    try:
+        job_runner = req.app.state.case_community_jobs
+        job = job_runner.submit(
+            client_id=request.client_id,
+            case_id=request.case_id,
+            resolution=request.leiden_resolution
+        )
+        
+        return {
+            "success": True,
+            "job": job,
+            "message": f"Case community detection job {job['job_id']} is {job['status']}"
+        }
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to start case community detection: {str(e)}")
+
+
+@router.get("/case-detection/{job_id}")
+async def get_case_community_detection(
+    req: Request,
+    job_id: str
+) -> Dict[str, Any]:
+    """Get status and results of a case-wide community detection job."""
+    job = req.app.state.case_community_jobs.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    
+    return {
+        "success": True,
+        "job": job
+    }
+
+
 @router.get("/{community_id}")
 async def get_community(
     req: Request,
@@ -205,6 +264,7 @@ async def create_community(
                     memberships,
                     admin_operation=True
                 )
+        _invalidate_search_cache(req, community_data)
         
         return {
             "success": True,
@@ -253,6 +313,7 @@ async def update_community(
             {"community_id": community_id},
             admin_operation=True
         )
+        _invalidate_search_cache(req, existing[0], updates)
         
         return {
             "success": True,
@@ -309,6 +370,7 @@ async def delete_community(
             {"community_id": community_id},
             admin_operation=True
         )
+        _invalidate_search_cache(req, existing[0])
         
         return {
             "success": True,
@@ -387,6 +449,7 @@ async def add_community_members(
             {"community_id": community_id},
             admin_operation=True
         )
+        _invalidate_search_cache(req, existing[0])
         
         return {
             "success": True,
@@ -449,6 +512,7 @@ async def remove_community_members(
             {"community_id": community_id},
             admin_operation=True
         )
+        _invalidate_search_cache(req, existing[0])
         
         return {
             "success": True,
@@ -561,6 +625,7 @@ async def recalculate_community_metrics(
             {"community_id": community_id},
             admin_operation=True
         )
+        _invalidate_search_cache(req, community)
         
         return {
             "success": True,
@@ -11,6 +11,19 @@ from datetime import datetime
 router = APIRouter()
 
 
+def _update_tenant_centrality(req: Request,
+                              inserted_rows: List[Dict[str, Any]] = (),
+                              deleted_rows: List[Dict[str, Any]] = ()) -> None:
+    """Hand edge changes to the incremental degree/PageRank updater, if running, and drop cached adjacency."""
+    updater = getattr(req.app.state, "tenant_centrality", None)
+    if updater:
+        updater.submit_rows(inserted_rows, deleted_rows)
+    search_service = getattr(req.app.state, "vector_search_service", None)
+    if search_service:
+        for client_id in {row.get("client_id") for row in [*inserted_rows, *deleted_rows]}:
+            search_service.invalidate_edges(client_id)
+
+
 @router.get("/")
 async def list_edges(
     req: Request,
@@ -190,6 +203,7 @@ async def create_edge(
             edge_data,
             admin_operation=True
         )
+        _update_tenant_centrality(req, inserted_rows=[edge_data])
         
         return {
             "success": True,
@@ -240,6 +254,12 @@ async def update_edge(
             {"id": edge_id},
             admin_operation=True
         )
+        if "weight" in updates or "confidence_score" in updates:
+            _update_tenant_centrality(
+                req,
+                inserted_rows=[{**existing[0], **updates}],
+                deleted_rows=[existing[0]]
+            )
         
         return {
             "success": True,
@@ -283,6 +303,7 @@ async def delete_edge(
             {"id": edge_id},
             admin_operation=True
         )
+        _update_tenant_centrality(req, deleted_rows=[existing[0]])
         
         return {
             "success": True,
@@ -350,6 +371,7 @@ async def batch_create_edges(
             edges,
             admin_operation=True
         )
+        _update_tenant_centrality(req, inserted_rows=result or edges)
         
         return {
             "success": True,
@@ -254,6 +254,13 @@ async def merge_entities(
         return {**canonical_node, **update_data}
 
 
+def _invalidate_search_cache(req: Request, client_id: Optional[str], node: Optional[Dict[str, Any]] = None) -> None:
+    """Drop cached vector search results for a tenant whose nodes changed and sync its vector index."""
+    search_service = getattr(req.app.state, "vector_search_service", None)
+    if search_service:
+        search_service.invalidate_client(client_id, nodes=[node] if node else None)
+
+
 @router.post("/upsert", response_model=EntityUpsertResponse)
 async def upsert_entity(
     req: Request,
@@ -333,6 +340,7 @@ async def upsert_entity(
             )
 
             updated_node = result[0] if result and len(result) > 0 else {**existing_node, **update_data}
+            _invalidate_search_cache(req, entity.client_id, updated_node)
 
             processing_time = (time.time() - start_time) * 1000
 
@@ -379,6 +387,7 @@ async def upsert_entity(
 
             merged_metadata = merged_node.get("metadata", {})
             merged_doc_ids = merged_metadata.get("document_ids", [])
+            _invalidate_search_cache(req, entity.client_id, merged_node)
 
             processing_time = (time.time() - start_time) * 1000
 
@@ -430,6 +439,7 @@ async def upsert_entity(
         )
 
         created_node = result[0] if result and len(result) > 0 else new_node_data
+        _invalidate_search_cache(req, entity.client_id, created_node)
 
         processing_time = (time.time() - start_time) * 1000
 
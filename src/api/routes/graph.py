@@ -3,13 +3,14 @@ Graph API Routes
 Endpoints for knowledge graph construction and querying
 """
 
-from fastapi import APIRouter, HTTPException, Depends, Request
-from typing import Dict, Any
+from fastapi import APIRouter, HTTPException, Depends, Request, Query
+from typing import Dict, Any, Optional
 
 from ...models.requests import (
     CreateGraphRequest,
     UpdateGraphRequest,
-    QueryGraphRequest
+    QueryGraphRequest,
+    TenantAnalyticsRequest
 )
 from ...models.responses import (
     CreateGraphResponse,
@@ -61,6 +62,12 @@ async def create_knowledge_graph(
             case_id=request.case_id
         )
         
+        # Nodes and chunks for this tenant changed; cached searches are stale
+        search_service = getattr(req.app.state, "vector_search_service", None)
+        if search_service:
+            search_service.invalidate_edges(request.client_id)
+            search_service.invalidate_vector_index(request.client_id)
+        
         # Check if the operation was successful
         if not result.get("success", False):
             # If graph construction failed, raise an HTTP exception
@@ -211,6 +218,83 @@ async def get_graph_statistics(req: Request) -> Dict[str, Any]:
         )
 
 
+@router.post("/tenant-analytics", status_code=202)
+async def start_tenant_analytics(
+    req: Request,
+    request: TenantAnalyticsRequest
+) -> Dict[str, Any]:
+    """
+    Materialize analytics for a whole client or case as a background job.
+    
+    The job is a no-op if the tenant graph has not changed since the last
+    materialization (unless force is set). Poll the returned job_id, then
+    read the results from GET /tenant-analytics.
+    """
+    try:
+        job = req.app.state.tenant_analytics_jobs.submit(
+            client_id=request.client_id,
+            case_id=request.case_id,
+            tier=request.tier,
+            force=request.force
+        )
+        
+        return {
+            "success": True,
+            "job": job,
+            "message": f"Tenant analytics job {job['job_id']} is {job['status']}"
+        }
+        
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to start tenant analytics: {str(e)}")
+
+
+@router.get("/tenant-analytics")
+async def get_tenant_analytics(
+    req: Request,
+    client_id: str = Query(..., description="Client identifier"),
+    case_id: Optional[str] = Query(None, description="Case identifier")
+) -> Dict[str, Any]:
+    """
+    Get the materialized analytics for a client or case.
+    
+    Served from graph.tenant_analytics; is_stale reports whether the tenant
+    graph changed since computed_at.
+    """
+    try:
+        materialized = await req.app.state.tenant_analytics_jobs.get_materialized(client_id, case_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get tenant analytics: {str(e)}")
+    
+    if not materialized:
+        raise HTTPException(
+            status_code=404,
+            detail=f"No analytics materialized for client {client_id}" + (f", case {case_id}" if case_id else "")
+        )
+    
+    return {
+        "success": True,
+        "tenant_analytics": materialized
+    }
+
+
+@router.get("/tenant-analytics/jobs/{job_id}")
+async def get_tenant_analytics_job(
+    req: Request,
+    job_id: str
+) -> Dict[str, Any]:
+    """Get status and results of a tenant analytics job."""
+    job = req.app.state.tenant_analytics_jobs.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    
+    return {
+        "success": True,
+        "job": job
+    }
+
+
 @router.delete("/clear")
 async def clear_graph_data(
     req: Request,
@@ -243,6 +327,18 @@ async def clear_graph_data(
                         {"id": node["id"]},
                         admin_operation=True
                     )
+                
+                # Deleted nodes (and their edges) must leave cached results, vector indexes and adjacency
+                search_service = getattr(req.app.state, "vector_search_service", None)
+                if search_service:
+                    for client_id in {node.get("client_id") for node in nodes_to_delete}:
+                        search_service.invalidate_client(
+                            client_id,
+                            deleted_node_ids=[
+                                node["node_id"] for node in nodes_to_delete
+                                if node.get("client_id") == client_id and node.get("node_id")
+                            ]
+                        )
             
             # Delete edges related to document
             # This would need similar logic to find edges by document
@@ -13,6 +13,21 @@ from ...models.requests import EntityData
 
 router = APIRouter()
 
+# Precomputed ranking columns written during graph construction
+RANKING_COLUMNS = ("rank_score", "pagerank", "node_degree")
+
+
+def _invalidate_search_cache(req: Request, client_ids, nodes=None, deleted_node_ids=None) -> None:
+    """Drop cached vector search results for tenants whose nodes changed and sync their vector indexes."""
+    search_service = getattr(req.app.state, "vector_search_service", None)
+    if search_service:
+        for client_id in set(client_ids):
+            search_service.invalidate_client(
+                client_id,
+                nodes=[node for node in nodes or [] if node.get("client_id") == client_id],
+                deleted_node_ids=deleted_node_ids
+            )
+
 
 @router.get("/")
 async def list_nodes(
@@ -21,6 +36,8 @@ async def list_nodes(
     case_id: Optional[str] = Query(None, description="Filter by case ID"),
     node_type: Optional[str] = Query(None, description="Filter by node type"),
     entity_type: Optional[str] = Query(None, description="Filter by entity type"),
+    sort_by: Optional[str] = Query(None, description="Sort descending by rank_score, pagerank or node_degree"),
+    min_rank_score: Optional[float] = Query(None, ge=0.0, le=1.0, description="Minimum rank_score"),
     limit: int = Query(100, ge=1, le=1000),
     offset: int = Query(0, ge=0)
 ) -> Dict[str, Any]:
@@ -28,9 +45,16 @@ async def list_nodes(
     List nodes with optional filtering.
     
     Supports tenant isolation and type filtering.
+    Can sort by the precomputed ranking columns (most important first).
     Returns paginated results.
     """
     try:
+        if sort_by and sort_by not in RANKING_COLUMNS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"sort_by must be one of: {', '.join(RANKING_COLUMNS)}"
+            )
+        
         supabase_client = req.app.state.graph_constructor.supabase_client
         
         # Build filters
@@ -43,13 +67,24 @@ async def list_nodes(
             filters["node_type"] = node_type
             
         # Query nodes
-        nodes = await supabase_client.get(
-            "graph.nodes",
-            filters=filters,
-            limit=limit,
-            offset=offset,
-            admin_operation=True
-        )
+        if sort_by or min_rank_score is not None:
+            query = supabase_client.schema("graph", admin_operation=True).table("nodes").select("*")
+            for column, value in filters.items():
+                query = query.eq(column, value)
+            if min_rank_score is not None:
+                query = query.gte("rank_score", min_rank_score)
+            if sort_by:
+                query = query.order(sort_by, desc=True)
+            response = await query.range(offset, offset + limit - 1).execute()
+            nodes = response.data
+        else:
+            nodes = await supabase_client.get(
+                "graph.nodes",
+                filters=filters,
+                limit=limit,
+                offset=offset,
+                admin_operation=True
+            )
         
         # Filter by entity_type if specified (stored in attributes)
         if entity_type and nodes:
@@ -66,6 +101,8 @@ async def list_nodes(
             }
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to list nodes: {str(e)}")
 
@@ -169,6 +206,7 @@ async def create_node(
             node_data,
             admin_operation=True
         )
+        _invalidate_search_cache(req, [node_data.get("client_id")], nodes=[node_data])
         
         return {
             "success": True,
@@ -216,6 +254,7 @@ async def update_node(
             {"node_id": node_id},
             admin_operation=True
         )
+        _invalidate_search_cache(req, [existing[0].get("client_id")], nodes=[{**existing[0], **updates}])
         
         return {
             "success": True,
@@ -287,6 +326,7 @@ async def delete_node(
             {"node_id": node_id},
             admin_operation=True
         )
+        _invalidate_search_cache(req, [existing[0].get("client_id")], deleted_node_ids=[node_id])
         
         return {
             "success": True,
@@ -331,6 +371,7 @@ async def batch_create_nodes(
             nodes,
             admin_operation=True
         )
+        _invalidate_search_cache(req, [node.get("client_id") for node in nodes], nodes=nodes)
         
         return {
             "success": True,
@@ -15,6 +15,7 @@ from ...core.vector_search_service import (
     VectorSearchService, SearchQuery, SearchType, SearchScope, 
     SearchResult, GraphRAGSearchResult
 )
+from ...core.search_cache import SearchResultCache
 from ...core.rag_orchestrator import (
     RAGOrchestrator, RAGQuery, RAGMode, RAGResult, QueryIntent
 )
@@ -37,6 +38,9 @@ class VectorSearchRequest(BaseModel):
     filters: Optional[Dict[str, Any]] = Field(None, description="Additional search filters")
     rerank: bool = Field(default=True, description="Apply reranking to results")
     alpha: float = Field(default=0.5, ge=0.0, le=1.0, description="Hybrid search weight (semantic vs keyword)")
+    importance_boost: float = Field(default=0.0, ge=0.0, le=5.0, description="Boost node results by precomputed rank_score")
+    scope_weights: Optional[Dict[str, float]] = Field(None, description="Fusion weights for search_scope=all (nodes, chunks, communities)")
+    expand_hops: Optional[int] = Field(None, ge=0, le=2, description="Graph expansion depth around top entity hits (default: 1 for local search, else 0)")
 
     @validator("search_type")
     def validate_search_type(cls, v):
@@ -52,6 +56,25 @@ class VectorSearchRequest(BaseModel):
             raise ValueError(f"Invalid search scope. Must be one of: {valid_scopes}")
         return v
 
+    @validator("scope_weights")
+    def validate_scope_weights(cls, v):
+        if v is not None:
+            valid_scopes = ["nodes", "chunks", "communities"]
+            for scope, weight in v.items():
+                if scope not in valid_scopes:
+                    raise ValueError(f"Invalid scope weight '{scope}'. Must be one of: {valid_scopes}")
+                if weight < 0:
+                    raise ValueError("Scope weights must be non-negative")
+            if set(v) == set(valid_scopes) and not any(v.values()):
+                raise ValueError("At least one scope weight must be positive")
+        return v
+
+
+class BatchVectorSearchRequest(BaseModel):
+    """Batch vector search request model."""
+    queries: List[VectorSearchRequest] = Field(..., min_items=1, description="Searches to execute")
+    max_concurrency: Optional[int] = Field(None, ge=1, le=32, description="Searches executed concurrently")
+
 
 class RAGQueryRequest(BaseModel):
     """RAG query request model."""
@@ -105,6 +128,24 @@ class GraphRAGSearchResponse(BaseModel):
     reasoning_chain: Optional[List[str]] = None
     quality_score: float
     search_time_ms: float
+    expanded_context: Optional[Dict[str, Any]] = None
+
+
+class BatchSearchItem(BaseModel):
+    """Outcome of one query in a batch search."""
+    index: int
+    success: bool
+    result: Optional[GraphRAGSearchResponse] = None
+    error: Optional[str] = None
+
+
+class BatchVectorSearchResponse(BaseModel):
+    """Batch vector search response model."""
+    results: List[BatchSearchItem]
+    total_queries: int
+    unique_queries: int
+    failed_queries: int
+    search_time_ms: float
 
 
 class RAGResponse(BaseModel):
@@ -127,6 +168,54 @@ class RAGResponse(BaseModel):
     created_at: datetime
 
 
+def _build_search_query(search_request: VectorSearchRequest) -> SearchQuery:
+    """Convert a request to the internal query format."""
+    return SearchQuery(
+        query_text=search_request.query_text,
+        client_id=search_request.client_id,
+        search_type=SearchType(search_request.search_type),
+        search_scope=SearchScope(search_request.search_scope),
+        limit=search_request.limit,
+        similarity_threshold=search_request.similarity_threshold,
+        include_metadata=search_request.include_metadata,
+        filters=search_request.filters,
+        rerank=search_request.rerank,
+        alpha=search_request.alpha,
+        importance_boost=search_request.importance_boost,
+        scope_weights=search_request.scope_weights,
+        expand_hops=search_request.expand_hops
+    )
+
+
+def _build_search_response(result: GraphRAGSearchResult) -> GraphRAGSearchResponse:
+    """Convert a search result to the response format."""
+    response_results = [
+        SearchResultResponse(
+            id=r.id,
+            content=r.content,
+            score=r.score,
+            metadata=r.metadata,
+            search_type=r.search_type.value,
+            matched_fields=r.matched_fields,
+            created_at=r.created_at
+        )
+        for r in result.results
+    ]
+    
+    return GraphRAGSearchResponse(
+        query=result.query,
+        results=response_results,
+        total_results=result.total_results,
+        search_metadata=result.search_metadata,
+        communities_involved=result.communities_involved,
+        entity_matches=result.entity_matches,
+        reasoning_chain=result.reasoning_chain,
+        quality_score=result.quality_score,
+        search_time_ms=result.search_time_ms,
+        expanded_context=result.expanded_context
+    )
+
+
 # Vector Search Endpoints
 
 @router.post("/vector/search")
@@ -146,48 +235,10 @@ async def vector_search(request: Request, search_request: VectorSearchRequest):
                    search_type=search_request.search_type,
                    search_scope=search_request.search_scope)
         
-        # Convert request to internal query format
-        search_query = SearchQuery(
-            query_text=search_request.query_text,
-            client_id=search_request.client_id,
-            search_type=SearchType(search_request.search_type),
-            search_scope=SearchScope(search_request.search_scope),
-            limit=search_request.limit,
-            similarity_threshold=search_request.similarity_threshold,
-            include_metadata=search_request.include_metadata,
-            filters=search_request.filters,
-            rerank=search_request.rerank,
-            alpha=search_request.alpha
-        )
-        
         # Execute search
-        result = await vector_search_service.search(search_query)
+        result = await vector_search_service.search(_build_search_query(search_request))
         
-        # Convert results to response format
-        response_results = [
-            SearchResultResponse(
-                id=r.id,
-                content=r.content,
-                score=r.score,
-                metadata=r.metadata,
-                search_type=r.search_type.value,
-                matched_fields=r.matched_fields,
-                created_at=r.created_at
-            )
-            for r in result.results
-        ]
-        
-        return GraphRAGSearchResponse(
-            query=result.query,
-            results=response_results,
-            total_results=result.total_results,
-            search_metadata=result.search_metadata,
-            communities_involved=result.communities_involved,
-            entity_matches=result.entity_matches,
-            reasoning_chain=result.reasoning_chain,
-            quality_score=result.quality_score,
-            search_time_ms=result.search_time_ms
-        )
+        return _build_search_response(result)
         
     except ValueError as e:
         logger.error("Vector search validation failed",
@@ -201,6 +252,59 @@ async def vector_search(request: Request, search_request: VectorSearchRequest):
         raise HTTPException(status_code=500, detail=f"Vector search failed: {str(e)}")
 
 
+@router.post("/vector/search/batch")
+async def batch_vector_search(request: Request, batch_request: BatchVectorSearchRequest):
+    """
+    Perform several vector searches in one request.
+    
+    Query texts are embedded in a single batched call, identical queries
+    run once and the searches execute concurrently. Each query reports its
+    own result or error.
+    """
+    try:
+        vector_search_service: VectorSearchService = request.app.state.vector_search_service
+        settings = vector_search_service.settings
+        
+        if len(batch_request.queries) > settings.search_batch_max_queries:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Batch contains {len(batch_request.queries)} queries; maximum is {settings.search_batch_max_queries}"
+            )
+        
+        start_time = datetime.utcnow()
+        search_queries = [_build_search_query(search_request) for search_request in batch_request.queries]
+        
+        logger.info("Batch vector search requested",
+                   queries=len(search_queries),
+                   client_ids=sorted({query.client_id for query in search_queries}))
+        
+        outcomes = await vector_search_service.search_many(search_queries, batch_request.max_concurrency)
+        
+        items = []
+        for index, outcome in enumerate(outcomes):
+            if isinstance(outcome, Exception):
+                items.append(BatchSearchItem(index=index, success=False, error=str(outcome)))
+            else:
+                items.append(BatchSearchItem(index=index, success=True, result=_build_search_response(outcome)))
+        
+        return BatchVectorSearchResponse(
+            results=items,
+            total_queries=len(search_queries),
+            unique_queries=len({SearchResultCache.build_key(query) for query in search_queries}),
+            failed_queries=sum(not item.success for item in items),
+            search_time_ms=(datetime.utcnow() - start_time).total_seconds() * 1000
+        )
+        
+    except HTTPException:
+        raise
+    except ValueError as e:
+        logger.error("Batch vector search validation failed", error=str(e))
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error("Batch vector search failed", error=str(e))
+        raise HTTPException(status_code=500, detail=f"Batch vector search failed: {str(e)}")
+
+
 @router.get("/vector/semantic")
 async def semantic_search(
     request: Request,
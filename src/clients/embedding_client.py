@@ -0,0 +1,261 @@
+"""
+Embedding Client for GraphRAG Service
+
+Query embeddings for vector search. Providers talk to the vLLM Embeddings
+service (port 8081, OpenAI-compatible) or generate deterministic local
+vectors for tests. BatchingEmbedder coalesces concurrent requests into one
+provider call and keeps a bounded LRU + TTL cache.
+"""
+
+import asyncio
+import hashlib
+import logging
+import time
+import unicodedata
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_text(text: str) -> str:
+    """Canonical form used for cache keys and sent to the provider."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+class EmbeddingProvider(ABC):
+    """Interface for embedding backends."""
+
+    model: str
+    dimensions: int
+
+    @abstractmethod
+    async def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts in one call, preserving order."""
+
+    async def close(self) -> None:
+        pass
+
+
+class HttpEmbeddingProvider(EmbeddingProvider):
+    """OpenAI-compatible /v1/embeddings client over a pooled HTTP connection."""
+
+    def __init__(
+        self,
+        base_url: str = "http://localhost:8081",
+        model: str = "jinaai/jina-embeddings-v4-vllm-code",
+        dimensions: int = 1536,
+        timeout: float = 10.0,
+        max_connections: int = 20,
+        client: Optional[httpx.AsyncClient] = None
+    ):
+        """
+        Initialize the embedding client.
+
+        Args:
+            base_url: Base URL of the embeddings service
+            model: Embedding model name
+            dimensions: Requested vector dimensions
+            timeout: Request timeout in seconds
+            max_connections: Connection pool size
+            client: Preconfigured HTTP client (used instead of creating one)
+        """
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.dimensions = dimensions
+        self.client = client or httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=httpx.Timeout(timeout),
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections
+            ),
+            headers={"Content-Type": "application/json"}
+        )
+
+    async def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        response = await self.client.post(
+            "/v1/embeddings",
+            json={"model": self.model, "input": texts, "dimensions": self.dimensions}
+        )
+        response.raise_for_status()
+
+        data = sorted(response.json()["data"], key=lambda item: item.get("index", 0))
+        if len(data) != len(texts):
+            raise ValueError(f"Embeddings service returned {len(data)} vectors for {len(texts)} inputs")
+        return [item["embedding"] for item in data]
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+class LocalEmbeddingProvider(EmbeddingProvider):
+    """Deterministic unit vectors seeded from the text hash (tests and offline runs)."""
+
+    def __init__(self, model: str = "local-hash", dimensions: int = 1536):
+        self.model = model
+        self.dimensions = dimensions
+        self.calls = 0
+
+    async def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        self.calls += 1
+        vectors = []
+        for text in texts:
+            seed = int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+            vector = np.random.default_rng(seed).standard_normal(self.dimensions)
+            vectors.append((vector / np.linalg.norm(vector)).tolist())
+        return vectors
+
+
+class EmbeddingCache:
+    """Size-bounded LRU cache whose entries expire after ttl seconds."""
+
+    def __init__(self, max_size: int = 10000, ttl: float = 3600):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[Tuple[str, str, int], Tuple[float, List[float]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple[str, str, int]) -> Optional[List[float]]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key: Tuple[str, str, int], vector: List[float]) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, vector)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class BatchingEmbedder:
+    """
+    Cached, micro-batched front end for an EmbeddingProvider.
+
+    Cache misses are queued and flushed as one provider call after
+    batch_window_ms (or as soon as max_batch_size texts are waiting), so
+    concurrent queries share a single round-trip. Identical texts that are
+    already in flight await the same future.
+    """
+
+    def __init__(
+        self,
+        provider: EmbeddingProvider,
+        cache_size: int = 10000,
+        cache_ttl: float = 3600,
+        batch_window_ms: float = 5.0,
+        max_batch_size: int = 32
+    ):
+        self.provider = provider
+        self.cache = EmbeddingCache(cache_size, cache_ttl)
+        self.batch_window = batch_window_ms / 1000.0
+        self.max_batch_size = max_batch_size
+        self.provider_calls = 0
+        self._pending: List[Tuple[Tuple[str, str, int], str]] = []
+        self._inflight: Dict[Tuple[str, str, int], asyncio.Future] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        self._eager_flushes: set = set()
+
+    def cache_key(self, text: str) -> Tuple[str, str, int]:
+        return (normalize_text(text), self.provider.model, self.provider.dimensions)
+
+    async def embed(self, text: str) -> List[float]:
+        """Embed one text."""
+        return (await self.embed_many([text]))[0]
+
+    async def embed_many(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts, serving repeats from cache and batching the misses."""
+        keys = [self.cache_key(text) for text in texts]
+        vectors: Dict[Tuple[str, str, int], List[float]] = {}
+        waiting: Dict[Tuple[str, str, int], asyncio.Future] = {}
+
+        for key in keys:
+            if key in vectors or key in waiting:
+                continue
+            cached = self.cache.get(key)
+            if cached is not None:
+                vectors[key] = cached
+            elif key in self._inflight:
+                waiting[key] = self._inflight[key]
+            else:
+                future = asyncio.get_running_loop().create_future()
+                self._inflight[key] = future
+                self._pending.append((key, key[0]))
+                waiting[key] = future
+
+        if len(self._pending) >= self.max_batch_size:
+            task = asyncio.create_task(self._flush())
+            self._eager_flushes.add(task)
+            task.add_done_callback(self._eager_flushes.discard)
+        elif self._pending and self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_after_window())
+
+        if waiting:
+            # Futures are shared with concurrent callers; cancelling this
+            # caller must not cancel them for everyone else
+            results = await asyncio.gather(*(asyncio.shield(future) for future in waiting.values()))
+            vectors.update(zip(waiting.keys(), results))
+
+        return [vectors[key] for key in keys]
+
+    async def _flush_after_window(self) -> None:
+        try:
+            await asyncio.sleep(self.batch_window)
+        finally:
+            self._flush_task = None
+        await self._flush()
+
+    async def _flush(self) -> None:
+        """Send queued texts to the provider, max_batch_size at a time."""
+        while self._pending:
+            batch = self._pending[:self.max_batch_size]
+            del self._pending[:self.max_batch_size]
+
+            self.provider_calls += 1
+            try:
+                embeddings = await self.provider.embed_batch([text for _, text in batch])
+            except Exception as e:
+                logger.error(f"Embedding batch of {len(batch)} failed: {e}")
+                for key, _ in batch:
+                    future = self._inflight.pop(key)
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (key, _), embedding in zip(batch, embeddings):
+                self.cache.put(key, embedding)
+                future = self._inflight.pop(key)
+                if not future.done():
+                    future.set_result(embedding)
+
+    async def close(self) -> None:
+        await self.provider.close()
+
+
+def create_embedding_provider(settings) -> EmbeddingProvider:
+    """Build the provider selected by settings.embedding_provider ("http" or "local")."""
+    if settings.embedding_provider == "local":
+        return LocalEmbeddingProvider(dimensions=settings.embedding_dimensions)
+    if settings.embedding_provider == "http":
+        return HttpEmbeddingProvider(
+            base_url=settings.embeddings_service_url,
+            model=settings.embedding_model,
+            dimensions=settings.embedding_dimensions,
+            timeout=settings.embedding_timeout,
+            max_connections=settings.embedding_max_connections
+        )
+    raise ValueError(f"Unknown embedding provider: {settings.embedding_provider}")
@@ -0,0 +1,259 @@
+"""
+Case Community Job Module
+Case-wide hierarchical community detection over the stored tenant graph
+"""
+
+import asyncio
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import structlog
+
+from .community_detector import CommunityDetector
+from .config import GraphRAGSettings
+from .tenant_graph_loader import TenantGraphLoader
+
+logger = structlog.get_logger(__name__)
+
+
+class CaseCommunityJobRunner:
+    """
+    Runs case-wide community detection as background jobs.
+
+    Per-document detection only ever sees one document's entities. This job
+    streams every node and edge of a client/case from the database, runs
+    hierarchical Leiden over the whole graph and replaces the case's stored
+    communities and memberships with bulk writes. Job state is tracked in
+    memory and one job per client/case runs at a time.
+    """
+
+    def __init__(self,
+                 settings: GraphRAGSettings,
+                 supabase_client,
+                 community_detector: CommunityDetector):
+        """
+        Initialize job runner.
+
+        Args:
+            settings: GraphRAG configuration settings
+            supabase_client: SupabaseClient used for reads and bulk writes
+            community_detector: Detector providing hierarchical Leiden
+        """
+        self.settings = settings
+        self.supabase_client = supabase_client
+        self.community_detector = community_detector
+        self.loader = TenantGraphLoader(
+            supabase_client,
+            page_size=settings.tenant_graph_page_size,
+            max_nodes=settings.tenant_graph_max_nodes,
+            max_edges=settings.tenant_graph_max_edges
+        )
+        self.jobs: Dict[str, Dict[str, Any]] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+        # VectorSearchService whose cached results are dropped after a run, set by the app
+        self.search_service = None
+
+    def submit(self,
+               client_id: str,
+               case_id: Optional[str] = None,
+               resolution: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Start a detection job, or return the one already running for the case.
+
+        Returns:
+            Job status record
+        """
+        for job in self.jobs.values():
+            if (job["client_id"] == client_id and job["case_id"] == case_id
+                    and job["status"] in ("queued", "running")):
+                return job
+
+        job_id = f"case_communities_{uuid.uuid4().hex[:12]}"
+        job = {
+            "job_id": job_id,
+            "client_id": client_id,
+            "case_id": case_id,
+            "resolution": resolution,
+            "status": "queued",
+            "submitted_at": datetime.utcnow().isoformat(),
+            "started_at": None,
+            "completed_at": None,
+            "result": None,
+            "error": None
+        }
+        self.jobs[job_id] = job
+        self._tasks[job_id] = asyncio.create_task(self._run(job))
+        return job
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return a job status record, if known."""
+        return self.jobs.get(job_id)
+
+    async def _run(self, job: Dict[str, Any]) -> None:
+        """Load, detect and store communities for one case."""
+        job["status"] = "running"
+        job["started_at"] = datetime.utcnow().isoformat()
+        start_time = time.time()
+
+        try:
+            tenant_graph = await self.loader.load(job["client_id"], job["case_id"])
+            load_time = time.time() - start_time
+
+            hierarchy = await asyncio.to_thread(self._detect, tenant_graph, job["resolution"])
+            detect_time = time.time() - start_time - load_time
+
+            write_info = await self._store_hierarchy(hierarchy, job["client_id"], job["case_id"])
+            if self.search_service:
+                self.search_service.invalidate_client(job["client_id"])
+
+            job["result"] = {
+                "nodes": tenant_graph.node_count,
+                "edges": tenant_graph.edge_count,
+                "skipped_edges": tenant_graph.skipped_edges,
+                "communities": len(hierarchy),
+                "hierarchy_levels": max((node["level"] for node in hierarchy), default=-1) + 1,
+                "load_time_seconds": round(load_time, 2),
+                "detection_time_seconds": round(detect_time, 2),
+                "total_time_seconds": round(time.time() - start_time, 2),
+                **write_info
+            }
+            job["status"] = "completed"
+            logger.info("✅ Case community detection completed", job_id=job["job_id"], **job["result"])
+
+        except Exception as e:
+            job["status"] = "failed"
+            job["error"] = str(e)
+            logger.error("❌ Case community detection failed", job_id=job["job_id"], error=str(e))
+
+        finally:
+            job["completed_at"] = datetime.utcnow().isoformat()
+            self._tasks.pop(job["job_id"], None)
+
+    def _detect(self, tenant_graph, resolution: Optional[float]) -> List[Dict[str, Any]]:
+        """Run hierarchical Leiden on the compact graph (CPU-bound, off the event loop)."""
+        if tenant_graph.node_count < self.community_detector.min_community_size:
+            return []
+
+        detector = self.community_detector
+        if resolution is not None and resolution != detector.resolution:
+            detector = CommunityDetector(
+                resolution=resolution,
+                min_community_size=detector.min_community_size,
+                max_community_size=detector.max_community_size,
+                coherence_threshold=detector.coherence_threshold,
+                max_hierarchy_levels=detector.max_hierarchy_levels
+            )
+        return detector.detect_hierarchy(tenant_graph.to_igraph())
+
+    def _community_prefix(self, client_id: str, case_id: Optional[str]) -> str:
+        """Community id prefix owned by case-wide jobs for this tenant."""
+        return f"case_{case_id or client_id}"
+
+    async def _store_hierarchy(self,
+                               hierarchy: List[Dict[str, Any]],
+                               client_id: str,
+                               case_id: Optional[str]) -> Dict[str, Any]:
+        """
+        Replace the case's job-owned communities and memberships.
+
+        Each run writes its communities under fresh ids (case prefix plus a
+        run token) tagged with the tenant's client_id/case_id. Communities of
+        earlier runs for the same tenant are deleted only after every new row
+        is written, so a failed write leaves the previous hierarchy in place
+        and the partial new one is removed.
+        """
+        prefix = self._community_prefix(client_id, case_id)
+        batch_size = self.settings.tenant_graph_write_batch_size
+        run_prefix = f"{prefix}_{uuid.uuid4().hex[:8]}"
+        community_ids = [f"{run_prefix}_{idx:05d}" for idx in range(len(hierarchy))]
+
+        community_records = []
+        membership_records = []
+        for idx, node in enumerate(hierarchy):
+            community_id = community_ids[idx]
+            community_records.append({
+                "community_id": community_id,
+                "client_id": client_id,
+                "case_id": case_id,
+                "title": f"Case community {idx + 1}",
+                "summary": "",
+                "level": node["level"],
+                "parent_community_id": community_ids[node["parent"]] if node["parent"] is not None else None,
+                "node_count": len(node["members"]),
+                "edge_count": 0,
+                "metadata": {
+                    "client_id": client_id,
+                    "case_id": case_id,
+                    "scope": "case",
+                    "child_community_ids": [community_ids[child] for child in node["children"]]
+                }
+            })
+            membership_records.extend(
+                {
+                    "node_id": node_id,
+                    "community_id": community_id,
+                    "level": node["level"],
+                    "membership_strength": 1.0
+                }
+                for node_id in node["members"]
+            )
+
+        graph_schema = self.supabase_client.schema("graph", admin_operation=True)
+        existing_ids = await self._existing_community_ids(client_id, case_id, prefix)
+
+        try:
+            for i in range(0, len(community_records), batch_size):
+                await graph_schema.table("communities") \
+                    .insert(community_records[i:i + batch_size]) \
+                    .execute()
+            for i in range(0, len(membership_records), batch_size):
+                await graph_schema.table("node_communities") \
+                    .insert(membership_records[i:i + batch_size]) \
+                    .execute()
+        except Exception:
+            await self._delete_communities(community_ids)
+            raise
+
+        stale_ids = sorted(existing_ids - set(community_ids))
+        await self._delete_communities(stale_ids)
+
+        return {
+            "communities_written": len(community_records),
+            "memberships_written": len(membership_records),
+            "stale_communities_removed": len(stale_ids)
+        }
+
+    async def _delete_communities(self, community_ids: List[str]) -> None:
+        """Delete communities and their memberships by exact id."""
+        batch_size = self.settings.tenant_graph_write_batch_size
+        graph_schema = self.supabase_client.schema("graph", admin_operation=True)
+        for i in range(0, len(community_ids), batch_size):
+            batch = community_ids[i:i + batch_size]
+            await graph_schema.table("node_communities").delete().in_("community_id", batch).execute()
+            await graph_schema.table("communities").delete().in_("community_id", batch).execute()
+
+    async def _existing_community_ids(self, client_id: str, case_id: Optional[str], prefix: str) -> set:
+        """Keyset-scan the community ids previously written for this tenant by case-wide jobs."""
+        # Escape LIKE wildcards so one tenant's prefix never matches another's ids
+        pattern = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "\\_%"
+        existing = set()
+        last_id = None
+        page_size = self.settings.tenant_graph_page_size
+        while True:
+            query = self.supabase_client.schema("graph", admin_operation=True) \
+                .table("communities") \
+                .select("community_id") \
+                .eq("client_id", client_id)
+            query = query.eq("case_id", case_id) if case_id else query.is_("case_id", "null")
+            query = query.like("community_id", pattern)
+            if last_id is not None:
+                query = query.gt("community_id", last_id)
+            response = await query.order("community_id").limit(page_size).execute()
+            rows = response.data or []
+            existing.update(row["community_id"] for row in rows)
+            if len(rows) < page_size:
+                return existing
+            last_id = rows[-1]["community_id"]
@@ -11,6 +11,30 @@ import leidenalg
 import numpy as np
 from collections import defaultdict
 
+from .worker_pool import map_in_process_pool
+
+
+def _leiden_membership(vertex_count: int,
+                       edges: List[Tuple[int, int]],
+                       weights: List[float],
+                       resolution: float) -> List[int]:
+    """
+    Run Leiden on a plain weighted edge list and return the membership vector.
+    
+    Module-level so it can be pickled into the shared worker processes; uses the
+    same partition type and seed as CommunityDetector._run_leiden.
+    """
+    graph = ig.Graph(n=vertex_count, edges=edges)
+    graph.es['weight'] = weights
+    partition = leidenalg.find_partition(
+        graph,
+        leidenalg.RBConfigurationVertexPartition,
+        weights='weight',
+        resolution_parameter=resolution,
+        seed=42
+    )
+    return partition.membership
+
 
 class CommunityDetector:
     """
@@ -18,11 +42,21 @@ class CommunityDetector:
     Follows Microsoft GraphRAG methodology for hierarchical community detection.
     """
     
+    # Node id prefix for virtual citation hub nodes
+    CITATION_HUB_PREFIX = "citation_hub::"
+    
+    # Default resolutions tried by sweep_resolutions
+    DEFAULT_SWEEP_RESOLUTIONS = (0.25, 0.5, 1.0, 2.0)
+    
+    # Weights of modularity, size distribution and coherence in the sweep score
+    SWEEP_SCORE_WEIGHTS = {"modularity": 0.5, "size": 0.25, "coherence": 0.25}
+    
     def __init__(self,
                  resolution: float = 1.0,
                  min_community_size: int = 3,
                  max_community_size: int = 50,
-                 coherence_threshold: float = 0.7):
+                 coherence_threshold: float = 0.7,
+                 max_hierarchy_levels: int = 4):
         """
         Initialize community detector.
         
@@ -31,11 +65,13 @@ class CommunityDetector:
             min_community_size: Minimum entities for valid community
             max_community_size: Maximum entities per community
             coherence_threshold: Minimum coherence score for community
+            max_hierarchy_levels: Maximum depth of recursive Leiden refinement
         """
         self.resolution = resolution
         self.min_community_size = min_community_size
         self.max_community_size = max_community_size
         self.coherence_threshold = coherence_threshold
+        self.max_hierarchy_levels = max_hierarchy_levels
         
     async def detect_communities(self,
                                 entities: List[Dict[str, Any]],
@@ -70,16 +106,11 @@ class CommunityDetector:
         # Extract communities from partition
         raw_communities = self._extract_communities(partition, ig_graph, nx_graph)
         
-        # Filter and validate communities
-        valid_communities = self._filter_communities(raw_communities, nx_graph)
+        # Filter and validate communities, recursively refining oversized ones
+        hierarchy = self._filter_communities(raw_communities, ig_graph)
         
         # Calculate community metadata and quality metrics
-        communities_with_metadata = []
-        for comm_id, community in enumerate(valid_communities):
-            community_info = await self._analyze_community(
-                comm_id, community, nx_graph, entities
-            )
-            communities_with_metadata.append(community_info)
+        communities_with_metadata = self._build_community_infos(hierarchy, ig_graph, entities)
         
         # Build detection metadata
         metadata = {
@@ -87,17 +118,351 @@ class CommunityDetector:
             "total_relationships": len(relationships),
             "raw_communities_found": len(raw_communities),
             "valid_communities": len(communities_with_metadata),
+            "leaf_communities": sum(1 for node in hierarchy if not node["children"]),
+            "hierarchy_levels": max((node["level"] for node in hierarchy), default=-1) + 1,
             "resolution_used": self.resolution,
-            "graph_metrics": {
-                "nodes": nx_graph.number_of_nodes(),
-                "edges": nx_graph.number_of_edges(),
-                "density": nx.density(nx_graph) if nx_graph.number_of_nodes() > 0 else 0,
-                "components": nx.number_connected_components(nx_graph)
-            }
+            "graph_metrics": self._graph_metrics(nx_graph)
         }
         
         return communities_with_metadata, metadata
     
+    async def detect_communities_incremental(self,
+                                            entities: List[Dict[str, Any]],
+                                            relationships: List[Dict[str, Any]],
+                                            previous_membership: Dict[str, str],
+                                            citations: Optional[List[Dict[str, Any]]] = None,
+                                            changed_entity_ids: Optional[Set[str]] = None) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        Detect communities warm-started from a previous top-level partition.
+        
+        Nodes keep their previous community as initial membership, new nodes
+        are placed by weighted majority vote of their neighbours, and Leiden
+        then only moves nodes in the affected region (new nodes, changed
+        nodes and their neighbours). Community ids are preserved so callers
+        can re-summarize and rewrite only the communities that changed.
+        
+        Args:
+            entities: List of deduplicated entities
+            relationships: List of entity relationships
+            previous_membership: Mapping of entity_id to previous top-level community_id
+            citations: Optional list of citations for enhanced detection
+            changed_entity_ids: Existing entities whose edges changed since the last run
+            
+        Returns:
+            Tuple of (communities, detection metadata). Metadata lists
+            changed_community_ids, unchanged_community_ids and removed_community_ids.
+        """
+        if not previous_membership:
+            communities, metadata = await self.detect_communities(entities, relationships, citations)
+            metadata["incremental"] = False
+            metadata["changed_community_ids"] = [c["community_id"] for c in communities]
+            metadata["unchanged_community_ids"] = []
+            metadata["removed_community_ids"] = []
+            return communities, metadata
+        
+        if len(entities) < self.min_community_size:
+            return [], {"message": "Too few entities for community detection"}
+        
+        nx_graph = self._build_networkx_graph(entities, relationships, citations)
+        
+        if nx_graph.number_of_edges() == 0:
+            return [], {"message": "No relationships for community detection"}
+        
+        ig_graph = self._convert_to_igraph(nx_graph)
+        node_list = ig_graph.vs["original_id"]
+        
+        # Previous members of each community, restricted to nodes in this graph
+        previous_members = defaultdict(set)
+        for node_id, community_id in previous_membership.items():
+            if node_id in nx_graph:
+                previous_members[community_id].add(node_id)
+        
+        # Seed new nodes from their neighbours, then mark the affected region
+        assignments = self._assign_new_nodes(nx_graph, previous_membership)
+        new_nodes = {node for node in nx_graph.nodes
+                     if node not in previous_membership and not self._is_citation_hub(nx_graph, node)}
+        affected = set(new_nodes) | {n for n in (changed_entity_ids or set()) if n in nx_graph}
+        for node in list(affected):
+            affected.update(nx_graph.neighbors(node))
+        
+        label_index = {label: idx for idx, label in enumerate(sorted(set(assignments.values())))}
+        initial_membership = [label_index[assignments[node]] for node in node_list]
+        is_membership_fixed = [
+            node not in affected and not self._is_citation_hub(nx_graph, node) for node in node_list
+        ]
+        
+        partition = leidenalg.RBConfigurationVertexPartition(
+            ig_graph,
+            initial_membership=initial_membership,
+            weights='weight',
+            resolution_parameter=self.resolution
+        )
+        optimiser = leidenalg.Optimiser()
+        optimiser.set_rng_seed(42)
+        optimiser.optimise_partition(partition, n_iterations=2, is_membership_fixed=is_membership_fixed)
+        
+        raw_communities = self._extract_communities(partition, ig_graph, nx_graph)
+        labels = self._match_previous_labels(raw_communities, previous_membership)
+        
+        hierarchy = self._filter_communities(raw_communities, ig_graph, labels)
+        communities_with_metadata = self._build_community_infos(hierarchy, ig_graph, entities)
+        
+        # A top-level community changed if its membership differs from last run;
+        # its whole subtree is rewritten with it.
+        changed_roots = set()
+        unchanged_roots = set()
+        for community in communities_with_metadata:
+            if community["parent_community_id"] is not None:
+                continue
+            community_id = community["community_id"]
+            if set(community["entity_ids"]) == previous_members.get(community_id):
+                unchanged_roots.add(community_id)
+            else:
+                changed_roots.add(community_id)
+        
+        root_of = {}
+        for community in communities_with_metadata:
+            parent = community["parent_community_id"]
+            root_of[community["community_id"]] = root_of[parent] if parent else community["community_id"]
+        
+        changed = [c["community_id"] for c in communities_with_metadata
+                   if root_of[c["community_id"]] in changed_roots]
+        current_roots = changed_roots | unchanged_roots
+        
+        metadata = {
+            "total_entities": len(entities),
+            "total_relationships": len(relationships),
+            "raw_communities_found": len(raw_communities),
+            "valid_communities": len(communities_with_metadata),
+            "resolution_used": self.resolution,
+            "incremental": True,
+            "new_nodes": len(new_nodes),
+            "affected_nodes": len(affected),
+            "changed_community_ids": changed,
+            "unchanged_community_ids": sorted(unchanged_roots),
+            "removed_community_ids": sorted(set(previous_members) - current_roots),
+            "graph_metrics": self._graph_metrics(nx_graph)
+        }
+        
+        return communities_with_metadata, metadata
+    
+    def _assign_new_nodes(self,
+                         nx_graph: nx.Graph,
+                         previous_membership: Dict[str, str]) -> Dict[str, str]:
+        """
+        Place nodes without a previous community by weighted neighbour vote.
+        
+        Votes propagate over a few passes so chains of new nodes attach to
+        the nearest known community; nodes with no labelled neighbours get a
+        fresh singleton community.
+        """
+        assignments = {node: previous_membership[node] for node in nx_graph.nodes
+                       if node in previous_membership}
+        pending = [node for node in nx_graph.nodes if node not in assignments]
+        
+        for _ in range(3):
+            if not pending:
+                break
+            still_pending = []
+            for node in pending:
+                votes = defaultdict(float)
+                for neighbour, data in nx_graph[node].items():
+                    if neighbour in assignments:
+                        votes[assignments[neighbour]] += data.get("weight", 1.0)
+                if votes:
+                    assignments[node] = max(sorted(votes), key=votes.get)
+                else:
+                    still_pending.append(node)
+            pending = still_pending
+        
+        for node in pending:
+            assignments[node] = f"new_{node}"
+        
+        return assignments
+    
+    def _match_previous_labels(self,
+                              raw_communities: List[Set[str]],
+                              previous_membership: Dict[str, str]) -> List[Optional[str]]:
+        """Map each community to the previous community it overlaps most (one-to-one)."""
+        overlaps = []
+        for idx, community in enumerate(raw_communities):
+            counts = defaultdict(int)
+            for node in community:
+                if node in previous_membership:
+                    counts[previous_membership[node]] += 1
+            for label, count in counts.items():
+                overlaps.append((-count, label, idx))
+        
+        labels: List[Optional[str]] = [None] * len(raw_communities)
+        used = set()
+        for _, label, idx in sorted(overlaps):
+            if labels[idx] is None and label not in used:
+                labels[idx] = label
+                used.add(label)
+        
+        # Communities with no previous counterpart get fresh ids
+        taken = used | set(previous_membership.values())
+        next_id = 0
+        for idx in range(len(labels)):
+            if labels[idx] is None:
+                while f"comm_{next_id:03d}" in taken:
+                    next_id += 1
+                labels[idx] = f"comm_{next_id:03d}"
+                taken.add(labels[idx])
+        
+        return labels
+    
+    def _build_community_infos(self,
+                              hierarchy: List[Dict[str, Any]],
+                              ig_graph: ig.Graph,
+                              entities: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Analyze every hierarchy node and attach its tree links.
+        
+        Labelled top-level communities keep their label as community_id and
+        their descendants are numbered beneath it; otherwise ids follow
+        pre-order position. Statistics are computed once per hierarchy level
+        (communities within a level are disjoint) rather than per community.
+        """
+        community_ids = []
+        sibling_counts = defaultdict(int)
+        for idx, node in enumerate(hierarchy):
+            if node.get("label"):
+                community_ids.append(node["label"])
+            elif node["parent"] is not None and hierarchy[node["parent"]].get("label") is not None:
+                node["label"] = f"{community_ids[node['parent']]}_{sibling_counts[node['parent']]:02d}"
+                sibling_counts[node["parent"]] += 1
+                community_ids.append(node["label"])
+            else:
+                community_ids.append(f"comm_{idx:03d}")
+        
+        # Per-vertex entity attributes, resolved once for the whole graph
+        entity_map = {e["entity_id"]: e for e in entities}
+        original_ids = ig_graph.vs['original_id']
+        vertex_entities = [entity_map.get(node_id) for node_id in original_ids]
+        known = np.array([entity is not None for entity in vertex_entities], dtype=bool)
+        type_names, type_codes = np.unique(
+            [entity.get("entity_type", "") if entity else "" for entity in vertex_entities],
+            return_inverse=True
+        )
+        confidences = np.array(
+            [entity.get("confidence", 0.95) if entity else 0.0 for entity in vertex_entities],
+            dtype=np.float64
+        )
+        
+        indices_by_level = defaultdict(list)
+        for idx, node in enumerate(hierarchy):
+            indices_by_level[node["level"]].append(idx)
+        
+        communities_with_metadata: List[Dict[str, Any]] = [None] * len(hierarchy)
+        for indices in indices_by_level.values():
+            stats = self._community_statistics([hierarchy[idx]["members"] for idx in indices], ig_graph)
+            membership = stats["membership"]
+            counted = known & (membership >= 0)
+            labels = membership[counted]
+            type_histogram = np.bincount(
+                labels * len(type_names) + type_codes[counted],
+                minlength=len(indices) * len(type_names)
+            ).reshape(len(indices), len(type_names))
+            known_counts = np.bincount(labels, minlength=len(indices))
+            confidence_sums = np.bincount(labels, weights=confidences[counted], minlength=len(indices))
+            
+            for position, idx in enumerate(indices):
+                vertices = stats["members"][position]
+                top = np.lexsort((vertices, -stats["internal_degree"][vertices]))[:3]
+                type_counts = {
+                    str(type_names[t]): int(type_histogram[position, t])
+                    for t in np.flatnonzero(type_histogram[position])
+                }
+                community_info = self._analyze_community(
+                    idx,
+                    hierarchy[idx]["members"],
+                    coherence=float(stats["coherence"][position]),
+                    central_entities=[original_ids[v] for v in vertices[top]],
+                    type_counts=type_counts,
+                    avg_confidence=(
+                        float(confidence_sums[position] / known_counts[position])
+                        if known_counts[position] else 0.0
+                    ),
+                    entity_map=entity_map
+                )
+                node = hierarchy[idx]
+                community_info["community_id"] = community_ids[idx]
+                community_info["level"] = node["level"]
+                community_info["parent_community_id"] = (
+                    community_ids[node["parent"]] if node["parent"] is not None else None
+                )
+                community_info["child_community_ids"] = [community_ids[child] for child in node["children"]]
+                communities_with_metadata[idx] = community_info
+        
+        return communities_with_metadata
+    
+    def _community_statistics(self,
+                              communities: List[Set[str]],
+                              ig_graph: ig.Graph) -> Dict[str, Any]:
+        """
+        Compute size, internal edge and coherence statistics for disjoint communities.
+        
+        Builds a membership vector (-1 for vertices outside every community)
+        and reduces the graph's COO edge list with segment sums (bincount),
+        so all communities cost O(V + E) together instead of one subgraph
+        each. Coherence = internal edges / possible internal edges, scaled
+        by the mean internal edge weight.
+        """
+        vertex_index = ig_graph["node_index"]
+        membership = np.full(ig_graph.vcount(), -1, dtype=np.int64)
+        members = []
+        for label, community in enumerate(communities):
+            vertices = np.fromiter((vertex_index[node] for node in community), dtype=np.int64, count=len(community))
+            membership[vertices] = label
+            members.append(vertices)
+        
+        sources, targets, weights = self._edge_arrays(ig_graph)
+        source_labels = membership[sources]
+        internal = (source_labels >= 0) & (source_labels == membership[targets])
+        internal_labels = source_labels[internal]
+        
+        sizes = np.array([len(community) for community in communities], dtype=np.float64)
+        internal_edges = np.bincount(internal_labels, minlength=len(communities))
+        internal_weight = np.bincount(internal_labels, weights=weights[internal], minlength=len(communities))
+        internal_degree = np.bincount(
+            np.concatenate((sources[internal], targets[internal])),
+            minlength=ig_graph.vcount()
+        )
+        
+        possible_edges = sizes * (sizes - 1) / 2
+        with np.errstate(divide='ignore', invalid='ignore'):
+            coherence = np.where(possible_edges > 0, internal_weight / possible_edges, 1.0)
+        
+        return {
+            "membership": membership,
+            "members": members,
+            "sizes": sizes,
+            "internal_edges": internal_edges,
+            "internal_weight": internal_weight,
+            "internal_degree": internal_degree,
+            "coherence": coherence
+        }
+    
+    def _edge_arrays(self, ig_graph: ig.Graph) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Return (sources, targets, weights) edge arrays, cached on the graph."""
+        if "edge_arrays" not in ig_graph.attributes():
+            edges = np.array(ig_graph.get_edgelist(), dtype=np.int64).reshape(-1, 2)
+            weights = np.array(ig_graph.es['weight'] if ig_graph.ecount() else [], dtype=np.float64)
+            ig_graph["edge_arrays"] = (edges[:, 0], edges[:, 1], weights)
+        return ig_graph["edge_arrays"]
+    
+    def _graph_metrics(self, nx_graph: nx.Graph) -> Dict[str, Any]:
+        """Summarize the detection graph, counting citation hubs separately."""
+        hubs = sum(1 for node in nx_graph.nodes if self._is_citation_hub(nx_graph, node))
+        return {
+            "nodes": nx_graph.number_of_nodes() - hubs,
+            "edges": nx_graph.number_of_edges(),
+            "citation_hubs": hubs,
+            "density": nx.density(nx_graph) if nx_graph.number_of_nodes() > 0 else 0,
+            "components": nx.number_connected_components(nx_graph)
+        }
+    
     def _build_networkx_graph(self,
                              entities: List[Dict[str, Any]],
                              relationships: List[Dict[str, Any]],
@@ -148,38 +513,49 @@ class CommunityDetector:
                            G: nx.Graph,
                            citations: List[Dict[str, Any]],
                            entities: List[Dict[str, Any]]):
-        """Add edges based on shared citations."""
+        """
+        Add edges based on shared citations.
+        
+        Each citing document becomes a virtual hub node connected to its
+        entities, instead of a SHARED_CITATION clique between every pair of
+        them. This keeps the graph linear in entity mentions (k edges per
+        document rather than k²/2) while still pulling co-cited entities
+        together during Leiden. Hub nodes are removed again when communities
+        are extracted.
+        """
         # Group entities by document
         entities_by_doc = defaultdict(list)
         for entity in entities:
             for doc_id in entity.get("document_ids", []):
                 entities_by_doc[doc_id].append(entity["entity_id"])
         
-        # Group citations by document
-        citations_by_doc = defaultdict(list)
+        # Count citations by document
+        citation_counts = defaultdict(int)
         for citation in citations:
             doc_id = citation.get("document_id")
             if doc_id:
-                citations_by_doc[doc_id].append(citation)
+                citation_counts[doc_id] += 1
         
-        # Connect entities that share citations
-        for doc_id, doc_citations in citations_by_doc.items():
-            doc_entities = entities_by_doc.get(doc_id, [])
+        # Connect entities in the same citing document through its hub
+        for doc_id, citation_count in citation_counts.items():
+            doc_entities = [e for e in entities_by_doc.get(doc_id, []) if e in G.nodes]
             
             # If document has both entities and citations
-            if doc_entities and len(doc_entities) > 1:
-                # Connect entities in same document with citation relationship
-                for i, entity1 in enumerate(doc_entities):
-                    for entity2 in doc_entities[i+1:]:
-                        if entity1 in G.nodes and entity2 in G.nodes:
-                            # Check if edge already exists
-                            if not G.has_edge(entity1, entity2):
-                                G.add_edge(
-                                    entity1, entity2,
-                                    weight=0.6,
-                                    relationship_type="SHARED_CITATION",
-                                    citation_count=len(doc_citations)
-                                )
+            if len(doc_entities) > 1:
+                hub_id = f"{self.CITATION_HUB_PREFIX}{doc_id}"
+                G.add_node(hub_id, citation_hub=True, entity_type="CITATION_HUB")
+                G.add_edges_from(
+                    (hub_id, entity_id, {
+                        "weight": 0.6,
+                        "relationship_type": "SHARED_CITATION",
+                        "citation_count": citation_count
+                    })
+                    for entity_id in doc_entities
+                )
+    
+    def _is_citation_hub(self, nx_graph: nx.Graph, node_id: str) -> bool:
+        """Check whether a node is a virtual citation hub rather than an entity."""
+        return nx_graph.nodes[node_id].get("citation_hub", False)
     
     def _convert_to_igraph(self, nx_graph: nx.Graph) -> ig.Graph:
         """Convert NetworkX graph to igraph for Leiden algorithm."""
@@ -206,19 +582,22 @@ class CommunityDetector:
                 for node in node_list
             ]
         
-        # Store original node IDs
+        # Store original node IDs (and the reverse lookup for subgraph extraction)
         ig_graph.vs['original_id'] = node_list
+        ig_graph['node_index'] = node_to_idx
         
         return ig_graph
     
-    def _run_leiden(self, ig_graph: ig.Graph) -> leidenalg.VertexPartition:
+    def _run_leiden(self,
+                    ig_graph: ig.Graph,
+                    resolution: Optional[float] = None) -> leidenalg.VertexPartition:
         """Run Leiden algorithm for community detection."""
         # Use RBConfigurationVertexPartition for weighted graphs
         partition = leidenalg.find_partition(
             ig_graph,
             leidenalg.RBConfigurationVertexPartition,
             weights='weight',
-            resolution_parameter=self.resolution,
+            resolution_parameter=self.resolution if resolution is None else resolution,
             seed=42  # For reproducibility
         )
         
@@ -238,20 +617,57 @@ class CommunityDetector:
             community_entities = set()
             for vertex_idx in community_vertices:
                 original_id = ig_graph.vs[vertex_idx]['original_id']
-                community_entities.add(original_id)
+                if not self._is_citation_hub(nx_graph, original_id):
+                    community_entities.add(original_id)
             
             if community_entities:
                 communities.append(community_entities)
         
         return communities
     
+    def detect_hierarchy(self, ig_graph: ig.Graph) -> List[Dict[str, Any]]:
+        """
+        Run hierarchical Leiden directly on a prebuilt igraph graph.
+        
+        Used for tenant-scale graphs streamed from the database, where
+        building a NetworkX graph and per-entity dictionaries would be too
+        costly. The graph must carry 'original_id' vertex labels, a
+        'node_index' graph attribute and 'weight' edge attributes.
+        
+        Returns:
+            Flattened hierarchy in pre-order (see _filter_communities)
+        """
+        partition = self._run_leiden(ig_graph)
+        original_ids = ig_graph.vs['original_id']
+        raw_communities = [
+            {original_ids[v] for v in community}
+            for community in partition
+            if len(community) > 0
+        ]
+        return self._filter_communities(raw_communities, ig_graph)
+    
     def _filter_communities(self,
                           raw_communities: List[Set[str]],
-                          nx_graph: nx.Graph) -> List[Set[str]]:
-        """Filter communities based on size and coherence."""
-        valid_communities = []
+                          ig_graph: ig.Graph,
+                          labels: Optional[List[str]] = None,
+                          resolution: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Filter communities based on size and coherence.
+        
+        Oversized communities are kept as parents and recursively refined
+        into child communities, so the result is a flattened hierarchy in
+        pre-order (parents before children). Each node carries its members,
+        level, parent index and child indices, plus the matching entry of
+        labels (if given) for top-level nodes. Levels follow the schema
+        (0 = finest, higher = coarser): leaves are level 0 and a parent sits
+        one level above its highest child. Refinement uses resolution if
+        given, otherwise the detector's own.
+        """
+        hierarchy: List[Dict[str, Any]] = []
+        coherence_scores = self._community_statistics(raw_communities, ig_graph)["coherence"]
         
-        for community in raw_communities:
+        for position, community in enumerate(raw_communities):
+            root_index = len(hierarchy)
             # Check size constraints
             if len(community) < self.min_community_size:
                 continue
@@ -259,93 +675,124 @@ class CommunityDetector:
             # Split if too large
             if len(community) > self.max_community_size:
                 # Use hierarchical splitting
-                sub_communities = self._split_large_community(community, nx_graph)
-                valid_communities.extend(sub_communities)
+                self._split_large_community(community, ig_graph, hierarchy, depth=0, parent=None,
+                                            resolution=resolution)
             else:
                 # Check coherence
-                coherence = self._calculate_coherence(community, nx_graph)
-                if coherence >= self.coherence_threshold:
-                    valid_communities.append(community)
+                if coherence_scores[position] >= self.coherence_threshold:
+                    self._add_hierarchy_node(hierarchy, community, parent=None)
+            
+            if labels is not None and len(hierarchy) > root_index:
+                hierarchy[root_index]["label"] = labels[position]
+        
+        # Children follow their parent in pre-order, so a reverse pass sees them first
+        for node in reversed(hierarchy):
+            node["level"] = 1 + max(hierarchy[child]["level"] for child in node["children"]) if node["children"] else 0
         
-        return valid_communities
+        return hierarchy
+    
+    def _add_hierarchy_node(self,
+                           hierarchy: List[Dict[str, Any]],
+                           members: Set[str],
+                           parent: Optional[int]) -> int:
+        """Append a community to the hierarchy and link it to its parent (level is set afterwards)."""
+        index = len(hierarchy)
+        hierarchy.append({
+            "members": members,
+            "level": 0,
+            "parent": parent,
+            "children": []
+        })
+        if parent is not None:
+            hierarchy[parent]["children"].append(index)
+        return index
     
     def _split_large_community(self,
                               community: Set[str],
-                              nx_graph: nx.Graph) -> List[Set[str]]:
-        """Split large community into smaller sub-communities."""
-        # Create subgraph for this community
-        subgraph = nx_graph.subgraph(community)
-        
-        # Find connected components in subgraph
-        components = list(nx.connected_components(subgraph))
-        
-        valid_splits = []
-        for component in components:
-            if len(component) >= self.min_community_size:
-                if len(component) <= self.max_community_size:
-                    valid_splits.append(component)
-                else:
-                    # Recursively split if still too large
-                    # (In practice, we'd use a more sophisticated method)
-                    valid_splits.append(set(list(component)[:self.max_community_size]))
-        
-        return valid_splits if valid_splits else [community]
-    
-    def _calculate_coherence(self, community: Set[str], nx_graph: nx.Graph) -> float:
+                              ig_graph: ig.Graph,
+                              hierarchy: List[Dict[str, Any]],
+                              depth: int,
+                              parent: Optional[int],
+                              resolution: Optional[float] = None) -> None:
         """
-        Calculate community coherence score.
-        Coherence = internal edges / possible internal edges
+        Split large community by re-running Leiden on its induced subgraph.
+        
+        The oversized community itself becomes a parent node and every
+        sub-community becomes its child. Sub-communities that are still too
+        large are refined recursively. Sub-communities smaller than
+        min_community_size are not added; their members stay members of the
+        parent only, so no member leaves the hierarchy although the leaves
+        may not cover all of them. Communities that cannot be split further
+        (or that reach max_hierarchy_levels) are kept whole as leaves.
         """
-        if len(community) <= 1:
-            return 1.0
-        
-        subgraph = nx_graph.subgraph(community)
-        internal_edges = subgraph.number_of_edges()
-        possible_edges = len(community) * (len(community) - 1) / 2
+        index = self._add_hierarchy_node(hierarchy, community, parent)
         
-        if possible_edges == 0:
-            return 0.0
+        if depth + 1 >= self.max_hierarchy_levels:
+            return
         
-        # Basic coherence
-        basic_coherence = internal_edges / possible_edges
+        sub_communities = self._partition_subgraph(community, ig_graph, resolution)
+        if len(sub_communities) <= 1:
+            return
         
-        # Weight by edge strengths
-        if internal_edges > 0:
-            avg_weight = sum(data.get('weight', 1.0) 
-                           for _, _, data in subgraph.edges(data=True)) / internal_edges
-            weighted_coherence = basic_coherence * avg_weight
-        else:
-            weighted_coherence = 0.0
-        
-        return weighted_coherence
+        for sub_community in sub_communities:
+            if len(sub_community) < self.min_community_size:
+                continue
+            if len(sub_community) > self.max_community_size:
+                self._split_large_community(sub_community, ig_graph, hierarchy, depth + 1, index,
+                                            resolution)
+            else:
+                self._add_hierarchy_node(hierarchy, sub_community, index)
     
-    async def _analyze_community(self,
-                                comm_id: int,
-                                community: Set[str],
-                                nx_graph: nx.Graph,
-                                all_entities: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Analyze a community and generate metadata."""
-        # Get entity details for community members
-        entity_map = {e["entity_id"]: e for e in all_entities}
-        community_entities = [entity_map[eid] for eid in community if eid in entity_map]
+    def _partition_subgraph(self,
+                           community: Set[str],
+                           ig_graph: ig.Graph,
+                           resolution: Optional[float] = None) -> List[Set[str]]:
+        """
+        Partition the induced subgraph of a community.
         
+        Runs Leiden on the subgraph first, then falls back to connected
+        components, then to progressively higher resolutions.
+        """
+        vertex_index = ig_graph["node_index"]
+        subgraph = ig_graph.induced_subgraph(sorted(vertex_index[node] for node in community))
+        original_ids = subgraph.vs["original_id"]
+        
+        def to_sets(groups) -> List[Set[str]]:
+            return [{original_ids[v] for v in group} for group in groups if len(group) > 0]
+        
+        base_resolution = self.resolution if resolution is None else resolution
+        sub_communities = to_sets(self._run_leiden(subgraph, base_resolution))
+        if len(sub_communities) > 1:
+            return sub_communities
+        
+        components = to_sets(subgraph.connected_components())
+        if len(components) > 1:
+            return components
+        
+        escalated = base_resolution
+        for _ in range(5):
+            escalated *= 2
+            sub_communities = to_sets(self._run_leiden(subgraph, escalated))
+            if len(sub_communities) > 1:
+                return sub_communities
+        
+        return [community]
+    
+    def _analyze_community(self,
+                          comm_id: int,
+                          community: Set[str],
+                          coherence: float,
+                          central_entities: List[str],
+                          type_counts: Dict[str, int],
+                          avg_confidence: float,
+                          entity_map: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """Build community metadata from precomputed statistics."""
         # Determine community type based on entity types
-        entity_types = [e.get("entity_type", "") for e in community_entities]
-        community_type = self._determine_community_type(entity_types)
-        
-        # Find central entities using degree centrality
-        subgraph = nx_graph.subgraph(community)
-        centrality = nx.degree_centrality(subgraph)
-        central_entities = sorted(centrality.keys(), 
-                                key=lambda x: centrality[x], 
-                                reverse=True)[:3]
-        
-        # Calculate coherence score
-        coherence = self._calculate_coherence(community, nx_graph)
+        community_type = self._determine_community_type(type_counts)
         
         # Generate description
         description = self._generate_community_description(
-            community_entities, community_type, central_entities, entity_map
+            sum(type_counts.values()), community_type, central_entities, entity_map
         )
         
         return {
@@ -357,23 +804,19 @@ class CommunityDetector:
             "central_entities": central_entities,
             "community_type": community_type,
             "metadata": {
-                "entity_types": dict(zip(*np.unique(entity_types, return_counts=True))),
-                "avg_confidence": np.mean([e.get("confidence", 0.95) for e in community_entities])
+                "entity_types": type_counts,
+                "avg_confidence": avg_confidence
             }
         }
     
-    def _determine_community_type(self, entity_types: List[str]) -> str:
+    def _determine_community_type(self, type_counts: Dict[str, int]) -> str:
         """Determine community type based on entity composition."""
-        if not entity_types:
+        if not type_counts:
             return "UNKNOWN"
         
-        type_counts = defaultdict(int)
-        for etype in entity_types:
-            type_counts[etype] += 1
-        
         # Get dominant type
         dominant_type = max(type_counts, key=type_counts.get)
-        dominant_ratio = type_counts[dominant_type] / len(entity_types)
+        dominant_ratio = type_counts[dominant_type] / sum(type_counts.values())
         
         # Legal-specific community types
         if dominant_type == "PARTY" and dominant_ratio > 0.6:
@@ -390,13 +833,13 @@ class CommunityDetector:
             return "MIXED_ENTITIES"
     
     def _generate_community_description(self,
-                                       community_entities: List[Dict[str, Any]],
+                                       entity_count: int,
                                        community_type: str,
                                        central_entities: List[str],
                                        entity_map: Dict[str, Dict[str, Any]]) -> str:
         """Generate human-readable community description."""
         if not central_entities:
-            return f"{community_type} community with {len(community_entities)} entities"
+            return f"{community_type} community with {entity_count} entities"
         
         # Get names of central entities
         central_names = []
@@ -420,25 +863,132 @@ class CommunityDetector:
                                                 relationships: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
         Calculate hierarchical community structure (Microsoft GraphRAG approach).
-        Detects communities at multiple resolution levels.
+        
+        Builds the graph once and recursively re-runs Leiden on the induced
+        subgraph of every oversized community. Level 0 holds the finest
+        (leaf) communities and each higher level their coarser parents.
         """
+        communities, metadata = await self.detect_communities(entities, relationships)
+        
+        communities_by_level = defaultdict(list)
+        for community in communities:
+            communities_by_level[community.get("level", 0)].append(community)
+        
         hierarchical_communities = []
+        for level in sorted(communities_by_level):
+            hierarchical_communities.append({
+                "level": level,
+                "resolution": self.resolution,
+                "communities": communities_by_level[level],
+                "metadata": metadata
+            })
+        
+        return hierarchical_communities
+    
+    async def sweep_resolutions(self,
+                                entities: List[Dict[str, Any]],
+                                relationships: List[Dict[str, Any]],
+                                resolutions: Optional[List[float]] = None,
+                                citations: Optional[List[Dict[str, Any]]] = None,
+                                best_only: bool = False,
+                                max_workers: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Run Leiden at several resolutions in parallel and score each partition.
         
-        # Try different resolution parameters
-        resolutions = [0.5, 1.0, 1.5, 2.0]
+        The graph is built once; each resolution runs in the shared worker
+        process pool on a plain edge list, so detector state is never mutated. Every partition
+        is refined and analyzed like detect_communities and scored by
+        modularity, the share of entities in communities within the size
+        bounds, and size-weighted coherence (see SWEEP_SCORE_WEIGHTS).
         
-        for resolution in resolutions:
-            self.resolution = resolution
-            communities, metadata = await self.detect_communities(
-                entities, relationships
-            )
+        Args:
+            entities: List of deduplicated entities
+            relationships: List of entity relationships
+            resolutions: Resolutions to try (DEFAULT_SWEEP_RESOLUTIONS if omitted)
+            citations: Optional list of citations for enhanced detection
+            best_only: Return only the highest-scoring level
+            max_workers: Resolutions run at once (defaults to the pool size)
+            
+        Returns:
+            Levels sorted by resolution, each with resolution, score, scores,
+            is_best, communities and metadata (or just the best level)
+        """
+        resolutions = sorted(set(resolutions or self.DEFAULT_SWEEP_RESOLUTIONS))
+        if len(entities) < self.min_community_size:
+            return []
+        
+        nx_graph = self._build_networkx_graph(entities, relationships, citations)
+        if nx_graph.number_of_edges() == 0:
+            return []
+        ig_graph = self._convert_to_igraph(nx_graph)
+        
+        edges = ig_graph.get_edgelist()
+        weights = ig_graph.es['weight']
+        memberships = await map_in_process_pool(
+            _leiden_membership,
+            [(ig_graph.vcount(), edges, weights, resolution) for resolution in resolutions],
+            max_concurrency=max_workers
+        )
+        
+        levels = []
+        for resolution, membership in zip(resolutions, memberships):
+            partition = ig.VertexClustering(ig_graph, membership)
+            raw_communities = self._extract_communities(partition, ig_graph, nx_graph)
+            hierarchy = self._filter_communities(raw_communities, ig_graph, resolution=resolution)
+            communities = self._build_community_infos(hierarchy, ig_graph, entities)
+            scores = self._score_partition(ig_graph, membership, raw_communities, communities)
             
-            if communities:
-                hierarchical_communities.append({
-                    "level": f"resolution_{resolution}",
-                    "resolution": resolution,
-                    "communities": communities,
-                    "metadata": metadata
-                })
-        
-        return hierarchical_communities
\ No newline at end of file
+            levels.append({
+                "resolution": resolution,
+                "score": scores.pop("score"),
+                "scores": scores,
+                "is_best": False,
+                "communities": communities,
+                "metadata": {
+                    "total_entities": len(entities),
+                    "total_relationships": len(relationships),
+                    "raw_communities_found": len(raw_communities),
+                    "valid_communities": len(communities),
+                    "leaf_communities": sum(1 for node in hierarchy if not node["children"]),
+                    "hierarchy_levels": max((node["level"] for node in hierarchy), default=-1) + 1,
+                    "resolution_used": resolution,
+                    "graph_metrics": self._graph_metrics(nx_graph)
+                }
+            })
+        
+        best = max(levels, key=lambda level: level["score"])
+        best["is_best"] = True
+        return [best] if best_only else levels
+    
+    def _score_partition(self,
+                         ig_graph: ig.Graph,
+                         membership: List[int],
+                         raw_communities: List[Set[str]],
+                         communities: List[Dict[str, Any]]) -> Dict[str, float]:
+        """Score a partition for resolution selection (all components in [0, 1])."""
+        modularity = max(0.0, ig_graph.modularity(membership, weights='weight'))
+        
+        total = sum(len(community) for community in raw_communities)
+        in_bounds = sum(
+            len(community) for community in raw_communities
+            if self.min_community_size <= len(community) <= self.max_community_size
+        )
+        size_score = in_bounds / total if total else 0.0
+        
+        top_level = [c for c in communities if c["parent_community_id"] is None]
+        top_level_size = sum(c["entity_count"] for c in top_level)
+        coherence = min(1.0, sum(
+            c["coherence_score"] * c["entity_count"] for c in top_level
+        ) / top_level_size) if top_level_size else 0.0
+        
+        weights = self.SWEEP_SCORE_WEIGHTS
+        return {
+            "score": round(
+                weights["modularity"] * modularity
+                + weights["size"] * size_score
+                + weights["coherence"] * coherence, 4
+            ),
+            "modularity": round(modularity, 4),
+            "size_score": round(size_score, 4),
+            "coherence": round(coherence, 4)
+        }
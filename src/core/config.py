@@ -31,6 +31,10 @@ class GraphRAGSettings(BaseSettings):
     legal_entity_boost: float = 1.2  # Boost for legal entity matching
     citation_relationship_weight: float = 2.0  # Weight for citation relationships
     court_hierarchy_weight: float = 1.5  # Weight for court hierarchy relationships
+    relationship_strategy_time_budget: float = 0.0  # Seconds per relationship discovery strategy (0 = unlimited)
+    max_edges_per_node: int = 0  # Top-k relationships kept per entity after discovery (0 = no cap)
+    edge_prune_rule: str = "both"  # "both": hard per-entity cap; "either": keep edges in one endpoint's top-k (hubs uncapped)
+    max_citation_fanout: int = 20  # CITED_TOGETHER edges per cited entity and citation (0 = unbounded)
     
     # Performance parameters
     batch_size: int = 100  # Batch size for bulk operations
@@ -38,6 +42,27 @@ class GraphRAGSettings(BaseSettings):
     max_graph_edges: int = 50000  # Maximum edges in a single graph
     processing_timeout: int = 120  # Timeout in seconds for graph processing
     
+    # Tenant-scale graph loading (case-wide jobs streamed from the database)
+    tenant_graph_page_size: int = 1000  # Rows per keyset page when streaming graph tables
+    tenant_graph_max_nodes: int = 250000  # Memory guard: abort loads above this many nodes
+    tenant_graph_max_edges: int = 1000000  # Memory guard: abort loads above this many edges
+    tenant_graph_write_batch_size: int = 1000  # Rows per bulk write from tenant-wide jobs
+    tenant_centrality_max_tenants: int = 16  # Tenant graphs kept in memory for incremental centrality
+    tenant_centrality_write_tolerance: float = 0.01  # Relative PageRank change that triggers a node write
+    
+    # Graph analytics tiers
+    analytics_tier: str = "standard"  # minimal, standard or full
+    analytics_time_budget: float = 2.0  # Seconds before remaining expensive metrics are skipped
+    analytics_approximation_threshold: int = 500  # Nodes above which approximate metrics are used
+    analytics_betweenness_samples: int = 100  # Pivots for sampled betweenness centrality
+    analytics_backend: str = "igraph"  # networkx (reference) or igraph (C core + SciPy sparse)
+    analytics_component_parallel_threshold: int = 2000  # Nodes above which components are analyzed in worker processes
+    
+    # Tenant analytics materialization
+    tenant_analytics_tier: str = "standard"  # Default tier for tenant-level analytics jobs
+    tenant_analytics_time_budget: float = 30.0  # Seconds per tenant before expensive metrics are skipped
+    tenant_analytics_refresh_interval: int = 0  # Seconds between stale-tenant refreshes (0 = on demand only)
+    
     # Quality metrics thresholds
     min_graph_completeness: float = 0.5  # Minimum acceptable completeness
     min_entity_confidence: float = 0.6  # Minimum confidence for entity inclusion
@@ -50,11 +75,52 @@ class GraphRAGSettings(BaseSettings):
     max_connections: int = int(os.getenv("SUPABASE_MAX_CONNECTIONS", "30"))
     
     prompt_service_url: str = os.getenv("PROMPT_SERVICE_URL", "http://localhost:8003")
+    embeddings_service_url: str = os.getenv("EMBEDDINGS_SERVICE_URL", "http://localhost:8081")
+    
+    # Query embeddings
+    embedding_provider: str = "http"  # "http" (embeddings service) or "local" (deterministic stub)
+    embedding_model: str = "jinaai/jina-embeddings-v4-vllm-code"
+    embedding_dimensions: int = 1536  # Must match the pgvector columns
+    embedding_timeout: float = 10.0  # Seconds per embeddings request
+    embedding_max_connections: int = 20  # Pooled connections to the embeddings service
+    embedding_cache_size: int = 10000  # Cached query embeddings (LRU, expires after cache_ttl)
+    embedding_batch_window_ms: float = 5.0  # Window for coalescing concurrent embedding requests
+    embedding_max_batch_size: int = 32  # Texts per embeddings request
     log_service_url: str = os.getenv("LOG_SERVICE_URL", "http://localhost:8001")
     
     # Caching configuration
     enable_cache: bool = True
     cache_ttl: int = 3600  # Cache TTL in seconds
+    search_cache_max_entries: int = 1000  # Cached search results across all tenants
+    search_cache_tenant_quota_mb: float = 16.0  # Cached search result memory per client_id
+    
+    # Multi-scope search (SearchScope.ALL) fusion
+    rrf_k: int = 60  # Reciprocal rank fusion constant
+    scope_weight_nodes: float = 1.0  # RRF weight of node matches
+    scope_weight_chunks: float = 1.0  # RRF weight of chunk matches
+    scope_weight_communities: float = 0.5  # RRF weight of community summary matches
+    
+    # Batch search
+    search_batch_max_queries: int = 50  # Queries accepted per batch request
+    search_batch_concurrency: int = 8  # Concurrent searches per batch request
+    
+    # In-process vector index (offloads chunk/node semantic search from pgvector)
+    enable_vector_index: bool = False
+    vector_index_max_tenants: int = 32  # Tenant indexes kept in memory (LRU)
+    vector_index_max_rows: int = 200000  # Larger tenants stay on the RPC
+    vector_index_max_bytes: int = 1 << 30  # Memory budget for all indexes' vector arrays
+    vector_index_ttl: float = 900.0  # Seconds before an index is reloaded in the background
+    vector_index_ivf_min_rows: int = 10000  # Switch from exact scan to IVF lists
+    vector_index_nprobe: int = 8  # IVF lists scanned per query
+    
+    # Graph expansion of search hits (k-hop neighbours over cached tenant adjacency)
+    local_search_expand_hops: int = 1  # Default expansion depth for local search (0 = off)
+    graph_expansion_seed_count: int = 5  # Top hits used as expansion seeds
+    graph_expansion_max_neighbors: int = 20  # Neighbours returned with the results
+    graph_expansion_hop_decay: float = 0.5  # Score multiplier per additional hop
+    graph_expansion_importance_weight: float = 0.5  # Weight of rank_score in neighbour scores
+    adjacency_cache_max_tenants: int = 16  # Tenant adjacencies kept in memory (LRU)
+    adjacency_cache_ttl: float = 900.0  # Seconds before a cached adjacency is reloaded
     
     # Monitoring
     enable_metrics: bool = True
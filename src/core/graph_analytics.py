@@ -4,27 +4,130 @@ Computes graph metrics, centrality scores, and quality assessments
 """
 
 import asyncio
-from typing import List, Dict, Any, Tuple, Optional
-import networkx as nx
+import hashlib
+import os
+import time
+from typing import List, Dict, Any, Tuple, Optional, Callable
 import numpy as np
-from collections import defaultdict, Counter
+from collections import defaultdict, Counter, OrderedDict
+
+from .graph_backends import GRAPH_BACKENDS, build_graph_inputs
+from .worker_pool import map_in_process_pool
+
+
+def _component_metrics(backend: str,
+                       node_ids: List[str],
+                       edges: Dict[Tuple[str, str], float],
+                       exact: bool,
+                       include_closeness: bool) -> Dict[str, Any]:
+    """
+    Distance metrics of one connected component.
+    
+    Module-level so it can be pickled into worker processes. Exact components
+    get all-pairs diameter, radius and closeness; larger ones fall back to the
+    double-sweep bounds and no closeness.
+    """
+    graph = GRAPH_BACKENDS[backend](node_ids, edges)
+    if exact:
+        diameter, radius = graph.diameter(), graph.radius()
+    else:
+        diameter, radius = graph.double_sweep()
+    return {
+        "nodes": len(node_ids),
+        "edges": len(edges),
+        "diameter": diameter,
+        "radius": radius,
+        "exact": exact,
+        "closeness": graph.closeness_centrality() if exact and include_closeness else None
+    }
 
 
 class GraphAnalytics:
     """
     Computes comprehensive graph analytics and quality metrics.
     Implements legal-specific metrics and Microsoft GraphRAG quality scoring.
+    
+    Analytics run in tiers: "minimal" (counts, degree, PageRank), "standard"
+    (adds clustering, bridges, eigenvector, betweenness, closeness, diameter)
+    and "full" (adds node/edge connectivity). Above approximation_threshold
+    nodes, betweenness is sampled from k pivots, diameter/radius come from a
+    double BFS sweep and PageRank uses a looser tolerance; closeness and
+    connectivity are skipped. Expensive metrics still pending when the time
+    budget runs out are skipped. Each result reports what was approximated
+    or skipped in "analytics_profile".
+    
+    Disconnected graphs are decomposed into connected components: diameter,
+    radius and closeness run exactly on each component (in worker processes
+    once the graph has component_parallel_threshold nodes) and are
+    aggregated, with the threshold applied per component rather than to the
+    whole graph. Per-component results are reported in "component_analysis".
+    
+    Algorithms run on a pluggable backend built once per analysis from node
+    ids and edge weights only: "networkx" (reference implementation) or
+    "igraph" (igraph C core plus SciPy sparse power iterations).
+    
+    Expensive metrics are memoized in metrics_cache under a structural
+    fingerprint of the graph (node set, edge set and weights), so repeated
+    analyses and calculate_importance_scores on the same graph reuse them.
+    The cache keeps the most recent max_cached_graphs graphs and can be
+    cleared with invalidate_cache.
     """
     
-    def __init__(self):
-        """Initialize graph analytics engine."""
+    TIERS = ("minimal", "standard", "full")
+    
+    def __init__(self,
+                 tier: str = "standard",
+                 time_budget_seconds: Optional[float] = None,
+                 approximation_threshold: int = 500,
+                 betweenness_samples: int = 100,
+                 pagerank_tol: float = 1e-6,
+                 approximate_pagerank_tol: float = 1e-4,
+                 backend: str = "networkx",
+                 max_cached_graphs: int = 8,
+                 component_parallel_threshold: int = 2000,
+                 max_workers: Optional[int] = None):
+        """
+        Initialize graph analytics engine.
+        
+        Args:
+            tier: Default analytics tier (minimal, standard, full)
+            time_budget_seconds: Default time budget per analysis (None = unbounded)
+            approximation_threshold: Node count above which approximations are used
+            betweenness_samples: Pivot count for sampled betweenness
+            pagerank_tol: PageRank convergence tolerance for exact runs
+            approximate_pagerank_tol: PageRank tolerance above the threshold
+            backend: Graph algorithm backend (networkx, igraph)
+            max_cached_graphs: Number of graph fingerprints kept in metrics_cache
+            component_parallel_threshold: Node count above which components run in worker processes
+            max_workers: Components analyzed at once in the shared worker pool (defaults to the pool size)
+        """
+        if tier not in self.TIERS:
+            raise ValueError(f"Unknown analytics tier: {tier}")
+        if backend not in GRAPH_BACKENDS:
+            raise ValueError(f"Unknown analytics backend: {backend}")
+        self.backend = backend
         self.graph = None
-        self.metrics_cache = {}
+        self.graph_inputs: Tuple[List[str], Dict[Tuple[str, str], float]] = ([], {})
+        self.entity_index = {}
+        self.fingerprint = None
+        self.metrics_cache: OrderedDict = OrderedDict()
+        self.max_cached_graphs = max_cached_graphs
+        self.tier = tier
+        self.time_budget_seconds = time_budget_seconds
+        self.approximation_threshold = approximation_threshold
+        self.betweenness_samples = betweenness_samples
+        self.pagerank_tol = pagerank_tol
+        self.approximate_pagerank_tol = approximate_pagerank_tol
+        self.component_parallel_threshold = component_parallel_threshold
+        self.max_workers = max_workers
+        self.profile = self._new_profile(tier, time_budget_seconds)
         
     async def analyze_graph(self,
                            entities: List[Dict[str, Any]],
                            relationships: List[Dict[str, Any]],
-                           communities: List[Dict[str, Any]]) -> Dict[str, Any]:
+                           communities: List[Dict[str, Any]],
+                           tier: Optional[str] = None,
+                           time_budget_seconds: Optional[float] = None) -> Dict[str, Any]:
         """
         Perform comprehensive graph analysis.
         
@@ -32,16 +135,27 @@ class GraphAnalytics:
             entities: List of graph entities
             relationships: List of relationships
             communities: List of detected communities
+            tier: Analytics tier override (minimal, standard, full)
+            time_budget_seconds: Time budget override in seconds
             
         Returns:
             Dictionary of analytics results
         """
-        # Build NetworkX graph
+        tier = tier or self.tier
+        if tier not in self.TIERS:
+            raise ValueError(f"Unknown analytics tier: {tier}")
+        self.profile = self._new_profile(
+            tier, time_budget_seconds if time_budget_seconds is not None else self.time_budget_seconds
+        )
+        
+        # Build the backend graph once
         self.graph = self._build_graph(entities, relationships)
+        self.entity_index = {e["entity_id"]: e for e in entities}
         
         # Compute various analytics
         analytics = {
             "basic_metrics": await self._compute_basic_metrics(),
+            "component_analysis": await self._compute_component_metrics(),
             "centrality_analysis": await self._compute_centrality_metrics(),
             "connectivity_analysis": await self._compute_connectivity_metrics(),
             "community_analysis": await self._analyze_communities(communities),
@@ -53,65 +167,241 @@ class GraphAnalytics:
         # Compute top entities and relationships
         analytics["top_entities"] = self._get_top_entities(analytics["centrality_analysis"])
         analytics["relationship_distribution"] = self._analyze_relationship_distribution(relationships)
+        analytics["analytics_profile"] = self._finish_profile()
         
         return analytics
     
-    def _build_graph(self, 
-                    entities: List[Dict[str, Any]], 
-                    relationships: List[Dict[str, Any]]) -> nx.Graph:
-        """Build NetworkX graph from entities and relationships."""
-        G = nx.Graph()
+    def _new_profile(self, tier: str, time_budget_seconds: Optional[float]) -> Dict[str, Any]:
+        """Create the bookkeeping record for one analytics run."""
+        started = time.perf_counter()
+        return {
+            "tier": tier,
+            "time_budget_seconds": time_budget_seconds,
+            "started": started,
+            "deadline": started + time_budget_seconds if time_budget_seconds is not None else None,
+            "approximate_metrics": [],
+            "skipped_metrics": [],
+            "cache_hits": 0
+        }
+    
+    def _finish_profile(self) -> Dict[str, Any]:
+        """Summarize the current run for the response."""
+        return {
+            "tier": self.profile["tier"],
+            "graph_fingerprint": self.fingerprint,
+            "cache_hits": self.profile["cache_hits"],
+            "time_budget_seconds": self.profile["time_budget_seconds"],
+            "elapsed_seconds": round(time.perf_counter() - self.profile["started"], 4),
+            "approximation_threshold": self.approximation_threshold,
+            "approximate_metrics": list(self.profile["approximate_metrics"]),
+            "skipped_metrics": list(self.profile["skipped_metrics"])
+        }
+    
+    def _should_compute(self, metric: str, minimum_tier: str = "minimal") -> bool:
+        """Check tier and remaining time budget for an expensive metric."""
+        if self.TIERS.index(self.profile["tier"]) < self.TIERS.index(minimum_tier):
+            return False
+        deadline = self.profile["deadline"]
+        if deadline is not None and time.perf_counter() > deadline:
+            self.profile["skipped_metrics"].append(metric)
+            return False
+        return True
+    
+    def _memoized(self, metric: str, compute: Callable, **params) -> Any:
+        """Return a metric of the current graph, computing it at most once per fingerprint."""
+        entry = self.metrics_cache.get(self.fingerprint)
+        if entry is None:
+            entry = self.metrics_cache[self.fingerprint] = {}
+            while len(self.metrics_cache) > self.max_cached_graphs:
+                self.metrics_cache.popitem(last=False)
+        else:
+            self.metrics_cache.move_to_end(self.fingerprint)
         
-        # Add nodes
-        for entity in entities:
-            G.add_node(
-                entity["entity_id"],
-                **{k: v for k, v in entity.items() if k != "entity_id"}
-            )
-        
-        # Add edges
-        for rel in relationships:
-            if (rel.get("source_entity") in G.nodes and 
-                rel.get("target_entity") in G.nodes):
-                G.add_edge(
-                    rel["source_entity"],
-                    rel["target_entity"],
-                    weight=rel.get("confidence", 0.8),
-                    relationship_type=rel.get("relationship_type", ""),
-                    **{k: v for k, v in rel.items() 
-                       if k not in ["source_entity", "target_entity", "confidence", "relationship_type"]}
-                )
+        key = (metric, tuple(sorted(params.items())))
+        if key in entry:
+            self.profile["cache_hits"] += 1
+        else:
+            entry[key] = compute(**params)
+        return entry[key]
+    
+    async def _memoized_async(self, metric: str, compute: Callable, **params) -> Any:
+        """_memoized for metrics computed by a coroutine function."""
+        entry = self.metrics_cache.get(self.fingerprint) or {}
+        key = (metric, tuple(sorted(params.items())))
+        if key in entry:
+            return self._memoized(metric, compute, **params)
+        value = await compute(**params)
+        return self._memoized(metric, lambda **_: value, **params)
+    
+    def invalidate_cache(self, fingerprint: Optional[str] = None) -> None:
+        """Drop memoized metrics for one graph fingerprint, or for all graphs."""
+        if fingerprint is None:
+            self.metrics_cache.clear()
+        else:
+            self.metrics_cache.pop(fingerprint, None)
+    
+    @staticmethod
+    def _graph_fingerprint(node_ids: List[str], edges: Dict[Tuple[str, str], float]) -> str:
+        """Order-independent hash of the node set, edge set and edge weights."""
+        digest = hashlib.blake2b(digest_size=16)
+        for node_id in sorted(node_ids):
+            digest.update(f"{node_id}\0".encode())
+        digest.update(b"\1")
+        for source, target, weight in sorted(
+            (min(u, v), max(u, v), w) for (u, v), w in edges.items()
+        ):
+            digest.update(f"{source}\0{target}\0{weight!r}\n".encode())
+        return digest.hexdigest()
+    
+    async def _component_breakdown(self) -> Dict[str, Any]:
+        """
+        Run diameter, radius and closeness on every component with at least one edge.
         
-        return G
+        Closeness is rescaled to whole-graph values with the Wasserman-Faust
+        factor (component size - 1) / (n - 1), which is exactly what NetworkX
+        returns for a disconnected graph. It is None if any component was too
+        large to handle exactly. Isolated nodes have closeness 0.
+        """
+        node_ids, edges = self.graph_inputs
+        n = len(node_ids)
+        
+        component_of = {}
+        components = sorted(self.graph.components(), key=len, reverse=True)
+        for idx, component in enumerate(components):
+            for node_id in component:
+                component_of[node_id] = idx
+        component_edges = [dict() for _ in components]
+        for (u, v), weight in edges.items():
+            component_edges[component_of[u]][(u, v)] = weight
+        
+        tasks = [
+            (self.backend, sorted(component), component_edges[idx],
+             len(component) <= self.approximation_threshold, True)
+            for idx, component in enumerate(components)
+            if len(component) > 1
+        ]
+        
+        workers = min(len(tasks), self.max_workers or os.cpu_count() or 1)
+        parallel = workers > 1 and sum(len(task[1]) for task in tasks) >= self.component_parallel_threshold
+        if parallel:
+            results = await map_in_process_pool(_component_metrics, tasks, max_concurrency=workers)
+        else:
+            results = await asyncio.to_thread(lambda: [_component_metrics(*task) for task in tasks])
+        
+        closeness = None
+        if all(result["exact"] for result in results):
+            closeness = {node_id: 0.0 for node_id in node_ids}
+            for result in results:
+                scale = (result["nodes"] - 1) / (n - 1)
+                for node_id, value in result.pop("closeness").items():
+                    closeness[node_id] = value * scale
+        for result in results:
+            result.pop("closeness", None)
+        
+        return {
+            "components": results,
+            "isolated_nodes": sum(1 for component in components if len(component) == 1),
+            "exact": all(result["exact"] for result in results),
+            "parallel": parallel,
+            "closeness": closeness
+        }
+    
+    async def _compute_component_metrics(self) -> Dict[str, Any]:
+        """Aggregate per-component distance metrics for disconnected graphs."""
+        if not self.graph or self.graph.number_of_nodes() == 0 or self.graph.is_connected():
+            return {}
+        if not self._should_compute("component_analysis", "standard"):
+            return {}
+        
+        breakdown = await self._memoized_async("component_breakdown", self._component_breakdown)
+        components = breakdown["components"]
+        if not components:
+            return {"num_components": breakdown["isolated_nodes"], "isolated_nodes": breakdown["isolated_nodes"]}
+        
+        sizes = np.array([c["nodes"] for c in components], dtype=np.float64)
+        return {
+            "num_components": len(components) + breakdown["isolated_nodes"],
+            "non_trivial_components": len(components),
+            "isolated_nodes": breakdown["isolated_nodes"],
+            "max_diameter": max(c["diameter"] for c in components),
+            "size_weighted_diameter": float(np.average([c["diameter"] for c in components], weights=sizes)),
+            "size_weighted_radius": float(np.average([c["radius"] for c in components], weights=sizes)),
+            "exact": breakdown["exact"],
+            "parallel": breakdown["parallel"],
+            "components": components[:10]  # Largest first, limited to first 10
+        }
+    
+    def _is_large_graph(self) -> bool:
+        """Whether exact all-pairs style metrics should be approximated."""
+        return self.graph.number_of_nodes() > self.approximation_threshold
+    
+    def _mark_approximate(self, metric: str) -> None:
+        self.profile["approximate_metrics"].append(metric)
+    
+    def _mark_skipped(self, metric: str) -> None:
+        self.profile["skipped_metrics"].append(metric)
+    
+    def _build_graph(self, 
+                    entities: List[Dict[str, Any]], 
+                    relationships: List[Dict[str, Any]]):
+        """Build the backend graph from entity ids and relationship weights."""
+        node_ids, edges = build_graph_inputs(entities, relationships)
+        self.graph_inputs = (node_ids, edges)
+        self.fingerprint = self._graph_fingerprint(node_ids, edges)
+        return GRAPH_BACKENDS[self.backend](node_ids, edges)
     
     async def _compute_basic_metrics(self) -> Dict[str, Any]:
         """Compute basic graph metrics."""
         if not self.graph:
             return {}
         
+        is_connected = self.graph.number_of_nodes() > 0 and self.graph.is_connected()
         metrics = {
             "nodes": self.graph.number_of_nodes(),
             "edges": self.graph.number_of_edges(),
-            "density": nx.density(self.graph) if self.graph.number_of_nodes() > 0 else 0,
-            "average_degree": sum(dict(self.graph.degree()).values()) / self.graph.number_of_nodes() 
+            "density": self.graph.density() if self.graph.number_of_nodes() > 0 else 0,
+            "average_degree": sum(self.graph.degrees().values()) / self.graph.number_of_nodes() 
                             if self.graph.number_of_nodes() > 0 else 0,
-            "components": nx.number_connected_components(self.graph),
-            "is_connected": nx.is_connected(self.graph),
-            "diameter": nx.diameter(self.graph) if nx.is_connected(self.graph) else -1,
-            "radius": nx.radius(self.graph) if nx.is_connected(self.graph) else -1
+            "components": len(self.graph.components()),
+            "is_connected": is_connected,
+            "diameter": -1,
+            "radius": -1
         }
         
-        # Clustering coefficient
-        try:
-            metrics["clustering_coefficient"] = nx.average_clustering(self.graph)
-        except:
-            metrics["clustering_coefficient"] = 0.0
+        # Diameter and radius (all-pairs; double-sweep bounds on large graphs).
+        # Disconnected graphs report the largest component diameter and the
+        # smallest radius among components with at least one edge.
+        if metrics["nodes"] > 0 and self._should_compute("diameter", "standard"):
+            if not is_connected:
+                breakdown = await self._memoized_async("component_breakdown", self._component_breakdown)
+                if breakdown["components"]:
+                    metrics["diameter"] = max(c["diameter"] for c in breakdown["components"])
+                    metrics["radius"] = min(c["radius"] for c in breakdown["components"])
+                    if not breakdown["exact"]:
+                        self._mark_approximate("diameter")
+                        self._mark_approximate("radius")
+            elif self._is_large_graph():
+                metrics["diameter"], metrics["radius"] = self._memoized("double_sweep", self.graph.double_sweep)
+                self._mark_approximate("diameter")
+                self._mark_approximate("radius")
+            else:
+                metrics["diameter"] = self._memoized("diameter", self.graph.diameter)
+                metrics["radius"] = self._memoized("radius", self.graph.radius)
         
-        # Transitivity
-        try:
-            metrics["transitivity"] = nx.transitivity(self.graph)
-        except:
-            metrics["transitivity"] = 0.0
+        # Clustering coefficient
+        metrics["clustering_coefficient"] = 0.0
+        metrics["transitivity"] = 0.0
+        if self._should_compute("clustering_coefficient", "standard"):
+            try:
+                metrics["clustering_coefficient"] = self._memoized("average_clustering", self.graph.average_clustering)
+            except:
+                metrics["clustering_coefficient"] = 0.0
+            
+            # Transitivity
+            try:
+                metrics["transitivity"] = self._memoized("transitivity", self.graph.transitivity)
+            except:
+                metrics["transitivity"] = 0.0
         
         return metrics
     
@@ -123,7 +413,7 @@ class GraphAnalytics:
         centrality_metrics = {}
         
         # Degree centrality
-        degree_centrality = nx.degree_centrality(self.graph)
+        degree_centrality = self._memoized("degree_centrality", self.graph.degree_centrality)
         centrality_metrics["degree_centrality"] = {
             "values": degree_centrality,
             "mean": np.mean(list(degree_centrality.values())),
@@ -131,9 +421,18 @@ class GraphAnalytics:
             "max": max(degree_centrality.values()) if degree_centrality else 0
         }
         
-        # Betweenness centrality (computationally expensive for large graphs)
-        if self.graph.number_of_nodes() < 1000:
-            betweenness = nx.betweenness_centrality(self.graph)
+        # Betweenness centrality (sampled from k pivots on large graphs)
+        if self._should_compute("betweenness_centrality", "standard"):
+            if self._is_large_graph():
+                betweenness = self._memoized(
+                    "betweenness_centrality",
+                    self.graph.betweenness_centrality,
+                    k=min(self.betweenness_samples, self.graph.number_of_nodes()),
+                    seed=42
+                )
+                self._mark_approximate("betweenness_centrality")
+            else:
+                betweenness = self._memoized("betweenness_centrality", self.graph.betweenness_centrality)
             centrality_metrics["betweenness_centrality"] = {
                 "values": betweenness,
                 "mean": np.mean(list(betweenness.values())),
@@ -141,31 +440,44 @@ class GraphAnalytics:
                 "max": max(betweenness.values()) if betweenness else 0
             }
         
-        # Closeness centrality (only for connected components)
-        if nx.is_connected(self.graph):
-            closeness = nx.closeness_centrality(self.graph)
-            centrality_metrics["closeness_centrality"] = {
-                "values": closeness,
-                "mean": np.mean(list(closeness.values())),
-                "std": np.std(list(closeness.values())),
-                "max": max(closeness.values()) if closeness else 0
-            }
+        # Closeness centrality (all-pairs, so skipped on large graphs; per component when disconnected)
+        if self._should_compute("closeness_centrality", "standard"):
+            if self.graph.is_connected():
+                closeness = None if self._is_large_graph() else self._memoized(
+                    "closeness_centrality", self.graph.closeness_centrality
+                )
+            else:
+                closeness = (await self._memoized_async("component_breakdown", self._component_breakdown))["closeness"]
+            if closeness is None:
+                self._mark_skipped("closeness_centrality")
+            else:
+                centrality_metrics["closeness_centrality"] = {
+                    "values": closeness,
+                    "mean": np.mean(list(closeness.values())),
+                    "std": np.std(list(closeness.values())),
+                    "max": max(closeness.values()) if closeness else 0
+                }
         
         # Eigenvector centrality
-        try:
-            eigenvector = nx.eigenvector_centrality(self.graph, max_iter=100)
-            centrality_metrics["eigenvector_centrality"] = {
-                "values": eigenvector,
-                "mean": np.mean(list(eigenvector.values())),
-                "std": np.std(list(eigenvector.values())),
-                "max": max(eigenvector.values()) if eigenvector else 0
-            }
-        except:
-            centrality_metrics["eigenvector_centrality"] = {"error": "Could not compute"}
+        if self._should_compute("eigenvector_centrality", "standard"):
+            try:
+                eigenvector = self._memoized("eigenvector_centrality", self.graph.eigenvector_centrality, max_iter=100)
+                centrality_metrics["eigenvector_centrality"] = {
+                    "values": eigenvector,
+                    "mean": np.mean(list(eigenvector.values())),
+                    "std": np.std(list(eigenvector.values())),
+                    "max": max(eigenvector.values()) if eigenvector else 0
+                }
+            except:
+                centrality_metrics["eigenvector_centrality"] = {"error": "Could not compute"}
         
-        # PageRank
+        # PageRank (looser tolerance on large graphs)
         try:
-            pagerank = nx.pagerank(self.graph)
+            if self._is_large_graph():
+                pagerank = self._memoized("pagerank", self.graph.pagerank, tol=self.approximate_pagerank_tol)
+                self._mark_approximate("pagerank")
+            else:
+                pagerank = self._memoized("pagerank", self.graph.pagerank, tol=self.pagerank_tol)
             centrality_metrics["pagerank"] = {
                 "values": pagerank,
                 "mean": np.mean(list(pagerank.values())),
@@ -185,22 +497,29 @@ class GraphAnalytics:
         metrics = {}
         
         # Connected components
-        components = list(nx.connected_components(self.graph))
+        components = self.graph.components()
         metrics["num_components"] = len(components)
         metrics["largest_component_size"] = max(len(c) for c in components) if components else 0
         metrics["component_sizes"] = sorted([len(c) for c in components], reverse=True)
         
-        # Node connectivity (for connected graphs)
-        if nx.is_connected(self.graph):
-            metrics["node_connectivity"] = nx.node_connectivity(self.graph)
-            metrics["edge_connectivity"] = nx.edge_connectivity(self.graph)
+        # Node connectivity (for connected graphs; max-flow based, full tier and small graphs only)
+        if self.graph.is_connected() and self._should_compute("node_connectivity", "full"):
+            if self._is_large_graph():
+                self._mark_skipped("node_connectivity")
+                self._mark_skipped("edge_connectivity")
+            else:
+                metrics["node_connectivity"] = self._memoized("node_connectivity", self.graph.node_connectivity)
+                metrics["edge_connectivity"] = self._memoized("edge_connectivity", self.graph.edge_connectivity)
+        
+        if not self._should_compute("bridges", "standard"):
+            return metrics
         
         # Bridges and articulation points
-        bridges = list(nx.bridges(self.graph))
+        bridges = self._memoized("bridges", self.graph.bridges)
         metrics["num_bridges"] = len(bridges)
         metrics["bridges"] = bridges[:10]  # Limit to first 10
         
-        articulation_points = list(nx.articulation_points(self.graph))
+        articulation_points = self._memoized("articulation_points", self.graph.articulation_points)
         metrics["num_articulation_points"] = len(articulation_points)
         metrics["articulation_points"] = articulation_points[:10]  # Limit to first 10
         
@@ -208,7 +527,7 @@ class GraphAnalytics:
         # Only compute for graphs with sufficient edges to avoid division by zero warnings
         if self.graph.number_of_edges() > 2:
             try:
-                metrics["degree_assortativity"] = nx.degree_assortativity_coefficient(self.graph)
+                metrics["degree_assortativity"] = self._memoized("degree_assortativity", self.graph.degree_assortativity)
             except:
                 metrics["degree_assortativity"] = None
         else:
@@ -231,22 +550,23 @@ class GraphAnalytics:
         
         # Modularity calculation (if we have node-to-community mapping)
         if self.graph and communities:
-            # Create partition dictionary
+            # Create partition dictionary from leaf communities (hierarchy parents overlap their children)
             partition = {}
             for idx, community in enumerate(communities):
+                if community.get("child_community_ids"):
+                    continue
                 for entity_id in community.get("entity_ids", []):
-                    if entity_id in self.graph.nodes:
+                    if self.graph.has_node(entity_id):
                         partition[entity_id] = idx
             
             # Calculate modularity if partition is valid
             if partition:
                 try:
-                    from networkx.algorithms.community import modularity
                     communities_for_modularity = defaultdict(set)
                     for node, comm_id in partition.items():
                         communities_for_modularity[comm_id].add(node)
                     
-                    mod_value = modularity(self.graph, communities_for_modularity.values())
+                    mod_value = self.graph.modularity(list(communities_for_modularity.values()))
                     analysis["modularity"] = mod_value
                 except:
                     analysis["modularity"] = None
@@ -288,15 +608,13 @@ class GraphAnalytics:
         courts = [e for e in entities if e.get("entity_type") == "COURT"]
         if courts and self.graph:
             court_ids = [c["entity_id"] for c in courts]
-            court_subgraph = self.graph.subgraph(court_ids)
-            metrics["court_network_density"] = nx.density(court_subgraph) if court_subgraph.number_of_nodes() > 1 else 0
+            metrics["court_network_density"] = self.graph.subgraph_density(court_ids)
         
         # Party network analysis
         parties = [e for e in entities if e.get("entity_type") == "PARTY"]
         if parties and self.graph:
             party_ids = [p["entity_id"] for p in parties]
-            party_subgraph = self.graph.subgraph(party_ids)
-            metrics["party_network_density"] = nx.density(party_subgraph) if party_subgraph.number_of_nodes() > 1 else 0
+            metrics["party_network_density"] = self.graph.subgraph_density(party_ids)
         
         return metrics
     
@@ -434,9 +752,9 @@ class GraphAnalytics:
                 if "betweenness_centrality" in centrality_analysis and "values" in centrality_analysis["betweenness_centrality"]:
                     entity_info["betweenness"] = centrality_analysis["betweenness_centrality"]["values"].get(entity_id, 0)
                 
-                # Add entity attributes from graph
-                if self.graph and entity_id in self.graph.nodes:
-                    node_data = self.graph.nodes[entity_id]
+                # Add entity attributes
+                if entity_id in self.entity_index:
+                    node_data = self.entity_index[entity_id]
                     entity_info["entity_text"] = node_data.get("entity_text", "")
                     entity_info["entity_type"] = node_data.get("entity_type", "")
                 
@@ -459,12 +777,17 @@ class GraphAnalytics:
         
         importance_scores = {}
         
-        # Get centrality metrics
-        centrality = await self._compute_centrality_metrics()
+        # Get centrality metrics (only degree and PageRank are used; memoized by analyze_graph).
+        # They run under a local minimal profile so the last analysis profile is left intact.
+        analysis_profile, self.profile = self.profile, self._new_profile("minimal", None)
+        try:
+            centrality = await self._compute_centrality_metrics()
+        finally:
+            self.profile = analysis_profile
         
         for entity in entities:
             entity_id = entity["entity_id"]
-            if entity_id not in self.graph.nodes:
+            if not self.graph.has_node(entity_id):
                 continue
             
             score = 0.0
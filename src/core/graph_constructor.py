@@ -14,6 +14,7 @@ from ..core.entity_deduplicator import EntityDeduplicator
 from ..core.community_detector import CommunityDetector
 from ..core.relationship_discoverer import RelationshipDiscoverer
 from ..core.graph_analytics import GraphAnalytics
+from ..core.incremental_centrality import edge_delta
 from ..core.config import GraphRAGSettings
 
 
@@ -48,10 +49,20 @@ class GraphConstructor:
         self.relationship_discoverer = RelationshipDiscoverer(
             min_confidence=settings.min_relationship_confidence,
             citation_weight=settings.citation_relationship_weight,
-            cross_doc_boost=1.5
+            cross_doc_boost=1.5,
+            max_citation_fanout=settings.max_citation_fanout or None,
+            strategy_time_budget=settings.relationship_strategy_time_budget or None,
+            edge_prune_rule=settings.edge_prune_rule
         )
         
-        self.graph_analytics = GraphAnalytics()
+        self.graph_analytics = GraphAnalytics(
+            tier=settings.analytics_tier,
+            time_budget_seconds=settings.analytics_time_budget,
+            approximation_threshold=settings.analytics_approximation_threshold,
+            betweenness_samples=settings.analytics_betweenness_samples,
+            backend=settings.analytics_backend,
+            component_parallel_threshold=settings.analytics_component_parallel_threshold
+        )
         
         # Initialize clients
         self.supabase_client = None
@@ -59,6 +70,9 @@ class GraphConstructor:
         self.log_client = None
         self.http_client = None
         
+        # Tenant-level degree/PageRank updater (TenantCentralityUpdater), set by the app
+        self.centrality_updater = None
+        
     async def initialize_clients(self):
         """Initialize service clients."""
         # Import here to avoid circular dependencies
@@ -141,32 +155,75 @@ class GraphConstructor:
                 }
             
             # Step 2: Relationship Discovery
+            max_edges_per_node = graph_options.get("max_edges_per_node") or self.settings.max_edges_per_node or None
             if graph_options.get("enable_cross_document_linking", True):
                 enhanced_relationships, rel_metadata = await self.relationship_discoverer.discover_relationships(
                     deduplicated_entities,
                     relationships,
                     citations,
-                    enhanced_chunks
+                    enhanced_chunks,
+                    strategy_options=graph_options.get("relationship_strategies"),
+                    max_edges_per_node=max_edges_per_node
                 )
                 await self._log_step("Relationship discovery", rel_metadata)
             else:
-                enhanced_relationships = relationships
-                rel_metadata = {"discovered_relationships": 0}
+                enhanced_relationships = self.relationship_discoverer.prune_edges_per_node(
+                    relationships, max_edges_per_node
+                )
+                rel_metadata = {
+                    "discovered_relationships": 0,
+                    "pruned_relationships": len(relationships) - len(enhanced_relationships)
+                }
             
             # Step 3: Community Detection
             communities = []
             community_metadata = {}
+            community_ids_to_write = None
             if graph_options.get("enable_community_detection", True) and len(deduplicated_entities) >= 3:
-                communities, community_metadata = await self.community_detector.detect_communities(
-                    deduplicated_entities,
-                    enhanced_relationships,
-                    citations
-                )
+                if graph_options.get("incremental_communities", False):
+                    previous_membership = await self._load_previous_membership(
+                        [e["entity_id"] for e in deduplicated_entities],
+                        client_id,
+                        case_id
+                    )
+                    communities, community_metadata = await self.community_detector.detect_communities_incremental(
+                        deduplicated_entities,
+                        enhanced_relationships,
+                        previous_membership,
+                        citations
+                    )
+                    community_ids_to_write = set(community_metadata.get("changed_community_ids", []))
+                elif graph_options.get("leiden_resolution_sweep"):
+                    levels = await self.community_detector.sweep_resolutions(
+                        deduplicated_entities,
+                        enhanced_relationships,
+                        graph_options["leiden_resolution_sweep"],
+                        citations
+                    )
+                    best = next((level for level in levels if level["is_best"]), None)
+                    if best:
+                        communities = best["communities"]
+                        community_metadata = {
+                            **best["metadata"],
+                            "resolution_sweep": [
+                                {"resolution": level["resolution"], "score": level["score"], **level["scores"]}
+                                for level in levels
+                            ]
+                        }
+                else:
+                    communities, community_metadata = await self.community_detector.detect_communities(
+                        deduplicated_entities,
+                        enhanced_relationships,
+                        citations
+                    )
                 await self._log_step("Community detection", community_metadata)
                 
-                # Generate AI summaries for communities if requested
+                # Generate AI summaries for communities if requested (changed ones only when incremental)
                 if graph_options.get("use_ai_summaries", True) and communities:
-                    communities = await self._generate_community_summaries(communities, deduplicated_entities)
+                    to_summarize = communities if community_ids_to_write is None else [
+                        c for c in communities if c["community_id"] in community_ids_to_write
+                    ]
+                    await self._generate_community_summaries(to_summarize, deduplicated_entities)
             
             # Step 4: Graph Analytics
             analytics = None
@@ -174,7 +231,8 @@ class GraphConstructor:
                 analytics = await self.graph_analytics.analyze_graph(
                     deduplicated_entities,
                     enhanced_relationships,
-                    communities
+                    communities,
+                    tier=graph_options.get("analytics_tier")
                 )
                 await self._log_step("Graph analytics", analytics.get("basic_metrics", {}))
             
@@ -189,7 +247,9 @@ class GraphConstructor:
                 client_id,
                 case_id,
                 enhanced_chunks,
-                citations
+                citations,
+                community_ids_to_write,
+                community_metadata.get("removed_community_ids")
             )
             
             # Step 6: Cross-document linking (if applicable)
@@ -387,8 +447,19 @@ Focus on the legal relationships and significance. Be concise and specific."""
                                client_id: Optional[str] = None,
                                case_id: Optional[str] = None,
                                enhanced_chunks: Optional[List[Dict[str, Any]]] = None,
-                               citations: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
-        """Store graph data in Supabase database with tenant columns."""
+                               citations: Optional[List[Dict[str, Any]]] = None,
+                               community_ids_to_write: Optional[set] = None,
+                               removed_community_ids: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Store graph data in Supabase database with tenant columns.
+        
+        If community_ids_to_write is given, only those communities (and their
+        memberships) are rewritten; the rest are unchanged from a previous run.
+        Stored memberships of rewritten communities are replaced, and
+        removed_community_ids (with their sub-communities) are deleted.
+        Ranking columns (node_degree, pagerank, rank_score) are tenant-wide and
+        maintained by the centrality updater from the stored edges.
+        """
         storage_info = {
             "nodes_created": 0,
             "edges_created": 0,
@@ -399,7 +470,7 @@ Focus on the legal relationships and significance. Be concise and specific."""
         # CRITICAL FIX: Removed outer try-except to allow exceptions to propagate
         # The old pattern was catching ALL exceptions and continuing silently
 
-        # Store entities in graph.nodes with tenant info in metadata
+        # Store entities in graph.nodes with tenant columns
         if entities:
             # CRITICAL FIX: Fail-safe deduplication by entity_id before database insert
             # This prevents duplicate key errors if the upstream deduplication somehow failed
@@ -428,6 +499,8 @@ Focus on the legal relationships and significance. Be concise and specific."""
                 # Create base node record
                 node_record = {
                     "node_id": entity["entity_id"],
+                    "client_id": client_id,
+                    "case_id": case_id,
                     "node_type": "entity",
                     "description": self._get_entity_description(
                         entity.get('entity_type', 'UNKNOWN'),
@@ -483,7 +556,7 @@ Focus on the legal relationships and significance. Be concise and specific."""
             storage_info["nodes_created"] = len(result)
             await self._log_step("nodes_inserted", {"count": len(result)})
             
-        # Store relationships in graph.edges with tenant info in metadata
+        # Store relationships in graph.edges with tenant columns
         if relationships:
             edge_records = []
             for i, rel in enumerate(relationships):
@@ -526,6 +599,8 @@ Focus on the legal relationships and significance. Be concise and specific."""
                 edge_record = {
                     "source_node_id": source_id,
                     "target_node_id": target_id,
+                    "client_id": client_id,
+                    "case_id": case_id,
                     "weight": confidence_val,
                     "evidence": evidence,
                     "metadata": {
@@ -563,16 +638,38 @@ Focus on the legal relationships and significance. Be concise and specific."""
 
             storage_info["edges_created"] = len(result)
             await self._log_step("edges_inserted", {"count": len(result)})
+
+            # Tenant-wide degree/PageRank follow the new edges in the background
+            if self.centrality_updater and client_id:
+                self.centrality_updater.submit(
+                    client_id,
+                    case_id,
+                    inserted=[edge_delta(record) for record in edge_records]
+                )
             
-        # Store communities in graph.communities with tenant info in metadata
+        communities_to_write = communities if community_ids_to_write is None else [
+            c for c in communities if c["community_id"] in community_ids_to_write
+        ]
+        if communities_to_write or removed_community_ids:
+            storage_info["stale_communities_removed"] = await self._clear_replaced_communities(
+                [c["community_id"] for c in communities_to_write],
+                removed_community_ids or [],
+                client_id,
+                case_id
+            )
+
+        # Store communities in graph.communities with tenant columns
         if communities:
             community_records = []
-            for community in communities:
+            for community in communities_to_write:
                 community_records.append({
                     "community_id": community["community_id"],
+                    "client_id": client_id,
+                    "case_id": case_id,
                     "title": community.get("title", f"Community {community['community_id']}"),
                     "summary": community.get("ai_summary", community.get("description", "")),
-                    "level": 0,
+                    "level": community.get("level", 0),
+                    "parent_community_id": community.get("parent_community_id"),
                     "node_count": len(community.get("entity_ids", [])),
                     "edge_count": 0,  # Will be updated later if needed
                     "coherence_score": community.get("coherence_score", 0),
@@ -585,28 +682,29 @@ Focus on the legal relationships and significance. Be concise and specific."""
                 })
 
             # Batch upsert communities with validation (idempotent for re-runs)
-            await self._log_step("upserting_communities", {"count": len(community_records)})
-            result = await self.supabase_client.upsert(
-                "graph.communities",
-                community_records,
-                on_conflict="community_id",
-                admin_operation=True
-            )
+            if community_records:
+                await self._log_step("upserting_communities", {"count": len(community_records)})
+                result = await self.supabase_client.upsert(
+                    "graph.communities",
+                    community_records,
+                    on_conflict="community_id",
+                    admin_operation=True
+                )
 
-            # CRITICAL FIX: Validate result and fail fast
-            if result is None:
-                raise Exception(f"Failed to insert {len(community_records)} communities: Supabase returned None")
-            elif len(result) == 0:
-                raise Exception(f"Failed to insert {len(community_records)} communities: Supabase returned empty result")
-            elif len(result) != len(community_records):
-                raise Exception(f"Partial insert failure: Expected {len(community_records)} communities, got {len(result)}")
+                # CRITICAL FIX: Validate result and fail fast
+                if result is None:
+                    raise Exception(f"Failed to insert {len(community_records)} communities: Supabase returned None")
+                elif len(result) == 0:
+                    raise Exception(f"Failed to insert {len(community_records)} communities: Supabase returned empty result")
+                elif len(result) != len(community_records):
+                    raise Exception(f"Partial insert failure: Expected {len(community_records)} communities, got {len(result)}")
 
-            storage_info["communities_detected"] = len(result)
-            await self._log_step("communities_inserted", {"count": len(result)})
+                storage_info["communities_detected"] = len(result)
+                await self._log_step("communities_inserted", {"count": len(result)})
 
             # Store node-community memberships
             membership_records = []
-            for community in communities:
+            for community in communities_to_write:
                 for entity_id in community.get("entity_ids", []):
                     membership_records.append({
                         "node_id": entity_id,
@@ -615,24 +713,20 @@ Focus on the legal relationships and significance. Be concise and specific."""
                     })
 
             if membership_records:
-                await self._log_step("inserting_memberships", {"count": len(membership_records)})
-                try:
-                    membership_result = await self.supabase_client.insert(
-                        "graph.node_communities",
-                        membership_records,
-                        admin_operation=True
-                    )
+                await self._log_step("upserting_memberships", {"count": len(membership_records)})
+                membership_result = await self.supabase_client.upsert(
+                    "graph.node_communities",
+                    membership_records,
+                    on_conflict="node_id,community_id",
+                    admin_operation=True
+                )
 
-                    # Validate membership inserts
-                    if membership_result is None or len(membership_result) == 0:
-                        await self._log_error(f"WARNING: Failed to insert {len(membership_records)} community memberships - table may not be exposed via REST API")
-                        storage_info["membership_warning"] = "Failed to insert community memberships"
-                    else:
-                        await self._log_step("memberships_inserted", {"count": len(membership_result)})
-                except Exception as e:
-                    # Don't fail entire graph construction if membership table has issues
-                    await self._log_error(f"WARNING: Community membership insert failed (non-critical): {str(e)}")
-                    storage_info["membership_warning"] = f"Membership insert failed: {str(e)}"
+                if membership_result is None or len(membership_result) != len(membership_records):
+                    raise Exception(
+                        f"Failed to upsert {len(membership_records)} community memberships: "
+                        f"got {len(membership_result or [])}"
+                    )
+                await self._log_step("memberships_inserted", {"count": len(membership_result)})
 
             # Store chunk-entity connections with relevance scoring
             if enhanced_chunks:
@@ -1020,6 +1114,123 @@ Focus on the legal relationships and significance. Be concise and specific."""
             # Don't fail the entire graph construction
             return 0
 
+    async def _load_previous_membership(self,
+                                        node_ids: List[str],
+                                        client_id: Optional[str] = None,
+                                        case_id: Optional[str] = None) -> Dict[str, str]:
+        """
+        Load previous top-level community membership for warm-started detection.
+        
+        Reads graph.node_communities for the given nodes and keeps only
+        memberships of the tenant's top-level communities (no parent; the
+        Leiden partition itself).
+        """
+        if not node_ids:
+            return {}
+        
+        try:
+            batch_size = self.settings.batch_size
+            membership_rows = []
+            for i in range(0, len(node_ids), batch_size):
+                response = await self.supabase_client.schema("graph", admin_operation=True) \
+                    .table("node_communities") \
+                    .select("node_id,community_id") \
+                    .in_("node_id", node_ids[i:i + batch_size]) \
+                    .execute()
+                membership_rows.extend(response.data or [])
+            
+            community_ids = sorted({row["community_id"] for row in membership_rows})
+            top_level = set()
+            for i in range(0, len(community_ids), batch_size):
+                query = self.supabase_client.schema("graph", admin_operation=True) \
+                    .table("communities") \
+                    .select("community_id") \
+                    .in_("community_id", community_ids[i:i + batch_size]) \
+                    .is_("parent_community_id", "null")
+                response = await self._scope_to_tenant(query, client_id, case_id).execute()
+                top_level.update(row["community_id"] for row in response.data or [])
+            
+            return {
+                row["node_id"]: row["community_id"]
+                for row in sorted(membership_rows, key=lambda row: (row["node_id"], row["community_id"]))
+                if row["community_id"] in top_level
+            }
+        
+        except Exception as e:
+            await self._log_error(f"Failed to load previous community membership: {e}")
+            return {}
+    
+    async def _clear_replaced_communities(self,
+                                          community_ids: List[str],
+                                          removed_community_ids: List[str],
+                                          client_id: Optional[str],
+                                          case_id: Optional[str]) -> int:
+        """
+        Clear the stored community rows a rewrite replaces.
+        
+        Memberships of every stored community in the subtrees of the
+        rewritten and removed communities are deleted, so nodes that moved
+        do not keep their old membership, and subtree communities this run
+        no longer emits are deleted outright. Lookups are scoped to the tenant,
+        and since per-document ids (comm_NNN) repeat across documents and
+        tenants, only memberships of the tenant's own nodes are deleted.
+        
+        Returns:
+            Number of stored communities deleted
+        """
+        batch_size = self.settings.batch_size
+        graph = self.supabase_client.schema("graph", admin_operation=True)
+        
+        stored = set()
+        column, frontier = "community_id", sorted(set(community_ids) | set(removed_community_ids))
+        while frontier:
+            found = set()
+            for i in range(0, len(frontier), batch_size):
+                query = graph.table("communities").select("community_id").in_(column, frontier[i:i + batch_size])
+                response = await self._scope_to_tenant(query, client_id, case_id).execute()
+                found.update(row["community_id"] for row in response.data or [])
+            column, frontier = "parent_community_id", sorted(found - stored)
+            stored |= found
+        
+        stored = sorted(stored)
+        members = set()
+        for i in range(0, len(stored), batch_size):
+            response = await graph.table("node_communities") \
+                .select("node_id") \
+                .in_("community_id", stored[i:i + batch_size]) \
+                .execute()
+            members.update(row["node_id"] for row in response.data or [])
+        
+        members = sorted(members)
+        tenant_nodes = []
+        for i in range(0, len(members), batch_size):
+            query = graph.table("nodes").select("node_id").in_("node_id", members[i:i + batch_size])
+            response = await self._scope_to_tenant(query, client_id, case_id).execute()
+            tenant_nodes.extend(row["node_id"] for row in response.data or [])
+        
+        for i in range(0, len(stored), batch_size):
+            for j in range(0, len(tenant_nodes), batch_size):
+                await graph.table("node_communities") \
+                    .delete() \
+                    .in_("community_id", stored[i:i + batch_size]) \
+                    .in_("node_id", tenant_nodes[j:j + batch_size]) \
+                    .execute()
+        
+        stale = sorted(set(stored) - set(community_ids))
+        for i in range(0, len(stale), batch_size):
+            query = graph.table("communities").delete().in_("community_id", stale[i:i + batch_size])
+            await self._scope_to_tenant(query, client_id, case_id).execute()
+        
+        if stale:
+            await self._log_step("stale_communities_removed", {"count": len(stale)})
+        return len(stale)
+    
+    @staticmethod
+    def _scope_to_tenant(query, client_id: Optional[str], case_id: Optional[str]):
+        """Restrict a graph.communities or graph.nodes query to one client and case."""
+        query = query.eq("client_id", client_id) if client_id else query.is_("client_id", "null")
+        return query.eq("case_id", case_id) if case_id else query.is_("case_id", "null")
+    
     async def _find_cross_document_links(self,
                                         document_id: str,
                                         entities: List[Dict[str, Any]],
@@ -1156,7 +1367,9 @@ Focus on the legal relationships and significance. Be concise and specific."""
             "cross_document_connections": analytics.get("legal_metrics", {}).get("cross_document_relationships", 0),
             "entity_type_distribution": analytics.get("legal_metrics", {}).get("entity_type_distribution", {}),
             "graph_metrics": analytics.get("basic_metrics", {}),
-            "quality_assessment": analytics.get("quality_assessment", {})
+            "component_analysis": analytics.get("component_analysis", {}),
+            "quality_assessment": analytics.get("quality_assessment", {}),
+            "analytics_profile": analytics.get("analytics_profile", {})
         }
     
     async def _log_step(self, step_name: str, metadata: Dict[str, Any]):
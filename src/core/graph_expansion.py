@@ -0,0 +1,309 @@
+"""
+Graph Expansion Module
+k-hop neighbourhood expansion of search hits over cached per-tenant CSR adjacency
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import scipy.sparse as sp
+import structlog
+
+from .tenant_graph_loader import TenantGraph, TenantGraphLoader, TenantGraphTooLargeError
+
+logger = structlog.get_logger(__name__)
+
+
+@dataclass
+class TenantAdjacency:
+    """
+    Undirected weighted adjacency of a tenant graph in CSR form.
+
+    transitions is W D^-1 (each node's outgoing share of its edge weights),
+    so transitions @ scores spreads node scores one hop in a single sparse
+    matrix-vector product.
+    Parallel edges are summed and self-loops dropped.
+    """
+    client_id: str
+    node_ids: List[str]
+    node_index: Dict[str, int]
+    weights: sp.csr_matrix
+    transitions: sp.csr_matrix
+    importance: np.ndarray
+    loaded_at: float
+
+    @property
+    def node_count(self) -> int:
+        return len(self.node_ids)
+
+    @property
+    def edge_count(self) -> int:
+        return int(self.weights.nnz // 2)
+
+    @classmethod
+    def from_tenant_graph(cls, graph: TenantGraph, rank_scores: Dict[str, Any]) -> "TenantAdjacency":
+        n = graph.node_count
+        directed = sp.csr_matrix(
+            (graph.weights.astype(np.float32), (graph.sources, graph.targets)),
+            shape=(n, n)
+        )
+        weights = (directed + directed.T).tocsr()
+        weights.setdiag(0)
+        weights.eliminate_zeros()
+
+        degree = np.asarray(weights.sum(axis=1)).ravel()
+        inverse = np.divide(1.0, degree, out=np.zeros_like(degree), where=degree > 0)
+        transitions = weights @ sp.diags(inverse.astype(np.float32))
+
+        importance = np.array(
+            [float(rank_scores.get(node_id) or 0.0) for node_id in graph.node_ids],
+            dtype=np.float32
+        )
+
+        return cls(
+            client_id=graph.client_id,
+            node_ids=graph.node_ids,
+            node_index={node_id: idx for idx, node_id in enumerate(graph.node_ids)},
+            weights=weights,
+            transitions=transitions.tocsr(),
+            importance=importance,
+            loaded_at=time.monotonic()
+        )
+
+
+def expand_neighbourhood(adjacency: TenantAdjacency,
+                         seeds: Dict[str, float],
+                         hops: int = 1,
+                         max_neighbors: int = 20,
+                         hop_decay: float = 0.5,
+                         importance_weight: float = 0.5) -> List[Dict[str, Any]]:
+    """
+    Score the nodes within `hops` of the seed entities.
+
+    Seed scores are spread in proportion to edge weights; hop h keeps
+    hop_decay ** (h - 1) of the propagated score, only nodes not reached
+    earlier collect it, and the total is scaled by
+    (1 + importance_weight * rank_score).
+
+    Args:
+        adjacency: Cached tenant adjacency
+        seeds: node_id -> seed score (e.g. search similarity)
+        hops: Expansion depth (1 or 2)
+        max_neighbors: Neighbours returned
+        hop_decay: Score multiplier per additional hop
+        importance_weight: Weight of the node's precomputed rank_score
+
+    Returns:
+        Neighbours (seeds excluded) with score, hop distance, edge weight to
+        the seed set and rank_score, best first
+    """
+    seed_positions = [adjacency.node_index[node_id] for node_id in seeds if node_id in adjacency.node_index]
+    if not seed_positions or hops <= 0 or max_neighbors <= 0:
+        return []
+
+    n = adjacency.node_count
+    frontier = np.zeros(n, dtype=np.float32)
+    frontier[seed_positions] = [seeds[adjacency.node_ids[p]] for p in seed_positions]
+
+    reached = np.zeros(n, dtype=bool)
+    reached[seed_positions] = True
+    hop_of = np.zeros(n, dtype=np.int8)
+    scores = np.zeros(n, dtype=np.float32)
+
+    for hop in range(1, hops + 1):
+        frontier = adjacency.transitions @ frontier
+        new = (frontier > 0) & ~reached
+        scores[new] = frontier[new] * (hop_decay ** (hop - 1))
+        hop_of[new] = hop
+        reached |= new
+        if not new.any():
+            break
+
+    candidates = np.flatnonzero(hop_of > 0)
+    if not len(candidates):
+        return []
+    final = scores[candidates] * (1.0 + importance_weight * adjacency.importance[candidates])
+    if len(candidates) > max_neighbors:
+        top = np.argpartition(-final, max_neighbors - 1)[:max_neighbors]
+        candidates, final = candidates[top], final[top]
+    order = np.argsort(-final, kind="stable")
+    candidates, final = candidates[order], final[order]
+
+    seed_weights = np.asarray(adjacency.weights[candidates][:, seed_positions].sum(axis=1)).ravel()
+
+    return [
+        {
+            "node_id": adjacency.node_ids[position],
+            "score": float(score),
+            "hops": int(hop_of[position]),
+            "seed_edge_weight": float(weight),
+            "rank_score": float(adjacency.importance[position])
+        }
+        for position, score, weight in zip(candidates.tolist(), final.tolist(), seed_weights.tolist())
+    ]
+
+
+def subgraph_edges(adjacency: TenantAdjacency, node_ids: List[str], max_edges: int = 50) -> List[Dict[str, Any]]:
+    """Strongest edges among the given nodes (undirected, merged weights)."""
+    positions = np.array([adjacency.node_index[node_id] for node_id in node_ids if node_id in adjacency.node_index])
+    if len(positions) < 2:
+        return []
+    sub = sp.triu(adjacency.weights[positions][:, positions], k=1).tocoo()
+    order = np.argsort(-sub.data, kind="stable")[:max_edges]
+    return [
+        {
+            "source_node_id": adjacency.node_ids[positions[sub.row[i]]],
+            "target_node_id": adjacency.node_ids[positions[sub.col[i]]],
+            "weight": float(sub.data[i])
+        }
+        for i in order.tolist()
+    ]
+
+
+class AdjacencyCache:
+    """
+    Lazily loaded TenantAdjacency per client_id.
+
+    A tenant is loaded on first use with keyset-paged reads of graph.nodes
+    and graph.edges (concurrent callers share the load), kept LRU-bounded,
+    reloaded after ttl and dropped by invalidate() when its edges change.
+    get() waits for the load; peek() never does and is what searches use.
+    """
+
+    def __init__(self,
+                 supabase_client=None,
+                 max_tenants: int = 16,
+                 ttl: float = 900,
+                 page_size: int = 1000,
+                 max_nodes: int = 250000,
+                 max_edges: int = 1000000):
+        """
+        Initialize adjacency cache.
+
+        Args:
+            supabase_client: SupabaseClient used for fluent graph-schema queries
+            max_tenants: Tenant adjacencies kept in memory
+            ttl: Seconds before a cached adjacency is reloaded
+            page_size: Rows fetched per keyset page
+            max_nodes: Tenants with more nodes are not expanded
+            max_edges: Tenants with more edges are not expanded
+        """
+        self.supabase_client = supabase_client
+        self.max_tenants = max_tenants
+        self.ttl = ttl
+        self.page_size = page_size
+        self.max_nodes = max_nodes
+        self.max_edges = max_edges
+
+        self._adjacency: "OrderedDict[str, TenantAdjacency]" = OrderedDict()
+        self._loading: Dict[str, asyncio.Task] = {}
+        self._unavailable: Dict[str, float] = {}
+        self._generations: Dict[str, int] = {}
+
+        self.hits = 0
+        self.loads = 0
+
+    async def get(self, client_id: str) -> Optional[TenantAdjacency]:
+        """Cached adjacency for a tenant, loading it if needed (None if too large or failed)."""
+        adjacency = self._fresh(client_id)
+        if adjacency is not None:
+            return adjacency
+        task = self._start_load(client_id)
+        return await asyncio.shield(task) if task is not None else None
+
+    def peek(self, client_id: str) -> Optional[TenantAdjacency]:
+        """Cached adjacency without waiting; a missing or expired tenant is loaded in the background."""
+        adjacency = self._fresh(client_id)
+        if adjacency is None:
+            self._start_load(client_id)
+            # An expired adjacency keeps answering until its reload lands
+            adjacency = self._adjacency.get(client_id)
+        return adjacency
+
+    def is_loading(self, client_id: str) -> bool:
+        """Whether a load for the tenant is in flight."""
+        return client_id in self._loading
+
+    def invalidate(self, client_id: Optional[str]) -> None:
+        """Drop a tenant's adjacency after its edges or nodes change."""
+        self._adjacency.pop(client_id, None)
+        self._unavailable.pop(client_id, None)
+        # A load already in flight still answers its waiters but is not cached
+        self._loading.pop(client_id, None)
+        self._generations[client_id] = self._generations.get(client_id, 0) + 1
+
+    def clear(self) -> None:
+        for client_id in list(self._adjacency) + list(self._loading):
+            self.invalidate(client_id)
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "tenants": len(self._adjacency),
+            "edges": sum(adjacency.edge_count for adjacency in self._adjacency.values()),
+            "hits": self.hits,
+            "loads": self.loads
+        }
+
+    def _fresh(self, client_id: str) -> Optional[TenantAdjacency]:
+        adjacency = self._adjacency.get(client_id)
+        if adjacency is None or time.monotonic() - adjacency.loaded_at > self.ttl:
+            return None
+        self._adjacency.move_to_end(client_id)
+        self.hits += 1
+        return adjacency
+
+    def _start_load(self, client_id: str) -> Optional[asyncio.Task]:
+        if client_id in self._loading:
+            return self._loading[client_id]
+        if self._unavailable.get(client_id, 0.0) > time.monotonic():
+            return None
+        task = asyncio.create_task(self._load(client_id))
+        self._loading[client_id] = task
+        task.add_done_callback(
+            lambda _: self._loading.pop(client_id, None) if self._loading.get(client_id) is task else None
+        )
+        return task
+
+    async def _load(self, client_id: str) -> Optional[TenantAdjacency]:
+        loader = TenantGraphLoader(
+            self.supabase_client,
+            page_size=self.page_size,
+            max_nodes=self.max_nodes,
+            max_edges=self.max_edges
+        )
+        generation = self._generations.get(client_id, 0)
+        start_time = time.time()
+
+        try:
+            graph = await loader.load(client_id)
+            rank_scores = await loader.load_node_values(client_id, None, "rank_score")
+            adjacency = await asyncio.to_thread(TenantAdjacency.from_tenant_graph, graph, rank_scores)
+        except TenantGraphTooLargeError as e:
+            self._unavailable[client_id] = time.monotonic() + self.ttl
+            logger.info("⏭️ Tenant graph too large for expansion", client_id=client_id, error=str(e))
+            return None
+        except Exception as e:
+            self._unavailable[client_id] = time.monotonic() + min(self.ttl, 60.0)
+            logger.warning("⚠️ Adjacency load failed, skipping graph expansion", client_id=client_id, error=str(e))
+            return None
+
+        if self._generations.get(client_id, 0) != generation:
+            return adjacency
+
+        self._adjacency[client_id] = adjacency
+        self._adjacency.move_to_end(client_id)
+        while len(self._adjacency) > self.max_tenants:
+            self._adjacency.popitem(last=False)
+        self.loads += 1
+
+        logger.info("🕸️ Tenant adjacency cached",
+                   client_id=client_id,
+                   nodes=adjacency.node_count,
+                   edges=adjacency.edge_count,
+                   load_time_ms=(time.time() - start_time) * 1000)
+        return adjacency
@@ -4,11 +4,20 @@ Discovers cross-document relationships and inferred connections
 """
 
 import asyncio
-from typing import List, Dict, Any, Tuple, Optional, Set
+import re
+import time
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from typing import List, Dict, Any, Tuple, Optional, Set, Callable, Awaitable, FrozenSet
 from collections import defaultdict
 import networkx as nx
 import numpy as np
-from dataclasses import dataclass
+import structlog
+from scipy import sparse
+from dataclasses import dataclass, field
+
+logger = structlog.get_logger(__name__)
 
 
 @dataclass
@@ -32,6 +41,77 @@ class RelationshipCandidate:
         }
 
 
+@dataclass
+class ContextPatternIndex:
+    """First positions of relationship patterns and entity texts in one chunk."""
+    context: str
+    positions: List[int]
+    entries: List[Tuple[int, int, str]]  # (position, pattern order, relationship type)
+    entity_positions: Dict[str, int] = field(default_factory=dict)
+    
+    def entity_position(self, entity_text: str) -> int:
+        if entity_text not in self.entity_positions:
+            self.entity_positions[entity_text] = self.context.find(entity_text)
+        return self.entity_positions[entity_text]
+    
+    def first_between(self, start: int, end: int) -> Optional[str]:
+        """Relationship type of the earliest-declared pattern first seen strictly inside (start, end)."""
+        lo = bisect_right(self.positions, start)
+        hi = bisect_left(self.positions, end)
+        if lo >= hi:
+            return None
+        return min(self.entries[lo:hi], key=lambda entry: entry[1])[2]
+
+
+# Discovery strategies share a bounded pool so an overrunning strategy cannot tie up
+# the default executor that asyncio.to_thread and Supabase calls use
+STRATEGY_MAX_WORKERS = 8
+_strategy_executor: Optional[ThreadPoolExecutor] = None
+
+# Monotonic deadline of the strategy running in the current worker thread
+_strategy_deadline: ContextVar[Optional[float]] = ContextVar("strategy_deadline", default=None)
+
+
+class StrategyTimeoutError(Exception):
+    """A discovery strategy ran past its time budget."""
+
+
+def check_strategy_deadline() -> None:
+    """Stop the running discovery strategy once its time budget is spent."""
+    deadline = _strategy_deadline.get()
+    if deadline is not None and time.monotonic() > deadline:
+        raise StrategyTimeoutError("Discovery strategy exceeded its time budget")
+
+
+def _get_strategy_executor() -> ThreadPoolExecutor:
+    global _strategy_executor
+    if _strategy_executor is None:
+        _strategy_executor = ThreadPoolExecutor(
+            max_workers=STRATEGY_MAX_WORKERS,
+            thread_name_prefix="relationship-strategy"
+        )
+    return _strategy_executor
+
+
+@dataclass
+class DiscoveryContext:
+    """Read-only inputs and occurrence indexes shared by all discovery strategies."""
+    entities: List[Dict[str, Any]]
+    citations: List[Dict[str, Any]]
+    chunks: List[Dict[str, Any]]
+    existing_index: FrozenSet[Tuple[str, str, str]]
+    entities_by_doc: Dict[str, List[Dict[str, Any]]]
+    entities_by_chunk: Dict[str, List[Dict[str, Any]]]
+
+
+@dataclass
+class DiscoveryStrategy:
+    """A registered relationship discovery strategy."""
+    name: str
+    id_prefix: str
+    discover: Callable[["RelationshipDiscoverer", DiscoveryContext], Awaitable[List[Dict[str, Any]]]]
+
+
 class RelationshipDiscoverer:
     """
     Discovers relationships between entities, including cross-document connections.
@@ -62,10 +142,34 @@ class RelationshipDiscoverer:
         ("CORPORATION", "INDIVIDUAL"): "EMPLOYS",  # Potential employment
     }
     
+    # Cross-document link types by precedence (first matching entity type wins)
+    LINK_TYPE_PRECEDENCE = [
+        ("CITATION_LINK", {"CASE", "CITATION"}),
+        ("SHARED_PARTY", {"PARTY"}),
+        ("SAME_JURISDICTION", {"COURT", "JUDGE"}),
+        ("RELATED_CONTRACT", {"CONTRACT"}),
+    ]
+    
+    # Edge pruning priority by relationship type (lower is kept first; others rank 0)
+    RELATIONSHIP_TYPE_PRIORITY = {
+        "CITED_TOGETHER": 1,
+        "CROSS_DOCUMENT_ASSOCIATION": 2,
+        "FREQUENTLY_COOCCURS": 3
+    }
+    
+    # "both": hard per-entity cap; "either": keep edges in the top-k of one endpoint (hubs uncapped)
+    EDGE_PRUNE_RULES = ("either", "both")
+    
+    # Buffered co-occurrence pair keys folded into the running counts at once
+    COOCCURRENCE_FLUSH_PAIRS = 1_000_000
+    
     def __init__(self,
                  min_confidence: float = 0.5,
                  citation_weight: float = 2.0,
-                 cross_doc_boost: float = 1.5):
+                 cross_doc_boost: float = 1.5,
+                 max_citation_fanout: Optional[int] = 20,
+                 strategy_time_budget: Optional[float] = None,
+                 edge_prune_rule: str = "both"):
         """
         Initialize relationship discoverer.
         
@@ -73,59 +177,96 @@ class RelationshipDiscoverer:
             min_confidence: Minimum confidence for relationship acceptance
             citation_weight: Weight multiplier for citation relationships
             cross_doc_boost: Boost for cross-document relationships
+            max_citation_fanout: Maximum CITED_TOGETHER edges per cited entity and citation (None = unbounded)
+            strategy_time_budget: Default seconds per discovery strategy (None = unlimited)
+            edge_prune_rule: Top-k pruning keeps an edge in the top-k of "both" endpoints (a hard cap) or of "either"
         """
+        if edge_prune_rule not in self.EDGE_PRUNE_RULES:
+            raise ValueError(f"Unknown edge prune rule: {edge_prune_rule}")
+
         self.min_confidence = min_confidence
         self.citation_weight = citation_weight
         self.cross_doc_boost = cross_doc_boost
+        self.max_citation_fanout = max_citation_fanout
+        self.strategy_time_budget = strategy_time_budget
+        self.edge_prune_rule = edge_prune_rule
+        
+        # One alternation over all context patterns, matched at every position
+        self._pattern_owners = defaultdict(list)
+        order = 0
+        for rel_type, patterns in self.LEGAL_RELATIONSHIP_PATTERNS.items():
+            for pattern in patterns:
+                self._pattern_owners[pattern].append((order, rel_type))
+                order += 1
+        pattern_texts = sorted(self._pattern_owners, key=len, reverse=True)
+        self._pattern_regex = re.compile(
+            "(?=(" + "|".join(re.escape(pattern) for pattern in pattern_texts) + "))"
+        )
+        self._pattern_prefixes = {
+            pattern: [pattern[:i] for i in range(1, len(pattern) + 1) if pattern[:i] in self._pattern_owners]
+            for pattern in pattern_texts
+        }
         
     async def discover_relationships(self,
                                     entities: List[Dict[str, Any]],
                                     existing_relationships: List[Dict[str, Any]],
                                     citations: Optional[List[Dict[str, Any]]] = None,
-                                    chunks: Optional[List[Dict[str, Any]]] = None) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+                                    chunks: Optional[List[Dict[str, Any]]] = None,
+                                    strategy_options: Optional[Dict[str, Dict[str, Any]]] = None,
+                                    max_edges_per_node: Optional[int] = None) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
         """
         Discover new relationships and enhance existing ones.
         
+        Registered strategies run concurrently on a bounded thread pool
+        against a shared read-only DiscoveryContext. Their results are merged in
+        registration order, dropping relationships already produced by an
+        earlier strategy, so output matches a sequential run.
+        
         Args:
             entities: Deduplicated entities
             existing_relationships: Already extracted relationships
             citations: Document citations
             chunks: Document chunks with context
+            strategy_options: Per-strategy {enabled, time_budget_seconds, max_edges} keyed by strategy name
+            max_edges_per_node: Keep at most this many relationships per entity (None = no cap)
             
         Returns:
             Tuple of (enhanced relationships, discovery metadata)
         """
+        strategy_options = strategy_options or {}
+        unknown = set(strategy_options) - set(DISCOVERY_STRATEGIES)
+        if unknown:
+            # Requests are validated by GraphOptions; direct callers only get a warning
+            logger.warning("⚠️ Ignoring unknown relationship discovery strategies", strategies=sorted(unknown))
+        
         # Index existing relationships to avoid duplicates
         existing_rel_index = self._index_relationships(existing_relationships)
+        context = self._build_discovery_context(entities, citations, chunks, existing_rel_index)
         
-        # Discover different types of relationships
-        discovered_relationships = []
-        
-        # 1. Discover citation-based relationships
-        if citations:
-            citation_rels = await self._discover_citation_relationships(
-                entities, citations, existing_rel_index
-            )
-            discovered_relationships.extend(citation_rels)
+        strategies = list(DISCOVERY_STRATEGIES.values())
+        outcomes = await asyncio.gather(*[
+            self._run_strategy(strategy, context, strategy_options.get(strategy.name) or {})
+            for strategy in strategies
+        ])
         
-        # 2. Discover cross-document relationships
-        cross_doc_rels = await self._discover_cross_document_relationships(
-            entities, existing_rel_index
-        )
-        discovered_relationships.extend(cross_doc_rels)
-        
-        # 3. Infer relationships from entity types and context
-        if chunks:
-            inferred_rels = await self._infer_relationships_from_context(
-                entities, chunks, existing_rel_index
-            )
-            discovered_relationships.extend(inferred_rels)
-        
-        # 4. Discover co-occurrence based relationships
-        cooccurrence_rels = await self._discover_cooccurrence_relationships(
-            entities, chunks, existing_rel_index
-        )
-        discovered_relationships.extend(cooccurrence_rels)
+        # Merge deterministically in registration order
+        discovered_relationships = []
+        strategy_metrics = {}
+        for strategy, (strategy_rels, metrics) in zip(strategies, outcomes):
+            max_edges = (strategy_options.get(strategy.name) or {}).get("max_edges")
+            accepted = 0
+            for rel in strategy_rels:
+                if max_edges is not None and accepted >= max_edges:
+                    metrics["capped"] = True
+                    break
+                rel_key = (rel["source_entity"], rel["target_entity"], rel["relationship_type"])
+                if rel_key in existing_rel_index:
+                    continue
+                existing_rel_index.add(rel_key)
+                discovered_relationships.append({**rel, "relationship_id": f"{strategy.id_prefix}_{accepted}"})
+                accepted += 1
+            metrics["accepted"] = accepted
+            strategy_metrics[strategy.name] = metrics
         
         # Combine with existing relationships
         all_relationships = existing_relationships + discovered_relationships
@@ -135,11 +276,16 @@ class RelationshipDiscoverer:
             all_relationships, entities
         )
         
+        # Cap hub fan-out
+        enhanced_count = len(enhanced_relationships)
+        enhanced_relationships = self.prune_edges_per_node(enhanced_relationships, max_edges_per_node)
+        
         # Build discovery metadata
         metadata = {
             "existing_relationships": len(existing_relationships),
             "discovered_relationships": len(discovered_relationships),
             "total_relationships": len(enhanced_relationships),
+            "pruned_relationships": enhanced_count - len(enhanced_relationships),
             "discovery_breakdown": {
                 "citation_based": len([r for r in discovered_relationships 
                                      if r.get("discovery_method") == "citation"]),
@@ -149,11 +295,139 @@ class RelationshipDiscoverer:
                               if r.get("discovery_method") == "inference"]),
                 "cooccurrence": len([r for r in discovered_relationships 
                                   if r.get("discovery_method") == "cooccurrence"])
-            }
+            },
+            "strategy_metrics": strategy_metrics
         }
         
         return enhanced_relationships, metadata
     
+    def _build_discovery_context(self,
+                                 entities: List[Dict[str, Any]],
+                                 citations: Optional[List[Dict[str, Any]]],
+                                 chunks: Optional[List[Dict[str, Any]]],
+                                 existing_index: Set[Tuple[str, str, str]]) -> DiscoveryContext:
+        """Build the document and chunk occurrence indexes once for all strategies."""
+        entities_by_doc = defaultdict(list)
+        entities_by_chunk = defaultdict(list)
+        for entity in entities:
+            for doc_id in entity.get("document_ids", []):
+                entities_by_doc[doc_id].append(entity)
+            chunk_id = entity.get("source_chunk_id")
+            if chunk_id:
+                entities_by_chunk[chunk_id].append(entity)
+        
+        return DiscoveryContext(
+            entities=entities,
+            citations=citations or [],
+            chunks=chunks or [],
+            existing_index=frozenset(existing_index),
+            entities_by_doc=dict(entities_by_doc),
+            entities_by_chunk=dict(entities_by_chunk)
+        )
+    
+    async def _run_strategy(self,
+                            strategy: DiscoveryStrategy,
+                            context: DiscoveryContext,
+                            options: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        Run one strategy on the strategy thread pool under its time budget.
+        
+        A strategy that exceeds its budget or fails contributes no
+        relationships. The budget is also checked inside the strategy between
+        documents and chunks, so a timed-out worker stops soon after and
+        frees its pool thread.
+        """
+        metrics = {"status": "disabled", "seconds": 0.0, "discovered": 0, "capped": False}
+        if not options.get("enabled", True):
+            return [], metrics
+        
+        budget = options.get("time_budget_seconds") or self.strategy_time_budget
+        deadline = time.monotonic() + budget if budget else None
+        start_time = time.time()
+        try:
+            worker = asyncio.get_running_loop().run_in_executor(
+                _get_strategy_executor(), self._run_strategy_worker, strategy, context, deadline
+            )
+            relationships = await asyncio.wait_for(worker, timeout=budget) if budget else await worker
+            metrics["status"] = "completed"
+        except (asyncio.TimeoutError, StrategyTimeoutError):
+            relationships = []
+            metrics["status"] = "timed_out"
+            logger.warning("⏱️ Relationship discovery strategy exceeded budget", strategy=strategy.name, budget=budget)
+        except Exception as e:
+            relationships = []
+            metrics["status"] = "failed"
+            metrics["error"] = str(e)
+            logger.error("❌ Relationship discovery strategy failed", strategy=strategy.name, error=str(e))
+        
+        metrics["seconds"] = round(time.time() - start_time, 4)
+        metrics["discovered"] = len(relationships)
+        return relationships, metrics
+    
+    def _run_strategy_worker(self,
+                             strategy: DiscoveryStrategy,
+                             context: DiscoveryContext,
+                             deadline: Optional[float]) -> List[Dict[str, Any]]:
+        # Pool threads are reused, so the deadline is set for every run
+        _strategy_deadline.set(deadline)
+        return asyncio.run(strategy.discover(self, context))
+    
+    def prune_edges_per_node(self,
+                             relationships: List[Dict[str, Any]],
+                             max_edges_per_node: Optional[int]) -> List[Dict[str, Any]]:
+        """
+        Keep relationships that rank in the top max_edges_per_node of their endpoints.
+        
+        Edges are ranked by relationship type priority, then confidence
+        (descending), then input order. With the default "both" rule an edge
+        must be within both endpoints' top-k, which guarantees no entity
+        exceeds the cap, so hubs cannot accumulate weak edges; a leaf whose
+        only edge ranks low for its hub loses it. With "either" an edge within
+        the top-k of at least one endpoint is kept, so leaves keep their edge
+        but a hub may far exceed k. Input order is preserved.
+        """
+        if not max_edges_per_node or len(relationships) <= max_edges_per_node:
+            return relationships
+        
+        node_index = {}
+        sources = np.fromiter(
+            (node_index.setdefault(rel.get("source_entity"), len(node_index)) for rel in relationships),
+            dtype=np.int64, count=len(relationships)
+        )
+        targets = np.fromiter(
+            (node_index.setdefault(rel.get("target_entity"), len(node_index)) for rel in relationships),
+            dtype=np.int64, count=len(relationships)
+        )
+        priorities = np.fromiter(
+            (self.RELATIONSHIP_TYPE_PRIORITY.get(rel.get("relationship_type"), 0) for rel in relationships),
+            dtype=np.int64, count=len(relationships)
+        )
+        confidences = np.fromiter(
+            (rel.get("confidence", 0.0) for rel in relationships),
+            dtype=np.float64, count=len(relationships)
+        )
+        
+        # Global edge ranking, then rank within each endpoint's edge list
+        edge_rank = np.empty(len(relationships), dtype=np.int64)
+        edge_rank[np.lexsort((np.arange(len(relationships)), -confidences, priorities))] = np.arange(len(relationships))
+        
+        # Self-loops take one slot of their entity
+        distinct = np.flatnonzero(sources != targets)
+        endpoints = np.concatenate([sources, targets[distinct]])
+        edge_ids = np.concatenate([np.arange(len(relationships)), distinct])
+        order = np.lexsort((edge_rank[edge_ids], endpoints))
+        sorted_endpoints = endpoints[order]
+        group_starts = np.flatnonzero(np.r_[True, sorted_endpoints[1:] != sorted_endpoints[:-1]])
+        group_sizes = np.diff(np.r_[group_starts, len(order)])
+        rank_in_node = np.arange(len(order)) - np.repeat(group_starts, group_sizes)
+        
+        within_cap = np.bincount(edge_ids[order][rank_in_node < max_edges_per_node], minlength=len(relationships))
+        if self.edge_prune_rule == "both":
+            keep = within_cap == np.where(sources != targets, 2, 1)
+        else:
+            keep = within_cap > 0
+        return [rel for rel, kept in zip(relationships, keep.tolist()) if kept]
+    
     def _index_relationships(self, relationships: List[Dict[str, Any]]) -> Set[Tuple[str, str, str]]:
         """Create index of existing relationships for duplicate detection."""
         index = set()
@@ -177,10 +451,18 @@ class RelationshipDiscoverer:
     async def _discover_citation_relationships(self,
                                               entities: List[Dict[str, Any]],
                                               citations: List[Dict[str, Any]],
-                                              existing_index: Set) -> List[Dict[str, Any]]:
-        """Discover relationships based on citations."""
+                                              existing_index: Set,
+                                              entities_by_doc: Optional[Dict[str, List[Dict[str, Any]]]] = None) -> List[Dict[str, Any]]:
+        """
+        Discover relationships based on citations.
+        
+        Entities are indexed by document once, and each document's entity
+        texts are compiled into a single matcher that finds every entity
+        mentioned in a citation in one pass. Each mentioned entity is linked
+        to at most max_citation_fanout other document entities, preferring
+        entities mentioned in the same citation, then higher confidence.
+        """
         relationships = []
-        entity_map = {e["entity_id"]: e for e in entities}
         
         # Group citations by document
         citations_by_doc = defaultdict(list)
@@ -189,50 +471,113 @@ class RelationshipDiscoverer:
             if doc_id:
                 citations_by_doc[doc_id].append(citation)
         
-        # Find entities that appear in documents with citations
+        # Index entities by document (only documents that have citations)
+        if entities_by_doc is None:
+            entities_by_doc = defaultdict(list)
+            for entity in entities:
+                for doc_id in entity.get("document_ids", []):
+                    if doc_id in citations_by_doc:
+                        entities_by_doc[doc_id].append(entity)
+        
         for doc_id, doc_citations in citations_by_doc.items():
-            # Get entities in this document
-            doc_entities = [e for e in entities 
-                          if doc_id in e.get("document_ids", [])]
+            check_strategy_deadline()
+            doc_entities = entities_by_doc.get(doc_id, [])
+            if len(doc_entities) < 2:
+                continue
+            
+            matcher = self._compile_mention_matcher(doc_entities)
+            by_confidence = sorted(doc_entities, key=lambda e: -e.get("confidence", 0.0))
             
-            # Create citation relationships
             for citation in doc_citations:
                 citation_text = citation.get("citation_text", "")
                 citation_type = citation.get("citation_type", "")
                 
-                # Find entities that might be related to this citation
-                for entity in doc_entities:
-                    entity_text = entity.get("entity_text", "").lower()
-                    
-                    # Check if entity is mentioned in citation
-                    if entity_text in citation_text.lower():
-                        # Create citation relationship
-                        for other_entity in doc_entities:
-                            if other_entity["entity_id"] != entity["entity_id"]:
-                                rel_key = (
-                                    entity["entity_id"],
-                                    other_entity["entity_id"],
-                                    "CITED_TOGETHER"
-                                )
-                                
-                                if rel_key not in existing_index:
-                                    relationships.append({
-                                        "relationship_id": f"rel_cite_{len(relationships)}",
-                                        "source_entity": entity["entity_id"],
-                                        "target_entity": other_entity["entity_id"],
-                                        "relationship_type": "CITED_TOGETHER",
-                                        "confidence": 0.7 * self.citation_weight,
-                                        "discovery_method": "citation",
-                                        "evidence": [f"Both appear in {citation_type}: {citation_text[:50]}..."],
-                                        "document_id": doc_id
-                                    })
-                                    existing_index.add(rel_key)
+                mentioned = [doc_entities[idx] for idx in sorted(matcher(citation_text.lower()))]
+                if not mentioned:
+                    continue
+                evidence = [f"Both appear in {citation_type}: {citation_text[:50]}..."]
+                
+                for entity in mentioned:
+                    for other_entity in self._citation_targets(entity, mentioned, doc_entities, by_confidence):
+                        rel_key = (
+                            entity["entity_id"],
+                            other_entity["entity_id"],
+                            "CITED_TOGETHER"
+                        )
+                        
+                        if rel_key not in existing_index:
+                            relationships.append({
+                                "relationship_id": f"rel_cite_{len(relationships)}",
+                                "source_entity": entity["entity_id"],
+                                "target_entity": other_entity["entity_id"],
+                                "relationship_type": "CITED_TOGETHER",
+                                "confidence": 0.7 * self.citation_weight,
+                                "discovery_method": "citation",
+                                "evidence": evidence,
+                                "document_id": doc_id
+                            })
+                            existing_index.add(rel_key)
         
         return relationships
     
+    def _citation_targets(self,
+                          entity: Dict[str, Any],
+                          mentioned: List[Dict[str, Any]],
+                          doc_entities: List[Dict[str, Any]],
+                          by_confidence: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Other document entities to link a cited entity to, capped at max_citation_fanout."""
+        entity_id = entity["entity_id"]
+        if self.max_citation_fanout is None or len(doc_entities) - 1 <= self.max_citation_fanout:
+            return [e for e in doc_entities if e["entity_id"] != entity_id]
+        
+        targets = []
+        seen = {entity_id}
+        for candidate in mentioned + by_confidence:
+            if candidate["entity_id"] not in seen:
+                seen.add(candidate["entity_id"])
+                targets.append(candidate)
+                if len(targets) == self.max_citation_fanout:
+                    break
+        return targets
+    
+    @staticmethod
+    def _compile_mention_matcher(doc_entities: List[Dict[str, Any]]):
+        """
+        Build a function returning the indices of entities whose text occurs in a lowercased string.
+        
+        One alternation regex (longest text first, inside a lookahead so
+        overlapping mentions are all found) is compiled per document; texts
+        that are prefixes of a matched text are added from a precomputed
+        closure, so the result equals a substring test against every entity.
+        Entities without text never match.
+        """
+        entities_by_text = defaultdict(list)
+        for idx, entity in enumerate(doc_entities):
+            text = entity.get("entity_text", "").lower()
+            if text:
+                entities_by_text[text].append(idx)
+        if not entities_by_text:
+            return lambda text: []
+        
+        texts = sorted(entities_by_text, key=len, reverse=True)
+        pattern = re.compile("(?=(" + "|".join(re.escape(text) for text in texts) + "))")
+        prefixes = {
+            text: [text[:i] for i in range(1, len(text) + 1) if text[:i] in entities_by_text]
+            for text in texts
+        }
+        
+        def match(text: str) -> List[int]:
+            found = set()
+            for longest in set(pattern.findall(text)):
+                found.update(prefixes[longest])
+            return [idx for text_key in found for idx in entities_by_text[text_key]]
+        
+        return match
+    
     async def _discover_cross_document_relationships(self,
                                                     entities: List[Dict[str, Any]],
-                                                    existing_index: Set) -> List[Dict[str, Any]]:
+                                                    existing_index: Set,
+                                                    entities_by_doc: Optional[Dict[str, List[Dict[str, Any]]]] = None) -> List[Dict[str, Any]]:
         """Discover relationships between entities across documents."""
         relationships = []
         
@@ -244,14 +589,17 @@ class RelationshipDiscoverer:
             return relationships
         
         # Group entities by shared documents
-        doc_entity_map = defaultdict(list)
-        for entity in entities:
-            for doc_id in entity.get("document_ids", []):
-                doc_entity_map[doc_id].append(entity)
+        doc_entity_map = entities_by_doc
+        if doc_entity_map is None:
+            doc_entity_map = defaultdict(list)
+            for entity in entities:
+                for doc_id in entity.get("document_ids", []):
+                    doc_entity_map[doc_id].append(entity)
         
         # Find entities that co-occur across multiple documents
         entity_cooccurrence = defaultdict(set)
         for doc_id, doc_entities in doc_entity_map.items():
+            check_strategy_deadline()
             for i, entity1 in enumerate(doc_entities):
                 for entity2 in doc_entities[i+1:]:
                     pair = tuple(sorted([entity1["entity_id"], entity2["entity_id"]]))
@@ -282,7 +630,8 @@ class RelationshipDiscoverer:
     async def _infer_relationships_from_context(self,
                                                entities: List[Dict[str, Any]],
                                                chunks: Optional[List[Dict[str, Any]]],
-                                               existing_index: Set) -> List[Dict[str, Any]]:
+                                               existing_index: Set,
+                                               entities_by_chunk: Optional[Dict[str, List[Dict[str, Any]]]] = None) -> List[Dict[str, Any]]:
         """Infer relationships based on entity types and context."""
         if not chunks:
             return []
@@ -291,14 +640,16 @@ class RelationshipDiscoverer:
         entity_map = {e["entity_id"]: e for e in entities}
         
         # Group entities by chunk
-        entities_by_chunk = defaultdict(list)
-        for entity in entities:
-            chunk_id = entity.get("source_chunk_id")
-            if chunk_id:
-                entities_by_chunk[chunk_id].append(entity)
+        if entities_by_chunk is None:
+            entities_by_chunk = defaultdict(list)
+            for entity in entities:
+                chunk_id = entity.get("source_chunk_id")
+                if chunk_id:
+                    entities_by_chunk[chunk_id].append(entity)
         
         # Analyze each chunk for relationship patterns
         for chunk in chunks:
+            check_strategy_deadline()
             chunk_id = chunk.get("chunk_id")
             chunk_content = chunk.get("content", "").lower()
             chunk_entities = entities_by_chunk.get(chunk_id, [])
@@ -306,12 +657,15 @@ class RelationshipDiscoverer:
             if len(chunk_entities) < 2:
                 continue
             
+            # Locate relationship patterns once per chunk
+            context_index = self._index_context(chunk_content)
+            
             # Check for relationship patterns in chunk text
             for i, entity1 in enumerate(chunk_entities):
                 for entity2 in chunk_entities[i+1:]:
                     # Try to infer relationship based on entity types
                     rel_type = self._infer_relationship_type(
-                        entity1, entity2, chunk_content
+                        entity1, entity2, chunk_content, context_index
                     )
                     
                     if rel_type:
@@ -332,10 +686,29 @@ class RelationshipDiscoverer:
         
         return relationships
     
+    def _index_context(self, context: str) -> ContextPatternIndex:
+        """Find the first position of every relationship pattern in one regex pass."""
+        first_positions = {}
+        for match in self._pattern_regex.finditer(context):
+            for pattern in self._pattern_prefixes[match.group(1)]:
+                first_positions.setdefault(pattern, match.start())
+        
+        entries = sorted(
+            (position, order, rel_type)
+            for pattern, position in first_positions.items()
+            for order, rel_type in self._pattern_owners[pattern]
+        )
+        return ContextPatternIndex(
+            context=context,
+            positions=[entry[0] for entry in entries],
+            entries=entries
+        )
+    
     def _infer_relationship_type(self,
                                 entity1: Dict[str, Any],
                                 entity2: Dict[str, Any],
-                                context: str) -> Optional[str]:
+                                context: str,
+                                context_index: Optional[ContextPatternIndex] = None) -> Optional[str]:
         """Infer relationship type based on entity types and context."""
         type1 = entity1.get("entity_type", "")
         type2 = entity2.get("entity_type", "")
@@ -350,25 +723,17 @@ class RelationshipDiscoverer:
         if reverse_pair in self.INFERENCE_RULES:
             return self.INFERENCE_RULES[reverse_pair]
         
-        # Check for relationship patterns in context
-        entity1_text = entity1.get("entity_text", "").lower()
-        entity2_text = entity2.get("entity_text", "").lower()
+        # Check for relationship patterns between the entities' first mentions
+        if context_index is None:
+            context_index = self._index_context(context)
         
-        for rel_type, patterns in self.LEGAL_RELATIONSHIP_PATTERNS.items():
-            for pattern in patterns:
-                # Check if pattern appears between entities in context
-                if pattern in context:
-                    # Simple proximity check
-                    if entity1_text in context and entity2_text in context:
-                        pos1 = context.find(entity1_text)
-                        pos2 = context.find(entity2_text)
-                        pattern_pos = context.find(pattern)
-                        
-                        # Pattern should be between entities (roughly)
-                        if min(pos1, pos2) < pattern_pos < max(pos1, pos2):
-                            return rel_type
+        pos1 = context_index.entity_position(entity1.get("entity_text", "").lower())
+        pos2 = context_index.entity_position(entity2.get("entity_text", "").lower())
+        if pos1 < 0 or pos2 < 0:
+            return None
         
-        return None
+        # Pattern should be between entities (roughly)
+        return context_index.first_between(min(pos1, pos2), max(pos1, pos2))
     
     async def _discover_cooccurrence_relationships(self,
                                                   entities: List[Dict[str, Any]],
@@ -380,53 +745,66 @@ class RelationshipDiscoverer:
         
         relationships = []
         
-        # Calculate co-occurrence matrix
+        # Accumulate co-occurring pairs sparsely as packed int64 keys (i * n + j, i < j)
         entity_ids = [e["entity_id"] for e in entities]
-        cooccurrence_matrix = np.zeros((len(entity_ids), len(entity_ids)))
+        n = len(entity_ids)
+        matcher = self._compile_mention_matcher(entities)
+        pair_keys = np.empty(0, dtype=np.int64)
+        pair_counts = np.empty(0, dtype=np.int64)
+        pending: List[np.ndarray] = []
+        pending_size = 0
         
-        # Count co-occurrences in chunks
         for chunk in chunks:
-            chunk_content = chunk.get("content", "").lower()
-            
-            # Find which entities appear in this chunk
-            appearing_entities = []
-            for i, entity in enumerate(entities):
-                entity_text = entity.get("entity_text", "").lower()
-                if entity_text in chunk_content:
-                    appearing_entities.append(i)
-            
-            # Update co-occurrence matrix
-            for i in appearing_entities:
-                for j in appearing_entities:
-                    if i != j:
-                        cooccurrence_matrix[i][j] += 1
+            check_strategy_deadline()
+            appearing = np.unique(np.asarray(matcher(chunk.get("content", "").lower()), dtype=np.int64))
+            if len(appearing) < 2:
+                continue
+            rows, cols = np.triu_indices(len(appearing), k=1)
+            pending.append(appearing[rows] * n + appearing[cols])
+            pending_size += len(rows)
+            if pending_size >= self.COOCCURRENCE_FLUSH_PAIRS:
+                pair_keys, pair_counts = self._merge_pair_counts(pair_keys, pair_counts, pending)
+                pending, pending_size = [], 0
+        
+        pair_keys, pair_counts = self._merge_pair_counts(pair_keys, pair_counts, pending)
         
         # Create relationships for strong co-occurrences
         threshold = 3  # Minimum co-occurrences
-        for i in range(len(entity_ids)):
-            for j in range(i+1, len(entity_ids)):
-                cooccurrence_count = cooccurrence_matrix[i][j]
+        strong = pair_counts >= threshold
+        for key, cooccurrence_count in zip(pair_keys[strong].tolist(), pair_counts[strong].tolist()):
+            i, j = divmod(key, n)
+            rel_key = (entity_ids[i], entity_ids[j], "FREQUENTLY_COOCCURS")
+            
+            if rel_key not in existing_index:
+                confidence = min(0.5 + (cooccurrence_count * 0.05), 0.9)
                 
-                if cooccurrence_count >= threshold:
-                    rel_key = (entity_ids[i], entity_ids[j], "FREQUENTLY_COOCCURS")
-                    
-                    if rel_key not in existing_index:
-                        confidence = min(0.5 + (cooccurrence_count * 0.05), 0.9)
-                        
-                        relationships.append({
-                            "relationship_id": f"rel_cooc_{len(relationships)}",
-                            "source_entity": entity_ids[i],
-                            "target_entity": entity_ids[j],
-                            "relationship_type": "FREQUENTLY_COOCCURS",
-                            "confidence": confidence,
-                            "discovery_method": "cooccurrence",
-                            "evidence": [f"Co-occur in {int(cooccurrence_count)} chunks"],
-                            "cooccurrence_count": int(cooccurrence_count)
-                        })
-                        existing_index.add(rel_key)
+                relationships.append({
+                    "relationship_id": f"rel_cooc_{len(relationships)}",
+                    "source_entity": entity_ids[i],
+                    "target_entity": entity_ids[j],
+                    "relationship_type": "FREQUENTLY_COOCCURS",
+                    "confidence": confidence,
+                    "discovery_method": "cooccurrence",
+                    "evidence": [f"Co-occur in {cooccurrence_count} chunks"],
+                    "cooccurrence_count": cooccurrence_count
+                })
+                existing_index.add(rel_key)
         
         return relationships
     
+    @staticmethod
+    def _merge_pair_counts(pair_keys: np.ndarray,
+                           pair_counts: np.ndarray,
+                           pending: List[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        """Fold buffered pair keys into sorted unique keys with counts."""
+        if not pending:
+            return pair_keys, pair_counts
+        new_keys, new_counts = np.unique(np.concatenate(pending), return_counts=True)
+        keys = np.concatenate([pair_keys, new_keys])
+        counts = np.concatenate([pair_counts, new_counts])
+        merged_keys, inverse = np.unique(keys, return_inverse=True)
+        return merged_keys, np.bincount(inverse, weights=counts, minlength=len(merged_keys)).astype(np.int64)
+    
     async def _enhance_relationships(self,
                                     relationships: List[Dict[str, Any]],
                                     entities: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
@@ -465,56 +843,123 @@ class RelationshipDiscoverer:
         """
         cross_doc_links = []
         
-        # Build document-entity index
+        # Build document-entity index and its inverse
         doc_entity_map = defaultdict(set)
+        entity_index = {}
         for entity in all_entities:
             for doc_id in entity.get("document_ids", []):
                 doc_entity_map[doc_id].add(entity["entity_id"])
+            entity_index.setdefault(entity["entity_id"], len(entity_index))
         
-        # Find document pairs with shared entities
         doc_ids = list(doc_entity_map.keys())
-        for i, doc1 in enumerate(doc_ids):
-            for doc2 in doc_ids[i+1:]:
-                shared_entities = doc_entity_map[doc1] & doc_entity_map[doc2]
-                
-                if shared_entities:
-                    # Determine link type based on shared entities
-                    link_type = self._determine_link_type(
-                        shared_entities, all_entities, all_relationships
-                    )
-                    
-                    cross_doc_links.append({
-                        "source_document_id": doc1,
-                        "target_document_id": doc2,
-                        "link_type": link_type,
-                        "shared_entities": list(shared_entities),
-                        "strength": len(shared_entities) / min(
-                            len(doc_entity_map[doc1]),
-                            len(doc_entity_map[doc2])
-                        )
-                    })
+        if len(doc_ids) < 2:
+            return cross_doc_links
+        
+        # Shared-entity counts for document pairs via the sparse incidence product
+        rows, cols = [], []
+        for doc_idx, doc_id in enumerate(doc_ids):
+            for entity_id in doc_entity_map[doc_id]:
+                rows.append(doc_idx)
+                cols.append(entity_index[entity_id])
+        incidence = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.int32), (rows, cols)),
+            shape=(len(doc_ids), len(entity_index))
+        )
+        shared_counts = sparse.triu(incidence @ incidence.T, k=1).tocoo()
+        pair_order = np.lexsort((shared_counts.col, shared_counts.row))
+        
+        entity_ranks = self._link_type_ranks(all_entities)
+        
+        for pair in pair_order.tolist():
+            doc1 = doc_ids[shared_counts.row[pair]]
+            doc2 = doc_ids[shared_counts.col[pair]]
+            shared_entities = doc_entity_map[doc1] & doc_entity_map[doc2]
+            
+            # Determine link type based on shared entities
+            link_type = self._determine_link_type(
+                shared_entities, all_entities, all_relationships, entity_ranks
+            )
+            
+            cross_doc_links.append({
+                "source_document_id": doc1,
+                "target_document_id": doc2,
+                "link_type": link_type,
+                "shared_entities": list(shared_entities),
+                "strength": int(shared_counts.data[pair]) / min(
+                    len(doc_entity_map[doc1]),
+                    len(doc_entity_map[doc2])
+                )
+            })
         
         return cross_doc_links
     
+    def _link_type_ranks(self, all_entities: List[Dict[str, Any]]) -> Dict[str, int]:
+        """Precedence rank of the strongest link type each entity implies."""
+        default_rank = len(self.LINK_TYPE_PRECEDENCE)
+        type_ranks = {}
+        for rank, (_, entity_types) in reversed(list(enumerate(self.LINK_TYPE_PRECEDENCE))):
+            for entity_type in entity_types:
+                type_ranks[entity_type] = rank
+        
+        entity_ranks = {}
+        for entity in all_entities:
+            rank = type_ranks.get(entity.get("entity_type", ""), default_rank)
+            entity_ranks[entity["entity_id"]] = min(rank, entity_ranks.get(entity["entity_id"], default_rank))
+        return entity_ranks
+    
     def _determine_link_type(self,
                             shared_entities: Set[str],
                             all_entities: List[Dict[str, Any]],
-                            all_relationships: List[Dict[str, Any]]) -> str:
+                            all_relationships: List[Dict[str, Any]],
+                            entity_ranks: Optional[Dict[str, int]] = None) -> str:
         """Determine the type of cross-document link."""
-        # Get entity types for shared entities
-        entity_types = []
-        for entity in all_entities:
-            if entity["entity_id"] in shared_entities:
-                entity_types.append(entity.get("entity_type", ""))
-        
-        # Determine link type based on entity types
-        if "CASE" in entity_types or "CITATION" in entity_types:
-            return "CITATION_LINK"
-        elif "PARTY" in entity_types:
-            return "SHARED_PARTY"
-        elif "COURT" in entity_types or "JUDGE" in entity_types:
-            return "SAME_JURISDICTION"
-        elif "CONTRACT" in entity_types:
-            return "RELATED_CONTRACT"
-        else:
-            return "GENERAL_REFERENCE"
\ No newline at end of file
+        if entity_ranks is None:
+            entity_ranks = self._link_type_ranks(all_entities)
+        
+        default_rank = len(self.LINK_TYPE_PRECEDENCE)
+        rank = min((entity_ranks.get(entity_id, default_rank) for entity_id in shared_entities), default=default_rank)
+        
+        if rank < default_rank:
+            return self.LINK_TYPE_PRECEDENCE[rank][0]
+        return "GENERAL_REFERENCE"
+
+
+async def _citation_strategy(discoverer: RelationshipDiscoverer, context: DiscoveryContext) -> List[Dict[str, Any]]:
+    if not context.citations:
+        return []
+    return await discoverer._discover_citation_relationships(
+        context.entities, context.citations, set(context.existing_index), context.entities_by_doc
+    )
+
+
+async def _cross_document_strategy(discoverer: RelationshipDiscoverer, context: DiscoveryContext) -> List[Dict[str, Any]]:
+    return await discoverer._discover_cross_document_relationships(
+        context.entities, set(context.existing_index), context.entities_by_doc
+    )
+
+
+async def _inference_strategy(discoverer: RelationshipDiscoverer, context: DiscoveryContext) -> List[Dict[str, Any]]:
+    return await discoverer._infer_relationships_from_context(
+        context.entities, context.chunks, set(context.existing_index), context.entities_by_chunk
+    )
+
+
+async def _cooccurrence_strategy(discoverer: RelationshipDiscoverer, context: DiscoveryContext) -> List[Dict[str, Any]]:
+    return await discoverer._discover_cooccurrence_relationships(
+        context.entities, context.chunks, set(context.existing_index)
+    )
+
+
+# Discovery strategies in merge order; earlier strategies win duplicate relationships
+DISCOVERY_STRATEGIES: Dict[str, DiscoveryStrategy] = {}
+
+
+def register_discovery_strategy(strategy: DiscoveryStrategy) -> None:
+    """Register (or replace) a relationship discovery strategy."""
+    DISCOVERY_STRATEGIES[strategy.name] = strategy
+
+
+register_discovery_strategy(DiscoveryStrategy("citation", "rel_cite", _citation_strategy))
+register_discovery_strategy(DiscoveryStrategy("cross_document", "rel_cross", _cross_document_strategy))
+register_discovery_strategy(DiscoveryStrategy("inference", "rel_infer", _inference_strategy))
+register_discovery_strategy(DiscoveryStrategy("cooccurrence", "rel_cooc", _cooccurrence_strategy))
@@ -0,0 +1,145 @@
+"""
+Search Result Cache Module
+LRU + TTL cache for vector search results with per-tenant quotas and invalidation
+"""
+
+import dataclasses
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from enum import Enum
+from typing import Any, Dict, Optional, Tuple
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    return str(value)
+
+
+class SearchResultCache:
+    """
+    Result cache keyed by a hash of the complete search query.
+
+    Entries expire after ttl seconds and are evicted least-recently-used
+    first, both globally (max_entries) and within a tenant once its cached
+    results exceed tenant_quota_bytes. invalidate_client drops everything
+    cached for a client_id after its graph changes.
+    """
+
+    def __init__(self, max_entries: int = 1000, ttl: float = 3600, tenant_quota_bytes: int = 16 * 1024 * 1024):
+        """
+        Initialize result cache.
+
+        Args:
+            max_entries: Maximum cached results across all tenants
+            ttl: Seconds before an entry expires
+            tenant_quota_bytes: Approximate serialized size allowed per client_id
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.tenant_quota_bytes = tenant_quota_bytes
+
+        # key -> (expires_at, client_id, size_bytes, result)
+        self._entries: "OrderedDict[str, Tuple[float, str, int, Any]]" = OrderedDict()
+        self._tenant_keys: Dict[str, "OrderedDict[str, None]"] = {}
+        self._tenant_bytes: Dict[str, int] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def build_key(query: Any) -> str:
+        """Hash every field of a query dataclass (text, tenant, limits, thresholds, scope, filters, weights)."""
+        payload = json.dumps(dataclasses.asdict(query), sort_keys=True, default=_json_default)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry[0] < time.monotonic():
+            self._remove(key)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self._tenant_keys[entry[1]].move_to_end(key)
+        self.hits += 1
+        return entry[3]
+
+    def put(self, key: str, client_id: str, result: Any) -> None:
+        if key in self._entries:
+            self._remove(key)
+
+        size = self._estimate_size(result)
+        if size > self.tenant_quota_bytes:
+            return
+
+        self._entries[key] = (time.monotonic() + self.ttl, client_id, size, result)
+        self._tenant_keys.setdefault(client_id, OrderedDict())[key] = None
+        self._tenant_bytes[client_id] = self._tenant_bytes.get(client_id, 0) + size
+
+        # Tenant quota, then global size; least recently used first
+        while self._tenant_bytes[client_id] > self.tenant_quota_bytes:
+            self._remove(next(iter(self._tenant_keys[client_id])))
+            self.evictions += 1
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def invalidate_client(self, client_id: Optional[str]) -> int:
+        """Drop all cached results for a tenant; returns the number removed."""
+        keys = list(self._tenant_keys.get(client_id, ()))
+        for key in keys:
+            self._remove(key)
+        if keys:
+            self.invalidations += 1
+            logger.info("🧹 Search cache invalidated", client_id=client_id, entries=len(keys))
+        return len(keys)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._tenant_keys.clear()
+        self._tenant_bytes.clear()
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "bytes": sum(self._tenant_bytes.values()),
+            "tenants": len(self._tenant_keys)
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, key: str) -> None:
+        _, client_id, size, _ = self._entries.pop(key)
+        tenant_keys = self._tenant_keys[client_id]
+        del tenant_keys[key]
+        self._tenant_bytes[client_id] -= size
+        if not tenant_keys:
+            del self._tenant_keys[client_id]
+            del self._tenant_bytes[client_id]
+
+    @staticmethod
+    def _estimate_size(result: Any) -> int:
+        """Approximate memory footprint as the serialized length of the result."""
+        if dataclasses.is_dataclass(result):
+            result = dataclasses.asdict(result)
+        return len(json.dumps(result, default=_json_default))
@@ -0,0 +1,304 @@
+"""
+Tenant Analytics Job Module
+Materializes graph analytics for whole tenants (client or case) on demand or on a schedule
+"""
+
+import asyncio
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import structlog
+
+from .config import GraphRAGSettings
+from .graph_analytics import GraphAnalytics
+from .tenant_graph_loader import TenantGraph, TenantGraphLoader
+
+logger = structlog.get_logger(__name__)
+
+
+def tenant_key(client_id: str, case_id: Optional[str]) -> str:
+    """
+    Key used by graph.tenant_change_counters and graph.tenant_analytics.
+
+    The client-wide key (case_id None) is bumped by changes in any of the
+    client's cases, matching the client-wide job that loads all of them.
+    """
+    return f"{client_id}:{case_id or ''}"
+
+
+class TenantAnalyticsJobRunner:
+    """
+    Computes analytics tiers over stored tenant graphs and materializes them.
+
+    Results live in graph.tenant_analytics with the tenant's change counter
+    at computation time (graph.tenant_change_counters, bumped by triggers on
+    graph.nodes / graph.edges). A job whose tenant counter has not moved since
+    the stored row returns immediately without loading the graph, so reads
+    are served from the table and recomputation only happens after changes.
+    Optionally, a scheduler refreshes every stale tenant periodically.
+    """
+
+    def __init__(self, settings: GraphRAGSettings, supabase_client):
+        """
+        Initialize job runner.
+
+        Args:
+            settings: GraphRAG configuration settings
+            supabase_client: SupabaseClient used for reads and upserts
+        """
+        self.settings = settings
+        self.supabase_client = supabase_client
+        self.loader = TenantGraphLoader(
+            supabase_client,
+            page_size=settings.tenant_graph_page_size,
+            max_nodes=settings.tenant_graph_max_nodes,
+            max_edges=settings.tenant_graph_max_edges
+        )
+        self.jobs: Dict[str, Dict[str, Any]] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._scheduler: Optional[asyncio.Task] = None
+
+    def submit(self,
+               client_id: str,
+               case_id: Optional[str] = None,
+               tier: Optional[str] = None,
+               force: bool = False) -> Dict[str, Any]:
+        """
+        Start a materialization job, or return the one already running for the tenant.
+
+        Returns:
+            Job status record
+        """
+        tier = tier or self.settings.tenant_analytics_tier
+        if tier not in GraphAnalytics.TIERS:
+            raise ValueError(f"Unknown analytics tier: {tier}")
+
+        for job in self.jobs.values():
+            if (job["client_id"] == client_id and job["case_id"] == case_id
+                    and job["status"] in ("queued", "running")):
+                return job
+
+        job_id = f"tenant_analytics_{uuid.uuid4().hex[:12]}"
+        job = {
+            "job_id": job_id,
+            "client_id": client_id,
+            "case_id": case_id,
+            "tier": tier,
+            "force": force,
+            "status": "queued",
+            "submitted_at": datetime.utcnow().isoformat(),
+            "started_at": None,
+            "completed_at": None,
+            "result": None,
+            "error": None
+        }
+        self.jobs[job_id] = job
+        self._tasks[job_id] = asyncio.create_task(self._run(job))
+        return job
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return a job status record, if known."""
+        return self.jobs.get(job_id)
+
+    async def get_materialized(self, client_id: str, case_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Read the stored analytics row for a tenant, with a staleness flag.
+
+        Returns:
+            Row from graph.tenant_analytics plus current_change_counter and
+            is_stale, or None if nothing has been materialized yet
+        """
+        key = tenant_key(client_id, case_id)
+        row = await self._get_row("tenant_analytics", key)
+        if not row:
+            return None
+        current = await self._change_counter(key)
+        return {
+            **row,
+            "current_change_counter": current,
+            "is_stale": current != row.get("source_change_counter")
+        }
+
+    def start_scheduler(self) -> None:
+        """Refresh stale tenants every tenant_analytics_refresh_interval seconds (0 disables)."""
+        if self.settings.tenant_analytics_refresh_interval > 0 and self._scheduler is None:
+            self._scheduler = asyncio.create_task(self._schedule())
+
+    async def stop_scheduler(self) -> None:
+        if self._scheduler:
+            self._scheduler.cancel()
+            try:
+                await self._scheduler
+            except asyncio.CancelledError:
+                pass
+            self._scheduler = None
+
+    async def refresh_stale(self) -> List[Dict[str, Any]]:
+        """Submit jobs for every tenant whose change counter moved since materialization, at its stored tier."""
+        counters = await self._scan("tenant_change_counters", "tenant_key,client_id,case_id,change_counter")
+        materialized = {
+            row["tenant_key"]: row
+            for row in await self._scan("tenant_analytics", "tenant_key,tier,source_change_counter")
+        }
+        return [
+            self.submit(row["client_id"], row["case_id"] or None,
+                        tier=materialized.get(row["tenant_key"], {}).get("tier"))
+            for row in counters
+            if materialized.get(row["tenant_key"], {}).get("source_change_counter") != row["change_counter"]
+        ]
+
+    async def _schedule(self) -> None:
+        while True:
+            await asyncio.sleep(self.settings.tenant_analytics_refresh_interval)
+            try:
+                jobs = await self.refresh_stale()
+                if jobs:
+                    logger.info("🕒 Scheduled tenant analytics refresh", jobs=len(jobs))
+            except Exception as e:
+                logger.error("❌ Scheduled tenant analytics refresh failed", error=str(e))
+
+    async def _run(self, job: Dict[str, Any]) -> None:
+        """Check the change counter, then load, analyze and store one tenant."""
+        job["status"] = "running"
+        job["started_at"] = datetime.utcnow().isoformat()
+        start_time = time.time()
+        key = tenant_key(job["client_id"], job["case_id"])
+
+        try:
+            # Read the counter before loading so changes made during the run mark it stale
+            change_counter = await self._change_counter(key)
+            stored = await self._get_row("tenant_analytics", key)
+            if (stored and not job["force"]
+                    and stored.get("source_change_counter") == change_counter
+                    and stored.get("tier") == job["tier"]):
+                job["result"] = {
+                    "recomputed": False,
+                    "change_counter": change_counter,
+                    "computed_at": stored.get("computed_at")
+                }
+                job["status"] = "completed"
+                return
+
+            tenant_graph = await self.loader.load(job["client_id"], job["case_id"])
+            load_time = time.time() - start_time
+
+            analytics = await asyncio.to_thread(self._analyze, tenant_graph, job["tier"])
+            analysis_time = time.time() - start_time - load_time
+
+            computed_at = datetime.utcnow().isoformat()
+            await self.supabase_client.schema("graph", admin_operation=True) \
+                .table("tenant_analytics") \
+                .upsert({
+                    "tenant_key": key,
+                    "client_id": job["client_id"],
+                    "case_id": job["case_id"],
+                    "tier": job["tier"],
+                    "analytics": analytics,
+                    "node_count": tenant_graph.node_count,
+                    "edge_count": tenant_graph.edge_count,
+                    "source_change_counter": change_counter,
+                    "computation_seconds": round(load_time + analysis_time, 3),
+                    "computed_at": computed_at
+                }, on_conflict="tenant_key") \
+                .execute()
+
+            job["result"] = {
+                "recomputed": True,
+                "change_counter": change_counter,
+                "computed_at": computed_at,
+                "nodes": tenant_graph.node_count,
+                "edges": tenant_graph.edge_count,
+                "load_time_seconds": round(load_time, 2),
+                "analysis_time_seconds": round(analysis_time, 2),
+                "total_time_seconds": round(time.time() - start_time, 2)
+            }
+            job["status"] = "completed"
+            logger.info("✅ Tenant analytics materialized", job_id=job["job_id"], **job["result"])
+
+        except Exception as e:
+            job["status"] = "failed"
+            job["error"] = str(e)
+            logger.error("❌ Tenant analytics job failed", job_id=job["job_id"], error=str(e))
+
+        finally:
+            job["completed_at"] = datetime.utcnow().isoformat()
+            self._tasks.pop(job["job_id"], None)
+
+    def _analyze(self, tenant_graph: TenantGraph, tier: str) -> Dict[str, Any]:
+        """Run the analytics tier on a tenant graph (CPU-bound, off the event loop)."""
+        entities = [{"entity_id": node_id} for node_id in tenant_graph.node_ids]
+        node_ids = tenant_graph.node_ids
+        relationships = [
+            {"source_entity": node_ids[source], "target_entity": node_ids[target], "confidence": float(weight)}
+            for source, target, weight in zip(
+                tenant_graph.sources.tolist(), tenant_graph.targets.tolist(), tenant_graph.weights.tolist()
+            )
+        ]
+
+        engine = GraphAnalytics(
+            tier=tier,
+            time_budget_seconds=self.settings.tenant_analytics_time_budget,
+            approximation_threshold=self.settings.analytics_approximation_threshold,
+            betweenness_samples=self.settings.analytics_betweenness_samples,
+            backend=self.settings.analytics_backend,
+            component_parallel_threshold=self.settings.analytics_component_parallel_threshold
+        )
+        analytics = asyncio.run(engine.analyze_graph(entities, relationships, []))
+        return self._summarize(analytics)
+
+    @classmethod
+    def _summarize(cls, analytics: Dict[str, Any]) -> Dict[str, Any]:
+        """Drop per-node value maps (top_entities keeps the leaders) and make the result JSON-safe."""
+        centrality = {
+            metric: {key: value for key, value in stats.items() if key != "values"}
+            for metric, stats in analytics.get("centrality_analysis", {}).items()
+        }
+        return cls._json_safe({**analytics, "centrality_analysis": centrality})
+
+    @classmethod
+    def _json_safe(cls, value: Any) -> Any:
+        """Convert numpy scalars, tuples and sets for JSONB; NaN/inf become null."""
+        if isinstance(value, dict):
+            return {str(key): cls._json_safe(item) for key, item in value.items()}
+        if isinstance(value, (list, tuple, set, frozenset)):
+            items = sorted(value) if isinstance(value, (set, frozenset)) else value
+            return [cls._json_safe(item) for item in items]
+        if isinstance(value, np.generic):
+            value = value.item()
+        if isinstance(value, float) and not np.isfinite(value):
+            return None
+        return value
+
+    async def _change_counter(self, key: str) -> int:
+        row = await self._get_row("tenant_change_counters", key)
+        return int(row["change_counter"]) if row else 0
+
+    async def _get_row(self, table: str, key: str) -> Optional[Dict[str, Any]]:
+        response = await self.supabase_client.schema("graph", admin_operation=True) \
+            .table(table) \
+            .select("*") \
+            .eq("tenant_key", key) \
+            .limit(1) \
+            .execute()
+        return response.data[0] if response.data else None
+
+    async def _scan(self, table: str, columns: str) -> List[Dict[str, Any]]:
+        """Keyset-scan a tenant-keyed table."""
+        rows: List[Dict[str, Any]] = []
+        last_key = None
+        page_size = self.settings.tenant_graph_page_size
+        while True:
+            query = self.supabase_client.schema("graph", admin_operation=True) \
+                .table(table) \
+                .select(columns)
+            if last_key is not None:
+                query = query.gt("tenant_key", last_key)
+            response = await query.order("tenant_key").limit(page_size).execute()
+            page = response.data or []
+            rows.extend(page)
+            if len(page) < page_size:
+                return rows
+            last_key = page[-1]["tenant_key"]
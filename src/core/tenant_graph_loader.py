@@ -0,0 +1,206 @@
+"""
+Tenant Graph Loader Module
+Streams a tenant's stored graph (graph.nodes + graph.edges) into compact arrays
+"""
+
+from array import array
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import igraph as ig
+import numpy as np
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+
+class TenantGraphTooLargeError(Exception):
+    """Raised when a tenant graph exceeds the configured memory guard."""
+    pass
+
+
+@dataclass
+class TenantGraph:
+    """
+    Compact in-memory representation of a tenant graph.
+
+    Nodes are addressed by their position in node_ids; edges are stored as
+    parallel int32 endpoint arrays and a float32 weight array, which keeps a
+    100K-node / 100K-edge case in a few megabytes.
+    """
+    client_id: str
+    case_id: Optional[str]
+    node_ids: List[str]
+    sources: np.ndarray
+    targets: np.ndarray
+    weights: np.ndarray
+    skipped_edges: int = 0
+
+    @property
+    def node_count(self) -> int:
+        return len(self.node_ids)
+
+    @property
+    def edge_count(self) -> int:
+        return int(self.sources.shape[0])
+
+    def to_igraph(self) -> ig.Graph:
+        """
+        Build an undirected weighted igraph graph.
+
+        Parallel edges are merged by summing weights and self-loops are
+        dropped, matching the NetworkX graphs used for per-document detection.
+        """
+        graph = ig.Graph(n=self.node_count, edges=np.column_stack((self.sources, self.targets)))
+        graph.es['weight'] = self.weights.astype(np.float64)
+        graph.simplify(multiple=True, loops=True, combine_edges={'weight': 'sum'})
+        graph.vs['original_id'] = self.node_ids
+        graph['node_index'] = {node_id: idx for idx, node_id in enumerate(self.node_ids)}
+        return graph
+
+
+class TenantGraphLoader:
+    """
+    Loads tenant graphs from Supabase using keyset pagination.
+
+    Pages are ordered by the unique text keys (node_id / edge_id) and fetched
+    with ``key > last_key`` rather than OFFSET, so every page costs one index
+    range scan regardless of how deep into the table the load is.
+    """
+
+    def __init__(self,
+                 supabase_client,
+                 page_size: int = 1000,
+                 max_nodes: int = 250000,
+                 max_edges: int = 1000000):
+        """
+        Initialize tenant graph loader.
+
+        Args:
+            supabase_client: SupabaseClient used for fluent graph-schema queries
+            page_size: Rows fetched per keyset page
+            max_nodes: Abort the load if the tenant has more nodes than this
+            max_edges: Abort the load if the tenant has more edges than this
+        """
+        self.supabase_client = supabase_client
+        self.page_size = page_size
+        self.max_nodes = max_nodes
+        self.max_edges = max_edges
+
+    async def load(self, client_id: str, case_id: Optional[str] = None) -> TenantGraph:
+        """
+        Stream all nodes and edges for a client (and optionally a case).
+
+        Edges whose endpoints are not part of the tenant's node set are
+        skipped and counted in ``skipped_edges``.
+
+        Raises:
+            TenantGraphTooLargeError: If the node or edge guard is exceeded
+        """
+        node_ids: List[str] = []
+        async for page in self.iterate_pages("nodes", "node_id", "node_id", client_id, case_id):
+            node_ids.extend(row["node_id"] for row in page)
+            if len(node_ids) > self.max_nodes:
+                raise TenantGraphTooLargeError(
+                    f"Tenant graph exceeds {self.max_nodes} nodes (client_id={client_id}, case_id={case_id})"
+                )
+
+        node_index = {node_id: idx for idx, node_id in enumerate(node_ids)}
+        sources = array('i')
+        targets = array('i')
+        weights = array('f')
+        skipped_edges = 0
+
+        async for page in self.iterate_pages(
+            "edges",
+            "edge_id",
+            "edge_id,source_node_id,target_node_id,weight,confidence_score",
+            client_id,
+            case_id
+        ):
+            for row in page:
+                source = node_index.get(row["source_node_id"])
+                target = node_index.get(row["target_node_id"])
+                if source is None or target is None:
+                    skipped_edges += 1
+                    continue
+                sources.append(source)
+                targets.append(target)
+                weights.append(self._edge_weight(row))
+            if len(sources) > self.max_edges:
+                raise TenantGraphTooLargeError(
+                    f"Tenant graph exceeds {self.max_edges} edges (client_id={client_id}, case_id={case_id})"
+                )
+
+        logger.info(
+            "📥 Tenant graph loaded",
+            client_id=client_id,
+            case_id=case_id,
+            nodes=len(node_ids),
+            edges=len(sources),
+            skipped_edges=skipped_edges
+        )
+
+        return TenantGraph(
+            client_id=client_id,
+            case_id=case_id,
+            node_ids=node_ids,
+            sources=np.frombuffer(sources, dtype=np.int32),
+            targets=np.frombuffer(targets, dtype=np.int32),
+            weights=np.frombuffer(weights, dtype=np.float32),
+            skipped_edges=skipped_edges
+        )
+
+    async def load_node_values(self,
+                               client_id: str,
+                               case_id: Optional[str],
+                               column: str) -> Dict[str, Any]:
+        """Stream one graph.nodes column for a tenant (nulls are skipped)."""
+        values: Dict[str, Any] = {}
+        async for page in self.iterate_pages("nodes", "node_id", f"node_id,{column}", client_id, case_id):
+            values.update((row["node_id"], row[column]) for row in page if row.get(column) is not None)
+        return values
+
+    async def iterate_pages(self,
+                            table: str,
+                            key_column: str,
+                            columns: str,
+                            client_id: str,
+                            case_id: Optional[str]):
+        """
+        Yield successive keyset pages of a tenant-scoped graph table.
+
+        Args:
+            table: graph-schema table name
+            key_column: Unique column the pages are ordered and resumed by
+            columns: Columns selected per row
+            client_id: Tenant client
+            case_id: Optional case within the tenant
+        """
+        last_key = None
+        while True:
+            query = self.supabase_client.schema("graph", admin_operation=True) \
+                .table(table) \
+                .select(columns) \
+                .eq("client_id", client_id)
+            if case_id:
+                query = query.eq("case_id", case_id)
+            if last_key is not None:
+                query = query.gt(key_column, last_key)
+            response = await query.order(key_column).limit(self.page_size).execute()
+
+            rows = response.data or []
+            if not rows:
+                return
+            yield rows
+            if len(rows) < self.page_size:
+                return
+            last_key = rows[-1][key_column]
+
+    @staticmethod
+    def _edge_weight(row: Dict[str, Any]) -> float:
+        """Pick the stored edge weight, falling back to confidence."""
+        weight = row.get("weight")
+        if weight is None:
+            weight = row.get("confidence_score")
+        return float(weight) if weight is not None else 1.0
@@ -0,0 +1,559 @@
+"""
+Vector Index Module
+In-process per-tenant vector indexes that offload semantic search from pgvector
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+import structlog
+
+from .tenant_graph_loader import TenantGraphLoader
+
+logger = structlog.get_logger(__name__)
+
+
+# scope -> (graph table, unique key column, columns loaded during hydration)
+INDEX_SCOPES: Dict[str, Tuple[str, str, str]] = {
+    "chunks": (
+        "chunks",
+        "chunk_id",
+        "id,chunk_id,document_id,chunk_index,content,embedding_model,embeddings,created_at"
+    ),
+    "nodes": (
+        "nodes",
+        "node_id",
+        "node_id,name,type,description,rank_score,embeddings,created_at"
+    )
+}
+
+
+def parse_embedding(value: Any) -> Optional[np.ndarray]:
+    """Decode a pgvector value (PostgREST returns "[x,y,...]" strings) into float32."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        vector = np.fromstring(value.strip("[]"), dtype=np.float32, sep=",")
+    else:
+        vector = np.asarray(value, dtype=np.float32)
+    return vector if vector.size else None
+
+
+class TenantVectorIndex:
+    """
+    Cosine-similarity index over one tenant's embeddings.
+
+    Vectors are L2-normalized rows of a float32 matrix. Below ivf_min_rows
+    every search is an exact matrix-vector product; above it the rows are
+    clustered with spherical k-means (IVF-flat) and a search scans only the
+    nprobe closest lists. Upserts overwrite rows in place or append them to
+    their nearest list, deletes are tombstoned, and the lists are retrained
+    once the live row count doubles or a quarter of the rows are dead.
+    Writes with rebuild=False leave that to the caller: needs_rebuild()
+    reports it is due and rebuilt() builds the replacement from layout()
+    without touching this index, so it can run in a worker thread.
+    """
+
+    def __init__(self, dimensions: int, ivf_min_rows: int = 10000, nprobe: int = 8):
+        self.dimensions = dimensions
+        self.ivf_min_rows = ivf_min_rows
+        self.nprobe = nprobe
+
+        self._vectors = np.empty((0, dimensions), dtype=np.float32)
+        self._alive = np.empty(0, dtype=bool)
+        self._lists = np.empty(0, dtype=np.int32)
+        self._size = 0
+        self._keys: List[Optional[str]] = []
+        self._rows: List[Optional[Dict[str, Any]]] = []
+        self._positions: Dict[str, int] = {}
+
+        self._centroids: Optional[np.ndarray] = None
+        self._trained_rows = 0
+        self.loaded_at = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._positions
+
+    @property
+    def is_ivf(self) -> bool:
+        return self._centroids is not None
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the vector, list and centroid arrays (row payloads not included)."""
+        centroids = self._centroids.nbytes if self._centroids is not None else 0
+        return self._vectors.nbytes + self._alive.nbytes + self._lists.nbytes + centroids
+
+    def upsert(self,
+               keys: Sequence[str],
+               vectors: np.ndarray,
+               rows: Sequence[Dict[str, Any]],
+               rebuild: bool = True) -> None:
+        """Insert or replace entries; rows are returned alongside the similarity on search."""
+        if not len(keys):
+            return
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(len(keys), self.dimensions)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.where(norms > 0, norms, 1.0)
+
+        positions = np.empty(len(keys), dtype=np.int64)
+        for i, key in enumerate(keys):
+            position = self._positions.get(key)
+            if position is None:
+                position = self._append_slot(key)
+            positions[i] = position
+            self._rows[position] = rows[i]
+
+        self._vectors[positions] = vectors
+        self._alive[positions] = True
+        if self._centroids is not None:
+            self._lists[positions] = self._nearest_lists(vectors)
+
+        if rebuild:
+            self._maybe_rebuild()
+
+    def remove(self, keys: Sequence[str], rebuild: bool = True) -> int:
+        """Tombstone entries by key; returns the number removed."""
+        removed = 0
+        for key in keys:
+            position = self._positions.pop(key, None)
+            if position is None:
+                continue
+            self._alive[position] = False
+            self._keys[position] = None
+            self._rows[position] = None
+            removed += 1
+        if removed and rebuild:
+            self._maybe_rebuild()
+        return removed
+
+    def search(self, query: Sequence[float], limit: int, threshold: float = 0.0) -> List[Dict[str, Any]]:
+        """
+        Top-limit entries with cosine similarity >= threshold.
+
+        Returns:
+            Copies of the stored rows with a "similarity" field, best first
+        """
+        query = np.asarray(query, dtype=np.float32)
+        if query.shape != (self.dimensions,) or not self._positions or limit <= 0:
+            return []
+        norm = float(np.linalg.norm(query))
+        if norm == 0.0:
+            return []
+        query = query / norm
+
+        if self._centroids is None:
+            candidates = np.flatnonzero(self._alive[:self._size])
+            scores = self._vectors[:self._size] @ query
+            scores = scores[candidates]
+        else:
+            nprobe = min(self.nprobe, len(self._centroids))
+            probe = np.argpartition(-(self._centroids @ query), nprobe - 1)[:nprobe]
+            candidates = np.flatnonzero(np.isin(self._lists[:self._size], probe) & self._alive[:self._size])
+            scores = self._vectors[candidates] @ query
+
+        matched = scores >= threshold
+        candidates, scores = candidates[matched], scores[matched]
+        if len(scores) > limit:
+            top = np.argpartition(-scores, limit - 1)[:limit]
+            candidates, scores = candidates[top], scores[top]
+        order = np.argsort(-scores, kind="stable")
+
+        return [
+            {**self._rows[candidates[i]], "similarity": float(scores[i])}
+            for i in order
+        ]
+
+    def _append_slot(self, key: str) -> int:
+        if self._size == len(self._alive):
+            capacity = max(1024, 2 * len(self._alive))
+            vectors = np.empty((capacity, self.dimensions), dtype=np.float32)
+            vectors[:self._size] = self._vectors[:self._size]
+            self._vectors = vectors
+            self._alive = np.concatenate([self._alive, np.zeros(capacity - len(self._alive), dtype=bool)])
+            self._lists = np.concatenate([self._lists, np.full(capacity - len(self._lists), -1, dtype=np.int32)])
+        position = self._size
+        self._size += 1
+        self._keys.append(key)
+        self._rows.append(None)
+        self._positions[key] = position
+        return position
+
+    def needs_rebuild(self) -> bool:
+        """Whether tombstones or growth call for compaction or new IVF lists."""
+        return self._needs_compaction() or self._needs_training() or self._too_small_for_lists()
+
+    def layout(self) -> Tuple[np.ndarray, List[Optional[str]], List[Optional[Dict[str, Any]]], np.ndarray]:
+        """Snapshot of the current rows for rebuilt(); cheap enough for the event loop."""
+        return self._vectors, self._keys[:self._size], self._rows[:self._size], self._alive[:self._size].copy()
+
+    def rebuilt(self, layout) -> "TenantVectorIndex":
+        """
+        A compacted copy of a layout() snapshot, with IVF lists trained if the
+        row count calls for them. Reads only the snapshot, so this index keeps
+        serving (and taking writes) while it runs.
+        """
+        vectors, keys, rows, alive = layout
+        keep = np.flatnonzero(alive)
+
+        index = TenantVectorIndex(self.dimensions, self.ivf_min_rows, self.nprobe)
+        index._vectors = vectors[keep]
+        index._alive = np.ones(len(keep), dtype=bool)
+        index._lists = np.full(len(keep), -1, dtype=np.int32)
+        index._keys = [keys[i] for i in keep]
+        index._rows = [rows[i] for i in keep]
+        index._positions = {key: i for i, key in enumerate(index._keys)}
+        index._size = len(keep)
+        index.loaded_at = self.loaded_at
+
+        if index._size >= self.ivf_min_rows or (self.is_ivf and index._size >= self.ivf_min_rows // 2):
+            index._train()
+        return index
+
+    def _needs_compaction(self) -> bool:
+        live = len(self._positions)
+        return self._size - live > max(live, 1024) // 4
+
+    def _needs_training(self) -> bool:
+        live = len(self._positions)
+        return live >= self.ivf_min_rows and (self._centroids is None or live >= 2 * self._trained_rows)
+
+    def _too_small_for_lists(self) -> bool:
+        return self._centroids is not None and len(self._positions) < self.ivf_min_rows // 2
+
+    def _maybe_rebuild(self) -> None:
+        if self._needs_compaction():
+            self._compact()
+        if self._needs_training():
+            self._train()
+        elif self._too_small_for_lists():
+            self._centroids = None
+
+    def _compact(self) -> None:
+        """Drop tombstoned rows and renumber positions."""
+        keep = np.flatnonzero(self._alive[:self._size])
+        self._vectors = self._vectors[keep].copy()
+        self._lists = self._lists[keep].copy()
+        self._alive = np.ones(len(keep), dtype=bool)
+        self._keys = [self._keys[i] for i in keep]
+        self._rows = [self._rows[i] for i in keep]
+        self._positions = {key: i for i, key in enumerate(self._keys)}
+        self._size = len(keep)
+
+    def _train(self, iterations: int = 8, sample_per_list: int = 40) -> None:
+        """Spherical k-means over a sample of live rows, then assign every row to a list."""
+        live = np.flatnonzero(self._alive[:self._size])
+        nlist = max(1, int(np.sqrt(len(live))))
+        rng = np.random.default_rng(0)
+        sample = self._vectors[rng.choice(live, size=min(len(live), nlist * sample_per_list), replace=False)]
+
+        centroids = sample[rng.choice(len(sample), size=nlist, replace=False)].copy()
+        for _ in range(iterations):
+            assign = np.argmax(sample @ centroids.T, axis=1)
+            membership = sp.csr_matrix(
+                (np.ones(len(sample), dtype=np.float32), (assign, np.arange(len(sample)))),
+                shape=(nlist, len(sample))
+            )
+            sums = np.asarray(membership @ sample)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            filled = norms[:, 0] > 0
+            centroids[filled] = sums[filled] / norms[filled]
+
+        self._centroids = centroids
+        self._lists[:self._size] = -1
+        self._lists[live] = self._nearest_lists(self._vectors[live])
+        self._trained_rows = len(live)
+        logger.info("🧭 Vector index lists trained", rows=len(live), lists=nlist)
+
+    def _nearest_lists(self, vectors: np.ndarray, block: int = 8192) -> np.ndarray:
+        lists = np.empty(len(vectors), dtype=np.int32)
+        for start in range(0, len(vectors), block):
+            lists[start:start + block] = np.argmax(vectors[start:start + block] @ self._centroids.T, axis=1)
+        return lists
+
+
+class VectorIndexManager:
+    """
+    Lazily hydrated vector indexes per (client_id, scope).
+
+    The first search for a tenant returns None (callers fall back to the
+    pgvector RPC) and starts a background load of the tenant's embeddings
+    through keyset pages. Once loaded, searches are served in-process until
+    the index is older than ttl, when it is reloaded in the background while
+    the old one keeps serving. Writes reported through upsert/remove are
+    applied immediately, including to an index that is still loading.
+    Compaction and IVF retraining run in a worker thread on a snapshot and
+    the result replaces the index once writes made meanwhile are replayed.
+    Indexes are dropped least recently used first when their arrays exceed
+    max_bytes in total.
+    """
+
+    def __init__(self,
+                 supabase_client=None,
+                 dimensions: int = 1536,
+                 max_tenants: int = 32,
+                 max_rows: int = 200000,
+                 max_bytes: int = 1 << 30,
+                 ttl: float = 900,
+                 page_size: int = 1000,
+                 ivf_min_rows: int = 10000,
+                 nprobe: int = 8):
+        """
+        Initialize vector index manager.
+
+        Args:
+            supabase_client: SupabaseClient used for fluent graph-schema queries
+            dimensions: Embedding dimensions (stored vectors of another size are skipped)
+            max_tenants: Indexes kept in memory (least recently used are dropped)
+            max_rows: Tenants with more embedded rows than this stay on the RPC
+            max_bytes: Memory budget for the vector arrays of all indexes
+            ttl: Seconds before a loaded index is reloaded
+            page_size: Rows fetched per keyset page during hydration
+            ivf_min_rows: Row count at which an index switches to IVF lists
+            nprobe: IVF lists scanned per search
+        """
+        self.supabase_client = supabase_client
+        self.dimensions = dimensions
+        self.max_tenants = max_tenants
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.page_size = page_size
+        self.ivf_min_rows = ivf_min_rows
+        self.nprobe = nprobe
+
+        self._indexes: "OrderedDict[Tuple[str, str], TenantVectorIndex]" = OrderedDict()
+        self._loading: Dict[Tuple[str, str], asyncio.Task] = {}
+        self._pending_writes: Dict[Tuple[str, str], List[Tuple[str, Any]]] = {}
+        self._rebuilding: Dict[Tuple[str, str], asyncio.Task] = {}
+        self._rebuild_writes: Dict[Tuple[str, str], List[Tuple[str, Any]]] = {}
+        self._oversized: Dict[Tuple[str, str], float] = {}
+
+        self.hits = 0
+        self.fallbacks = 0
+        self.loads = 0
+
+    async def search(self,
+                     client_id: str,
+                     scope: str,
+                     query_embedding: Sequence[float],
+                     limit: int,
+                     threshold: float) -> Optional[List[Dict[str, Any]]]:
+        """
+        Search a tenant's index.
+
+        Returns:
+            Matching rows with "similarity", or None when the index is not
+            available yet and the caller should use the RPC
+        """
+        key = (client_id, scope)
+        index = self._indexes.get(key)
+        if index is None or time.monotonic() - index.loaded_at > self.ttl:
+            self._start_load(key)
+        if index is None or len(query_embedding) != self.dimensions:
+            self.fallbacks += 1
+            return None
+
+        self._indexes.move_to_end(key)
+        self.hits += 1
+        return index.search(query_embedding, limit, threshold)
+
+    async def warm(self, client_id: str, scope: str) -> Optional[TenantVectorIndex]:
+        """Load a tenant's index now (or wait for the running load) and return it."""
+        key = (client_id, scope)
+        if key not in self._indexes:
+            task = self._start_load(key)
+            if task is not None:
+                await asyncio.shield(task)
+        return self._indexes.get(key)
+
+    def upsert(self, client_id: str, scope: str, rows: Sequence[Dict[str, Any]]) -> None:
+        """Apply written rows that carry an embedding to a loaded or loading index."""
+        self._write((client_id, scope), "upsert", list(rows))
+
+    def remove(self, client_id: str, scope: str, ids: Sequence[str]) -> None:
+        """Drop deleted rows from a loaded or loading index."""
+        self._write((client_id, scope), "remove", list(ids))
+
+    def invalidate(self, client_id: str, scope: Optional[str] = None) -> None:
+        """Forget a tenant's indexes; the next search reloads them."""
+        for key in [key for key in list(self._indexes) + list(self._loading) if key[0] == client_id]:
+            if scope is None or key[1] == scope:
+                self._indexes.pop(key, None)
+                self._oversized.pop(key, None)
+                for tasks in (self._loading, self._rebuilding):
+                    task = tasks.pop(key, None)
+                    if task is not None:
+                        task.cancel()
+                self._pending_writes.pop(key, None)
+                self._rebuild_writes.pop(key, None)
+
+    def clear(self) -> None:
+        for task in list(self._loading.values()) + list(self._rebuilding.values()):
+            task.cancel()
+        self._indexes.clear()
+        self._loading.clear()
+        self._pending_writes.clear()
+        self._rebuilding.clear()
+        self._rebuild_writes.clear()
+        self._oversized.clear()
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "indexes": len(self._indexes),
+            "rows": sum(len(index) for index in self._indexes.values()),
+            "bytes": self._total_bytes(),
+            "loading": len(self._loading),
+            "rebuilding": len(self._rebuilding),
+            "hits": self.hits,
+            "fallbacks": self.fallbacks,
+            "loads": self.loads
+        }
+
+    def _start_load(self, key: Tuple[str, str]) -> Optional[asyncio.Task]:
+        if key in self._loading:
+            return self._loading[key]
+        if self._oversized.get(key, 0.0) > time.monotonic():
+            return None
+        task = asyncio.create_task(self._load(key))
+        self._loading[key] = task
+        task.add_done_callback(lambda _: self._loading.pop(key, None) if self._loading.get(key) is task else None)
+        return task
+
+    async def _load(self, key: Tuple[str, str]) -> None:
+        client_id, scope = key
+        table, key_column, columns = INDEX_SCOPES[scope]
+        loader = TenantGraphLoader(self.supabase_client, page_size=self.page_size)
+        start_time = time.time()
+
+        try:
+            keys: List[str] = []
+            vectors: List[np.ndarray] = []
+            rows: List[Dict[str, Any]] = []
+            async for page in loader.iterate_pages(table, key_column, columns, client_id, None):
+                for row in page:
+                    vector = parse_embedding(row.pop("embeddings", None))
+                    if vector is None or vector.shape[0] != self.dimensions:
+                        continue
+                    keys.append(row[key_column])
+                    vectors.append(vector)
+                    rows.append(row)
+                if len(keys) > self.max_rows or len(keys) * self.dimensions * 4 > self.max_bytes:
+                    self._oversized[key] = time.monotonic() + self.ttl
+                    logger.info("⏭️ Tenant too large for in-process vector index",
+                               client_id=client_id, scope=scope, max_rows=self.max_rows, max_bytes=self.max_bytes)
+                    return
+
+            # Normalizing and training IVF lists is CPU-bound; keep it off the event loop
+            index = TenantVectorIndex(self.dimensions, self.ivf_min_rows, self.nprobe)
+            if keys:
+                await asyncio.to_thread(index.upsert, keys, np.stack(vectors), rows)
+
+            self._replay(index, scope, self._pending_writes.pop(key, []))
+
+            self._indexes[key] = index
+            self._indexes.move_to_end(key)
+            while len(self._indexes) > self.max_tenants:
+                self._indexes.popitem(last=False)
+            self._enforce_budget()
+            self._schedule_rebuild(key, index)
+            self.loads += 1
+
+            logger.info("📥 Vector index loaded",
+                       client_id=client_id,
+                       scope=scope,
+                       rows=len(index),
+                       ivf=index.is_ivf,
+                       load_time_ms=(time.time() - start_time) * 1000)
+
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self._oversized[key] = time.monotonic() + min(self.ttl, 60.0)
+            logger.warning("⚠️ Vector index load failed, using RPC search",
+                          client_id=client_id, scope=scope, error=str(e))
+        finally:
+            self._pending_writes.pop(key, None)
+
+    def _write(self, key: Tuple[str, str], operation: str, payload: List[Any]) -> None:
+        if key in self._loading:
+            self._pending_writes.setdefault(key, []).append((operation, payload))
+        if key in self._rebuilding:
+            self._rebuild_writes.setdefault(key, []).append((operation, payload))
+        index = self._indexes.get(key)
+        if index is None:
+            return
+        self._replay(index, key[1], [(operation, payload)])
+        if operation == "upsert":
+            self._enforce_budget()
+        self._schedule_rebuild(key, index)
+
+    def _replay(self, index: TenantVectorIndex, scope: str, writes: List[Tuple[str, Any]]) -> None:
+        for operation, payload in writes:
+            if operation == "upsert":
+                self._upsert_rows(index, scope, payload)
+            else:
+                index.remove(payload, rebuild=False)
+
+    def _schedule_rebuild(self, key: Tuple[str, str], index: TenantVectorIndex) -> None:
+        if key in self._rebuilding or self._indexes.get(key) is not index or not index.needs_rebuild():
+            return
+        task = asyncio.create_task(self._rebuild(key, index))
+        self._rebuilding[key] = task
+        task.add_done_callback(
+            lambda _: self._rebuilding.pop(key, None) if self._rebuilding.get(key) is task else None
+        )
+
+    async def _rebuild(self, key: Tuple[str, str], index: TenantVectorIndex) -> None:
+        self._rebuild_writes[key] = []
+        try:
+            # Compaction and k-means are CPU-bound; the old index serves until the swap
+            rebuilt = await asyncio.to_thread(index.rebuilt, index.layout())
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning("⚠️ Vector index rebuild failed", client_id=key[0], scope=key[1], error=str(e))
+            return
+        finally:
+            writes = self._rebuild_writes.pop(key, [])
+
+        if self._indexes.get(key) is not index:
+            return
+        self._replay(rebuilt, key[1], writes)
+        self._indexes[key] = rebuilt
+        self._enforce_budget()
+
+    def _total_bytes(self) -> int:
+        return sum(index.nbytes for index in self._indexes.values())
+
+    def _enforce_budget(self) -> None:
+        """Drop least recently used indexes until the arrays fit in max_bytes."""
+        while self._indexes and self._total_bytes() > self.max_bytes:
+            key, index = self._indexes.popitem(last=False)
+            if not self._indexes:
+                # A single tenant over the whole budget stays on the RPC for a while
+                self._oversized[key] = time.monotonic() + self.ttl
+            logger.info("🧹 Vector index evicted for memory budget",
+                       client_id=key[0], scope=key[1], bytes=index.nbytes, max_bytes=self.max_bytes)
+
+    @staticmethod
+    def _upsert_rows(index: TenantVectorIndex, scope: str, rows: Sequence[Dict[str, Any]]) -> None:
+        key_column = INDEX_SCOPES[scope][1]
+        keys, vectors, payloads = [], [], []
+        for row in rows:
+            vector = parse_embedding(row.get("embeddings", row.get("embedding")))
+            if vector is None or vector.shape[0] != index.dimensions or row.get(key_column) is None:
+                continue
+            keys.append(row[key_column])
+            vectors.append(vector)
+            payloads.append({k: v for k, v in row.items() if k not in ("embeddings", "embedding")})
+        if keys:
+            index.upsert(keys, np.stack(vectors), payloads, rebuild=False)
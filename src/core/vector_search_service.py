@@ -12,6 +12,10 @@ from enum import Enum
 import structlog
 
 from .config import GraphRAGSettings
+from .graph_expansion import AdjacencyCache, expand_neighbourhood, subgraph_edges
+from .search_cache import SearchResultCache
+from .vector_index import VectorIndexManager
+from ..clients.embedding_client import BatchingEmbedder, EmbeddingProvider, create_embedding_provider
 from ..clients.supabase_client import SupabaseClient
 
 logger = structlog.get_logger(__name__)
@@ -46,6 +50,9 @@ class SearchQuery:
     filters: Optional[Dict[str, Any]] = None
     rerank: bool = True
     alpha: float = 0.5  # For hybrid search (0.5 = equal weight)
+    importance_boost: float = 0.0  # Weight of precomputed graph.nodes rank_score (0 = off)
+    scope_weights: Optional[Dict[str, float]] = None  # RRF weights per scope for SearchScope.ALL
+    expand_hops: Optional[int] = None  # Graph expansion depth (None = default for the search type)
 
 
 @dataclass
@@ -72,6 +79,7 @@ class GraphRAGSearchResult:
     reasoning_chain: Optional[List[str]] = None
     quality_score: float = 0.0
     search_time_ms: float = 0.0
+    expanded_context: Optional[Dict[str, Any]] = None
 
 
 class VectorSearchService:
@@ -86,7 +94,7 @@ class VectorSearchService:
     - Multi-tenant filtering with client_id isolation
     """
 
-    def __init__(self, settings: GraphRAGSettings):
+    def __init__(self, settings: GraphRAGSettings, embedding_provider: Optional[EmbeddingProvider] = None):
         self.settings = settings
         self.supabase_client: Optional[SupabaseClient] = None
         self.is_initialized = False
@@ -96,9 +104,44 @@ class VectorSearchService:
         self.avg_search_time = 0.0
         self.cache_hit_rate = 0.0
         
-        # Search caches
-        self._query_cache: Dict[str, GraphRAGSearchResult] = {}
-        self._embedding_cache: Dict[str, List[float]] = {}
+        # Search result cache (LRU + TTL, per-tenant quota)
+        self.result_cache = SearchResultCache(
+            max_entries=settings.search_cache_max_entries,
+            ttl=settings.cache_ttl,
+            tenant_quota_bytes=int(settings.search_cache_tenant_quota_mb * 1024 * 1024)
+        )
+        
+        # Query embeddings (batched, LRU + TTL cached)
+        self.embedder = BatchingEmbedder(
+            embedding_provider or create_embedding_provider(settings),
+            cache_size=settings.embedding_cache_size,
+            cache_ttl=settings.cache_ttl,
+            batch_window_ms=settings.embedding_batch_window_ms,
+            max_batch_size=settings.embedding_max_batch_size
+        )
+        
+        # Optional in-process vector indexes per tenant (RPC fallback)
+        self.vector_index: Optional[VectorIndexManager] = None
+        if settings.enable_vector_index:
+            self.vector_index = VectorIndexManager(
+                dimensions=settings.embedding_dimensions,
+                max_tenants=settings.vector_index_max_tenants,
+                max_rows=settings.vector_index_max_rows,
+                max_bytes=settings.vector_index_max_bytes,
+                ttl=settings.vector_index_ttl,
+                page_size=settings.tenant_graph_page_size,
+                ivf_min_rows=settings.vector_index_ivf_min_rows,
+                nprobe=settings.vector_index_nprobe
+            )
+        
+        # Per-tenant CSR adjacency for graph expansion of search hits
+        self.adjacency_cache = AdjacencyCache(
+            max_tenants=settings.adjacency_cache_max_tenants,
+            ttl=settings.adjacency_cache_ttl,
+            page_size=settings.tenant_graph_page_size,
+            max_nodes=settings.tenant_graph_max_nodes,
+            max_edges=settings.tenant_graph_max_edges
+        )
         
         logger.info("VectorSearchService initialized",
                    similarity_threshold=settings.entity_similarity_threshold)
@@ -109,6 +152,9 @@ class VectorSearchService:
             logger.info("🔍 Initializing Vector Search Service")
             
             self.supabase_client = supabase_client
+            self.adjacency_cache.supabase_client = supabase_client
+            if self.vector_index:
+                self.vector_index.supabase_client = supabase_client
             
             # Verify vector search functions are available
             await self._verify_vector_functions()
@@ -162,6 +208,19 @@ class VectorSearchService:
             else:
                 raise ValueError(f"Unsupported search type: {query.search_type}")
             
+            # Graph-aware ranking from precomputed node importance
+            if query.importance_boost > 0:
+                results = await self._apply_importance_boost(results, query.client_id, query.importance_boost)
+            
+            # k-hop neighbourhood of the top entity hits
+            expand_hops = self._expand_hops(query)
+            expanded_context = await self._expand_results(results, query.client_id, expand_hops) if expand_hops else None
+            # A tenant whose adjacency is still loading is expanded by a later search
+            expansion_skipped = bool(expand_hops) and expanded_context is None \
+                and self.adjacency_cache.is_loading(query.client_id)
+            if expanded_context is None:
+                expand_hops = 0
+            
             # Get involved communities
             communities_involved = await self._get_involved_communities(results, query.client_id)
             
@@ -181,17 +240,22 @@ class VectorSearchService:
                     "search_scope": query.search_scope.value,
                     "similarity_threshold": query.similarity_threshold,
                     "filters": query.filters or {},
-                    "client_id": query.client_id
+                    "client_id": query.client_id,
+                    "importance_boost": query.importance_boost,
+                    "expand_hops": expand_hops,
+                    **({"expansion_skipped": True} if expansion_skipped else {}),
+                    **({"scope_weights": self._scope_weights(query)} if query.search_scope == SearchScope.ALL else {})
                 },
                 communities_involved=communities_involved,
                 entity_matches=entity_matches,
                 quality_score=quality_score,
-                search_time_ms=(time.time() - start_time) * 1000
+                search_time_ms=(time.time() - start_time) * 1000,
+                expanded_context=expanded_context
             )
             
-            # Cache the result
-            if self.settings.enable_cache:
-                self._add_to_cache(cache_key, search_result)
+            # Cache the result (unless it is missing an expansion that will soon be available)
+            if self.settings.enable_cache and not expansion_skipped:
+                self._add_to_cache(cache_key, query.client_id, search_result)
             
             self._update_metrics(start_time, cache_hit=False)
             self.total_searches += 1
@@ -211,6 +275,56 @@ class VectorSearchService:
                         error=str(e))
             raise
 
+    async def search_many(
+        self,
+        queries: List[SearchQuery],
+        max_concurrency: Optional[int] = None
+    ) -> List[Union[GraphRAGSearchResult, Exception]]:
+        """
+        Run a batch of searches with shared embedding and bounded concurrency.
+        
+        All distinct query texts are embedded in one batched call up front, so
+        the individual searches find their vectors in the embedding cache.
+        Identical queries execute once. Failures are returned in place of the
+        result instead of failing the whole batch.
+        
+        Args:
+            queries: Search queries
+            max_concurrency: Searches in flight at once (default settings.search_batch_concurrency)
+            
+        Returns:
+            One GraphRAGSearchResult or Exception per query, in input order
+        """
+        start_time = time.time()
+        
+        keys = [self._build_cache_key(query) for query in queries]
+        unique: Dict[str, SearchQuery] = {}
+        for key, query in zip(keys, queries):
+            unique.setdefault(key, query)
+        
+        try:
+            await self.embedder.embed_many(list({query.query_text for query in unique.values()}))
+        except Exception as e:
+            # Searches retry the embedding individually and report their own error
+            logger.warning("⚠️ Batch query embedding failed", queries=len(unique), error=str(e))
+        
+        semaphore = asyncio.Semaphore(max(1, max_concurrency or self.settings.search_batch_concurrency))
+        
+        async def run(query: SearchQuery) -> GraphRAGSearchResult:
+            async with semaphore:
+                return await self.search(query)
+        
+        outcomes = await asyncio.gather(*[run(query) for query in unique.values()], return_exceptions=True)
+        by_key = dict(zip(unique.keys(), outcomes))
+        
+        logger.info("✅ Batch vector search completed",
+                   queries=len(queries),
+                   unique_queries=len(unique),
+                   failed=sum(isinstance(outcome, Exception) for outcome in outcomes),
+                   search_time_ms=(time.time() - start_time) * 1000)
+        
+        return [by_key[key] for key in keys]
+
     async def semantic_search_chunks(
         self,
         client_id: str,
@@ -237,21 +351,25 @@ class VectorSearchService:
                        limit=limit,
                        threshold=similarity_threshold)
             
-            # Get query embedding (placeholder - would integrate with embedding service)
+            # Get query embedding
             query_embedding = await self._get_query_embedding(query_text)
             
-            # Execute semantic search function
-            search_params = {
-                "query_embedding": query_embedding,
-                "filter_client_id": client_id,
-                "match_threshold": similarity_threshold,
-                "match_count": limit
-            }
-            
-            results = await self.supabase_client.execute_function(
-                "search_similar_chunks",
-                search_params
+            # Serve from the in-process index when loaded, else the RPC
+            results = await self._search_vector_index(
+                client_id, SearchScope.CHUNKS.value, query_embedding, limit, similarity_threshold
             )
+            if results is None:
+                search_params = {
+                    "query_embedding": query_embedding,
+                    "filter_client_id": client_id,
+                    "match_threshold": similarity_threshold,
+                    "match_count": limit
+                }
+                
+                results = await self.supabase_client.execute_function(
+                    "search_similar_chunks",
+                    search_params
+                )
             
             # Convert to SearchResult objects
             search_results = []
@@ -284,6 +402,149 @@ class VectorSearchService:
                         error=str(e))
             raise
 
+    async def semantic_search_nodes(
+        self,
+        client_id: str,
+        query_text: str,
+        limit: int = 10,
+        similarity_threshold: float = 0.7
+    ) -> List[SearchResult]:
+        """
+        Perform semantic search on graph nodes (entities).
+        
+        Args:
+            client_id: Client identifier for multi-tenancy
+            query_text: Query text to search for
+            limit: Maximum number of results
+            similarity_threshold: Minimum similarity threshold
+            
+        Returns:
+            List of matching nodes with similarity scores
+        """
+        query_embedding = await self._get_query_embedding(query_text)
+        
+        results = await self._search_vector_index(
+            client_id, SearchScope.NODES.value, query_embedding, limit, similarity_threshold
+        )
+        if results is None:
+            results = await self.supabase_client.execute_function(
+                "search_similar_nodes",
+                {
+                    "query_embedding": query_embedding,
+                    "filter_client_id": client_id,
+                    "match_threshold": similarity_threshold,
+                    "match_count": limit
+                }
+            )
+        
+        return [
+            SearchResult(
+                id=row["node_id"],
+                content=f"{row['name']}: {row['description']}" if row.get("description") else row["name"],
+                score=float(row["similarity"]),
+                metadata={
+                    "node_id": row["node_id"],
+                    "entity_type": row.get("type"),
+                    "rank_score": row.get("rank_score") or 0.0
+                },
+                search_type=SearchType.SEMANTIC,
+                matched_fields=["name", "description"],
+                created_at=datetime.fromisoformat(row.get("created_at", datetime.utcnow().isoformat()))
+            )
+            for row in results
+        ]
+
+    async def semantic_search_communities(
+        self,
+        client_id: str,
+        query_text: str,
+        limit: int = 10,
+        similarity_threshold: float = 0.7
+    ) -> List[SearchResult]:
+        """
+        Perform semantic search on community summaries.
+        
+        Args:
+            client_id: Client identifier for multi-tenancy
+            query_text: Query text to search for
+            limit: Maximum number of results
+            similarity_threshold: Minimum similarity threshold
+            
+        Returns:
+            List of matching communities with similarity scores
+        """
+        query_embedding = await self._get_query_embedding(query_text)
+        
+        results = await self.supabase_client.execute_function(
+            "search_similar_communities",
+            {
+                "query_embedding": query_embedding,
+                "filter_client_id": client_id,
+                "match_threshold": similarity_threshold,
+                "match_count": limit
+            }
+        )
+        
+        return [
+            SearchResult(
+                id=row["community_id"],
+                content=row.get("summary") or row.get("title") or "",
+                score=float(row["similarity"]),
+                metadata={
+                    "community_id": row["community_id"],
+                    "title": row.get("title"),
+                    "level": row.get("level"),
+                    "size": row.get("size", 0)
+                },
+                search_type=SearchType.SEMANTIC,
+                matched_fields=["summary"],
+                created_at=datetime.fromisoformat(row.get("created_at", datetime.utcnow().isoformat()))
+            )
+            for row in results
+        ]
+
+    async def multi_scope_search(self, query: SearchQuery) -> List[SearchResult]:
+        """
+        Search nodes, chunks and communities concurrently and fuse the rankings.
+        
+        Each result's fused score is sum(weight / (rrf_k + rank)) over the
+        scopes it appears in, normalized so a first place in every scope
+        scores 1.0. Scopes weighted 0 are skipped (no results if all are),
+        and a scope whose search fails is logged and left out.
+        
+        Args:
+            query: Search query (search_scope ALL)
+            
+        Returns:
+            Up to query.limit results ordered by fused score
+        """
+        scope_searches = {
+            SearchScope.NODES.value: self.semantic_search_nodes,
+            SearchScope.CHUNKS.value: self.semantic_search_chunks,
+            SearchScope.COMMUNITIES.value: self.semantic_search_communities
+        }
+        weights = self._scope_weights(query)
+        scopes = [scope for scope in scope_searches if weights.get(scope, 0.0) > 0]
+        if not scopes:
+            return []
+        
+        outcomes = await asyncio.gather(*[
+            scope_searches[scope](query.client_id, query.query_text, query.limit, query.similarity_threshold)
+            for scope in scopes
+        ], return_exceptions=True)
+        
+        ranked = {}
+        for scope, outcome in zip(scopes, outcomes):
+            if isinstance(outcome, Exception):
+                logger.warning("⚠️ Scope search failed, fusing remaining scopes",
+                               scope=scope, client_id=query.client_id, error=str(outcome))
+                continue
+            ranked[scope] = outcome
+        if not ranked:
+            raise outcomes[0]
+        
+        return self._fuse_rankings(ranked, weights, query.limit)
+
     async def hybrid_search_with_ranking(
         self,
         client_id: str,
@@ -366,7 +627,7 @@ class VectorSearchService:
         limit: int = 10
     ) -> List[SearchResult]:
         """
-        Perform local search within specific communities.
+        Perform local search over a tenant's entities, optionally within one community.
         
         Args:
             client_id: Client identifier
@@ -375,7 +636,7 @@ class VectorSearchService:
             limit: Maximum results
             
         Returns:
-            List of community-scoped search results
+            Matching entities with their node_id and community_id
         """
         try:
             logger.info("🔍 Local community search",
@@ -386,36 +647,34 @@ class VectorSearchService:
             # Get query embedding
             query_embedding = await self._get_query_embedding(query_text)
             
-            # Execute local search function
-            search_params = {
-                "query_embedding": query_embedding,
-                "client_id": client_id,
-                "document_id": None,  # No document filter
-                "entity_id": community_id,  # Using entity_id for community filtering
-                "match_count": limit
-            }
-            
             results = await self.supabase_client.execute_function(
-                "local_search",
-                search_params
+                "search_local_entities",
+                {
+                    "query_embedding": query_embedding,
+                    "filter_client_id": client_id,
+                    "filter_community_id": community_id,
+                    "match_count": limit
+                }
             )
             
-            # Convert to SearchResult objects
-            search_results = []
-            for row in results:
-                search_results.append(SearchResult(
-                    id=row["id"],
-                    content=row["content"],
+            search_results = [
+                SearchResult(
+                    id=row["node_id"],
+                    content=f"{row['name']}: {row['description']}" if row.get("description") else row["name"],
                     score=float(row["similarity"]),
                     metadata={
-                        "community_id": row["community_id"],
-                        "entity_type": row.get("entity_type"),
-                        "relationship_count": row.get("relationship_count", 0)
+                        "node_id": row["node_id"],
+                        "community_id": row.get("community_id"),
+                        "entity_type": row.get("type"),
+                        "rank_score": row.get("rank_score") or 0.0,
+                        "relationship_count": row.get("relationship_count") or 0
                     },
                     search_type=SearchType.LOCAL,
-                    matched_fields=["content"],
+                    matched_fields=["name", "description"],
                     created_at=datetime.fromisoformat(row.get("created_at", datetime.utcnow().isoformat()))
-                ))
+                )
+                for row in results
+            ]
             
             logger.info("✅ Local community search completed",
                        client_id=client_id,
@@ -556,19 +815,160 @@ class VectorSearchService:
                         error=str(e))
             raise
 
+    async def get_node_rankings(self, client_id: str, node_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetch precomputed ranking columns for a client's nodes in one query.
+        
+        Args:
+            client_id: Client identifier (nodes of other clients are ignored)
+            node_ids: Node identifiers
+            
+        Returns:
+            Mapping of node_id to node_degree, pagerank and rank_score
+        """
+        if not node_ids:
+            return {}
+        
+        response = await self.supabase_client.schema("graph", admin_operation=True) \
+            .table("nodes") \
+            .select("node_id,node_degree,pagerank,rank_score") \
+            .eq("client_id", client_id) \
+            .in_("node_id", list(dict.fromkeys(node_ids))) \
+            .execute()
+        
+        return {
+            row["node_id"]: {
+                "node_degree": row.get("node_degree") or 0,
+                "pagerank": row.get("pagerank") or 0.0,
+                "rank_score": row.get("rank_score") or 0.0
+            }
+            for row in (response.data or [])
+        }
+
     # Private helper methods
     
+    async def _apply_importance_boost(self,
+                                      results: List[SearchResult],
+                                      client_id: str,
+                                      boost: float) -> List[SearchResult]:
+        """
+        Boost node results by their persisted rank_score and re-sort.
+        
+        score' = score * (1 + boost * rank_score). Results that are not graph
+        nodes (e.g. chunks) have no ranking row and keep their score.
+        """
+        node_ids = [self._result_node_id(result) for result in results]
+        try:
+            rankings = await self.get_node_rankings(client_id, node_ids)
+        except Exception as e:
+            logger.warning("⚠️ Node ranking lookup failed, skipping boost", error=str(e))
+            return results
+        
+        for result, node_id in zip(results, node_ids):
+            ranking = rankings.get(node_id)
+            if ranking:
+                result.metadata.update(ranking)
+                result.score = result.score * (1.0 + boost * ranking["rank_score"])
+        
+        return sorted(results, key=lambda result: result.score, reverse=True)
+    
+    def _expand_hops(self, query: SearchQuery) -> int:
+        if query.expand_hops is not None:
+            return query.expand_hops
+        return self.settings.local_search_expand_hops if query.search_type == SearchType.LOCAL else 0
+    
+    async def _expand_results(self,
+                              results: List[SearchResult],
+                              client_id: str,
+                              hops: int) -> Optional[Dict[str, Any]]:
+        """
+        Expand the top entity hits to their k-hop neighbourhood.
+        
+        Seeds are the graph nodes behind the first graph_expansion_seed_count
+        results; neighbours come from the cached tenant adjacency and their
+        names and descriptions from one batched graph.nodes query.
+        A tenant whose adjacency is not cached yet is returned unexpanded
+        while it loads in the background.
+        """
+        seeds: Dict[str, float] = {}
+        for result in results[:self.settings.graph_expansion_seed_count]:
+            node_id = self._result_node_id(result)
+            seeds[node_id] = max(seeds.get(node_id, 0.0), result.score)
+        if not seeds:
+            return None
+        
+        adjacency = self.adjacency_cache.peek(client_id)
+        if adjacency is None:
+            return None
+        seeds = {node_id: score for node_id, score in seeds.items() if node_id in adjacency.node_index}
+        
+        neighbors = expand_neighbourhood(
+            adjacency,
+            seeds,
+            hops=hops,
+            max_neighbors=self.settings.graph_expansion_max_neighbors,
+            hop_decay=self.settings.graph_expansion_hop_decay,
+            importance_weight=self.settings.graph_expansion_importance_weight
+        )
+        
+        if neighbors:
+            try:
+                details = await self._get_node_details([neighbor["node_id"] for neighbor in neighbors])
+            except Exception as e:
+                logger.warning("⚠️ Node detail lookup failed for expanded entities", error=str(e))
+                details = {}
+            for neighbor in neighbors:
+                neighbor.update(details.get(neighbor["node_id"], {}))
+        
+        return {
+            "hops": hops,
+            "seed_node_ids": list(seeds),
+            "entities": neighbors,
+            "relationships": subgraph_edges(adjacency, list(seeds) + [neighbor["node_id"] for neighbor in neighbors])
+        }
+    
+    async def _get_node_details(self, node_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Names, types and descriptions for nodes in one query."""
+        response = await self.supabase_client.schema("graph", admin_operation=True) \
+            .table("nodes") \
+            .select("node_id,name,type,description") \
+            .in_("node_id", node_ids) \
+            .execute()
+        
+        return {
+            row["node_id"]: {
+                "name": row.get("name"),
+                "entity_type": row.get("type"),
+                "description": row.get("description")
+            }
+            for row in (response.data or [])
+        }
+    
+    @staticmethod
+    def _result_node_id(result: SearchResult) -> str:
+        """Graph node id a search result refers to."""
+        return result.metadata.get("node_id") or result.metadata.get("entity_id") or result.id
+    
+    
     async def _semantic_search(self, query: SearchQuery) -> List[SearchResult]:
         """Execute semantic search."""
-        if query.search_scope == SearchScope.CHUNKS:
-            return await self.semantic_search_chunks(
+        if query.search_scope == SearchScope.NODES:
+            return await self.semantic_search_nodes(
                 query.client_id,
                 query.query_text,
                 query.limit,
                 query.similarity_threshold
             )
+        elif query.search_scope == SearchScope.COMMUNITIES:
+            return await self.semantic_search_communities(
+                query.client_id,
+                query.query_text,
+                query.limit,
+                query.similarity_threshold
+            )
+        elif query.search_scope == SearchScope.ALL:
+            return await self.multi_scope_search(query)
         else:
-            # Implement other scopes as needed
             return await self.semantic_search_chunks(
                 query.client_id,
                 query.query_text,
@@ -576,6 +976,40 @@ class VectorSearchService:
                 query.similarity_threshold
             )
     
+    def _scope_weights(self, query: SearchQuery) -> Dict[str, float]:
+        """RRF weight per scope: query overrides on top of configured defaults."""
+        weights = {
+            SearchScope.NODES.value: self.settings.scope_weight_nodes,
+            SearchScope.CHUNKS.value: self.settings.scope_weight_chunks,
+            SearchScope.COMMUNITIES.value: self.settings.scope_weight_communities
+        }
+        weights.update(query.scope_weights or {})
+        return weights
+    
+    def _fuse_rankings(self,
+                       ranked: Dict[str, List[SearchResult]],
+                       weights: Dict[str, float],
+                       limit: int) -> List[SearchResult]:
+        """Weighted reciprocal rank fusion of per-scope result lists."""
+        k = self.settings.rrf_k
+        max_score = sum(weights[scope] for scope in ranked) / (k + 1)
+        
+        fused: Dict[str, SearchResult] = {}
+        scores: Dict[str, float] = {}
+        for scope, results in ranked.items():
+            for rank, result in enumerate(results, start=1):
+                key = f"{scope}:{result.id}"
+                if key not in fused:
+                    result.metadata.update({"scope": scope, "similarity": result.score, "scope_rank": rank})
+                    fused[key] = result
+                scores[key] = scores.get(key, 0.0) + weights[scope] / (k + rank)
+        
+        ordered = sorted(fused, key=lambda key: scores[key], reverse=True)[:limit]
+        for key in ordered:
+            fused[key].metadata["rrf_score"] = scores[key]
+            fused[key].score = scores[key] / max_score if max_score else 0.0
+        return [fused[key] for key in ordered]
+    
     async def _hybrid_search(self, query: SearchQuery) -> List[SearchResult]:
         """Execute hybrid search."""
         return await self.hybrid_search_with_ranking(
@@ -606,26 +1040,15 @@ class VectorSearchService:
         return result.results
     
     async def _get_query_embedding(self, query_text: str) -> List[float]:
-        """Get embedding for query text (placeholder for embeddings service integration)."""
-        # Cache check
-        if query_text in self._embedding_cache:
-            return self._embedding_cache[query_text]
-        
-        # This would integrate with the embeddings service (port 8081)
-        # For now, return a placeholder embedding vector
-        embedding = [0.0] * 1536  # Changed to 1536 dimensions for Supabase compatibility
-        
-        # Cache the result
-        self._embedding_cache[query_text] = embedding
-        
-        return embedding
+        """Get embedding for query text from the embeddings service (batched and cached)."""
+        return await self.embedder.embed(query_text)
     
     async def _verify_vector_functions(self) -> None:
         """Verify that required vector search functions exist."""
         functions_to_check = [
             "search_similar_chunks",
             "hybrid_search", 
-            "local_search",
+            "search_local_entities",
             "global_search"
         ]
         
@@ -645,7 +1068,7 @@ class VectorSearchService:
             logger.info("🔥 Warming up vector search indices")
             
             # Execute a sample query to warm caches
-            sample_embedding = [0.1] * 1536  # Changed to 1536 dimensions for Supabase
+            sample_embedding = [0.1] * self.settings.embedding_dimensions
             await self.supabase_client.execute_function(
                 "search_similar_chunks",
                 {
@@ -731,28 +1154,64 @@ class VectorSearchService:
         return min(quality_score, 1.0)
     
     def _build_cache_key(self, query: SearchQuery) -> str:
-        """Build cache key for search query."""
-        filters_str = str(sorted(query.filters.items())) if query.filters else "none"
-        return f"search:{query.client_id}:{query.search_type.value}:{query.query_text[:50]}:{filters_str}"
+        """Build cache key for search query (hash of every query field)."""
+        return SearchResultCache.build_key(query)
     
     def _get_from_cache(self, cache_key: str) -> Optional[GraphRAGSearchResult]:
         """Get result from cache."""
         if not self.settings.enable_cache:
             return None
         
-        return self._query_cache.get(cache_key)
+        return self.result_cache.get(cache_key)
     
-    def _add_to_cache(self, cache_key: str, result: GraphRAGSearchResult) -> None:
+    def _add_to_cache(self, cache_key: str, client_id: str, result: GraphRAGSearchResult) -> None:
         """Add result to cache."""
         if self.settings.enable_cache:
-            self._query_cache[cache_key] = result
-            
-            # Simple cache size management
-            if len(self._query_cache) > 1000:
-                # Remove oldest entries
-                keys_to_remove = list(self._query_cache.keys())[:100]
-                for key in keys_to_remove:
-                    del self._query_cache[key]
+            self.result_cache.put(cache_key, client_id, result)
+    
+    def invalidate_client(self,
+                          client_id: Optional[str],
+                          nodes: Optional[List[Dict[str, Any]]] = None,
+                          deleted_node_ids: Optional[List[str]] = None) -> int:
+        """
+        Drop cached search results for a tenant after its nodes or chunks change.
+        
+        Written node rows that carry an embedding and deleted node ids are
+        also applied to the tenant's in-process vector index.
+        """
+        if self.vector_index and client_id:
+            if nodes:
+                self.vector_index.upsert(client_id, SearchScope.NODES.value, nodes)
+            if deleted_node_ids:
+                self.vector_index.remove(client_id, SearchScope.NODES.value, deleted_node_ids)
+        if deleted_node_ids:
+            self.adjacency_cache.invalidate(client_id)
+        return self.result_cache.invalidate_client(client_id)
+    
+    def invalidate_edges(self, client_id: Optional[str]) -> int:
+        """Drop a tenant's cached adjacency and search results after its edges change."""
+        self.adjacency_cache.invalidate(client_id)
+        return self.result_cache.invalidate_client(client_id)
+    
+    def invalidate_vector_index(self, client_id: Optional[str]) -> None:
+        """Reload a tenant's in-process vector indexes after bulk writes (e.g. graph construction)."""
+        if self.vector_index and client_id:
+            self.vector_index.invalidate(client_id)
+    
+    async def _search_vector_index(self,
+                                   client_id: str,
+                                   scope: str,
+                                   query_embedding: List[float],
+                                   limit: int,
+                                   similarity_threshold: float) -> Optional[List[Dict[str, Any]]]:
+        """Rows from the in-process index, or None to fall back to the RPC."""
+        if not self.vector_index:
+            return None
+        try:
+            return await self.vector_index.search(client_id, scope, query_embedding, limit, similarity_threshold)
+        except Exception as e:
+            logger.warning("⚠️ Vector index search failed, using RPC", client_id=client_id, scope=scope, error=str(e))
+            return None
     
     def _update_metrics(self, start_time: float, cache_hit: bool) -> None:
         """Update performance metrics."""
@@ -766,6 +1225,13 @@ class VectorSearchService:
         
         self.avg_search_time = (self.avg_search_time * 0.9) + (search_time * 1000 * 0.1)
 
+    async def close(self) -> None:
+        """Close the embeddings connection pool and drop in-process indexes."""
+        if self.vector_index:
+            self.vector_index.clear()
+        self.adjacency_cache.clear()
+        await self.embedder.close()
+
     @property
     def performance_metrics(self) -> Dict[str, Any]:
         """Get performance metrics."""
@@ -773,7 +1239,12 @@ class VectorSearchService:
             "total_searches": self.total_searches,
             "avg_search_time_ms": self.avg_search_time,
             "cache_hit_rate": self.cache_hit_rate,
-            "cache_size": len(self._query_cache),
-            "embedding_cache_size": len(self._embedding_cache),
+            "cache_size": len(self.result_cache),
+            "result_cache": self.result_cache.stats,
+            "embedding_cache_size": len(self.embedder.cache),
+            "embedding_cache_hits": self.embedder.cache.hits,
+            "embedding_provider_calls": self.embedder.provider_calls,
+            "vector_index": self.vector_index.stats if self.vector_index else None,
+            "adjacency_cache": self.adjacency_cache.stats,
             "is_initialized": self.is_initialized
         }
\ No newline at end of file
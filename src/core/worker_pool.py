@@ -0,0 +1,61 @@
+"""
+Worker Pool Module
+Shared process pool for CPU-bound graph work (Leiden resolution sweeps, component analytics)
+"""
+
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """The service-wide process pool, started on first use with one worker per CPU."""
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(max_workers=os.cpu_count() or 1)
+    return _process_pool
+
+
+async def map_in_process_pool(func: Callable[..., Any],
+                              calls: Sequence[Tuple[Any, ...]],
+                              max_concurrency: Optional[int] = None) -> List[Any]:
+    """
+    Run func(*args) for every argument tuple in the shared process pool.
+
+    The event loop only awaits the results. max_concurrency caps how many of
+    these calls occupy pool workers at once; results keep the input order.
+    """
+    global _process_pool
+    pool = get_process_pool()
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(max_concurrency or len(calls) or 1)
+
+    async def run(args: Tuple[Any, ...]) -> Any:
+        async with semaphore:
+            return await loop.run_in_executor(pool, func, *args)
+
+    try:
+        return await asyncio.gather(*(run(args) for args in calls))
+    except BrokenProcessPool:
+        # A crashed worker breaks the pool for good; start a fresh one next time
+        if _process_pool is pool:
+            _process_pool = None
+        logger.warning("⚠️ Worker process pool broke, it will be restarted", func=getattr(func, "__name__", str(func)))
+        raise
+
+
+def shutdown_process_pool() -> None:
+    """Stop the shared pool's worker processes (service shutdown)."""
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=False, cancel_futures=True)
+        _process_pool = None
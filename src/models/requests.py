@@ -2,20 +2,35 @@
 GraphRAG Service Request Models
 """
 
-from typing import List, Dict, Any, Optional
-from pydantic import BaseModel, Field
+from typing import List, Dict, Any, Literal, Optional
+from pydantic import BaseModel, Field, validator
 from datetime import datetime
 
 
+class RelationshipStrategyOptions(BaseModel):
+    """Per-strategy relationship discovery options."""
+    enabled: bool = Field(default=True, description="Run this discovery strategy")
+    time_budget_seconds: Optional[float] = Field(default=None, gt=0, description="Discard the strategy's results if it runs longer")
+    max_edges: Optional[int] = Field(default=None, ge=0, description="Maximum relationships accepted from this strategy")
+
+
 class GraphOptions(BaseModel):
     """Options for graph construction."""
     enable_deduplication: bool = Field(default=True, description="Enable entity deduplication")
     enable_community_detection: bool = Field(default=True, description="Enable community detection")
     enable_cross_document_linking: bool = Field(default=True, description="Enable cross-document relationship discovery")
     enable_analytics: bool = Field(default=True, description="Enable graph analytics computation")
+    analytics_tier: Optional[Literal["minimal", "standard", "full"]] = Field(default=None, description="Analytics tier override")
+    incremental_communities: bool = Field(default=False, description="Warm-start community detection from stored memberships")
+    relationship_strategies: Optional[Dict[str, RelationshipStrategyOptions]] = Field(
+        default=None,
+        description="Per-strategy discovery options keyed by strategy name (citation, cross_document, inference, cooccurrence)"
+    )
     
+    max_edges_per_node: Optional[int] = Field(default=None, ge=1, description="Override the per-entity top-k relationship cap")
     similarity_threshold: Optional[float] = Field(default=None, description="Override default similarity threshold")
     leiden_resolution: Optional[float] = Field(default=None, description="Override Leiden algorithm resolution")
+    leiden_resolution_sweep: Optional[List[float]] = Field(default=None, description="Candidate Leiden resolutions; the best-scoring partition is kept")
     min_community_size: Optional[int] = Field(default=None, description="Override minimum community size")
     
     focus_entity_types: Optional[List[str]] = Field(default=None, description="Focus on specific entity types")
@@ -24,6 +39,17 @@ class GraphOptions(BaseModel):
     use_ai_summaries: bool = Field(default=True, description="Generate AI summaries for communities")
     batch_mode: bool = Field(default=False, description="Process in batch mode for large datasets")
 
+    @validator("relationship_strategies")
+    def validate_relationship_strategies(cls, v):
+        if v:
+            from ..core.relationship_discoverer import DISCOVERY_STRATEGIES
+            unknown = sorted(set(v) - set(DISCOVERY_STRATEGIES))
+            if unknown:
+                raise ValueError(
+                    f"Unknown relationship strategies {unknown}. Must be one of: {list(DISCOVERY_STRATEGIES)}"
+                )
+        return v
+
 
 class EntityData(BaseModel):
     """Entity data from entity extraction."""
@@ -92,6 +118,21 @@ class UpdateGraphRequest(BaseModel):
     graph_options: GraphOptions = Field(default_factory=GraphOptions, description="Update options")
 
 
+class CaseCommunityDetectionRequest(BaseModel):
+    """Request to run case-wide community detection over the stored graph."""
+    client_id: str = Field(description="Client identifier")
+    case_id: Optional[str] = Field(default=None, description="Case identifier (all client data if omitted)")
+    leiden_resolution: Optional[float] = Field(default=None, description="Override Leiden algorithm resolution")
+
+
+class TenantAnalyticsRequest(BaseModel):
+    """Request to materialize analytics over a stored tenant graph."""
+    client_id: str = Field(description="Client identifier")
+    case_id: Optional[str] = Field(default=None, description="Case identifier (all client data if omitted)")
+    tier: Optional[Literal["minimal", "standard", "full"]] = Field(default=None, description="Analytics tier (service default if omitted)")
+    force: bool = Field(default=False, description="Recompute even if the tenant graph is unchanged")
+
+
 class QueryGraphRequest(BaseModel):
     """Request to query the knowledge graph with tenant filtering."""
     query_type: str = Field(description="Query type: entities, relationships, communities, analytics")
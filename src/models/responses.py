@@ -39,6 +39,9 @@ class CommunityInfo(BaseModel):
     entity_ids: List[str] = Field(description="Entity IDs in this community")
     central_entities: List[str] = Field(default=[], description="Most central entities")
     community_type: Optional[str] = Field(default=None, description="Type of community (legal, contract, etc.)")
+    level: int = Field(default=0, description="Hierarchy level (0 = leaf community, parents are one above their highest child)")
+    parent_community_id: Optional[str] = Field(default=None, description="Parent community at the level above")
+    child_community_ids: List[str] = Field(default=[], description="Sub-communities at the level below")
     
     ai_summary: Optional[str] = Field(default=None, description="AI-generated community summary")
     metadata: Optional[Dict[str, Any]] = Field(default=None, description="Additional community metadata")
@@ -56,6 +59,8 @@ class GraphAnalytics(BaseModel):
     
     legal_metrics: Optional[Dict[str, Any]] = Field(default=None, description="Legal-specific metrics")
     temporal_analysis: Optional[Dict[str, Any]] = Field(default=None, description="Temporal relationship analysis")
+    analytics_profile: Optional[Dict[str, Any]] = Field(default=None, description="Tier, timing and approximate/skipped metrics")
+    component_analysis: Optional[Dict[str, Any]] = Field(default=None, description="Per-component distance metrics for disconnected graphs")
 
 
 class DeduplicationResult(BaseModel):
@@ -0,0 +1,342 @@
+"""
+Unit Tests for Case-Wide Community Detection
+Tests for keyset-paginated tenant graph loading and hierarchical detection
+"""
+
+import re
+import pytest
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.case_community_job import CaseCommunityJobRunner
+from src.core.community_detector import CommunityDetector
+from src.core.config import GraphRAGSettings
+from src.core.graph_constructor import GraphConstructor
+from src.core.tenant_graph_loader import TenantGraphLoader, TenantGraphTooLargeError
+from tests.test_community_detector import build_clustered_graph
+
+
+class InMemoryGraphTable:
+    """Minimal fluent select over in-memory rows (eq/gt/order/limit)."""
+
+    def __init__(self, rows, calls):
+        self.rows = rows
+        self.calls = calls
+        self.filters = []
+        self.order_column = None
+        self.row_limit = None
+
+    def select(self, columns):
+        return self
+
+    def eq(self, column, value):
+        self.filters.append(lambda row: row.get(column) == value)
+        return self
+
+    def gt(self, column, value):
+        self.filters.append(lambda row: row[column] > value)
+        return self
+
+    def order(self, column):
+        self.order_column = column
+        return self
+
+    def limit(self, count):
+        self.row_limit = count
+        return self
+
+    async def execute(self):
+        self.calls.append(len(self.filters))
+        rows = [row for row in self.rows if all(f(row) for f in self.filters)]
+        if self.order_column:
+            rows.sort(key=lambda row: row[self.order_column])
+        return type("Response", (), {"data": rows[:self.row_limit]})()
+
+
+class InMemoryGraphClient:
+    """Serves graph.nodes / graph.edges rows through the fluent schema API."""
+
+    def __init__(self, nodes, edges):
+        self.tables = {"nodes": nodes, "edges": edges}
+        self.calls = []
+
+    def schema(self, name, admin_operation=False):
+        return self
+
+    def table(self, name):
+        return InMemoryGraphTable(self.tables[name], self.calls)
+
+
+def build_tenant_rows(client_id="client1", case_id="case1"):
+    """Convert the clustered test graph into graph.nodes / graph.edges rows."""
+    entities, relationships = build_clustered_graph(groups=4, group_size=50)
+    nodes = [
+        {"node_id": e["entity_id"], "client_id": client_id, "case_id": case_id}
+        for e in entities
+    ]
+    edges = [
+        {
+            "edge_id": f"edge_{i:06d}",
+            "source_node_id": r["source_entity"],
+            "target_node_id": r["target_entity"],
+            "weight": r["confidence"],
+            "client_id": client_id,
+            "case_id": case_id
+        }
+        for i, r in enumerate(relationships)
+    ]
+    # Rows from another tenant must never be loaded
+    nodes.append({"node_id": "other", "client_id": "client2", "case_id": "case2"})
+    edges.append({
+        "edge_id": "edge_other", "source_node_id": "e0", "target_node_id": "other",
+        "weight": 1.0, "client_id": "client1", "case_id": "case1"
+    })
+    return nodes, edges
+
+
+class TestTenantGraphLoader:
+    """Test streaming tenant graphs into compact arrays."""
+
+    @pytest.mark.asyncio
+    async def test_keyset_pages_load_whole_tenant(self):
+        """Pages chain on the last key and only tenant rows are kept."""
+        nodes, edges = build_tenant_rows()
+        client = InMemoryGraphClient(nodes, edges)
+        loader = TenantGraphLoader(client, page_size=64)
+
+        graph = await loader.load("client1", "case1")
+
+        assert graph.node_count == 200
+        assert graph.edge_count == len(edges) - 1
+        assert graph.skipped_edges == 1
+        assert graph.sources.dtype.name == "int32"
+        assert len(client.calls) > 2
+
+    @pytest.mark.asyncio
+    async def test_node_guard(self):
+        """Loads above the node guard abort instead of growing unbounded."""
+        nodes, edges = build_tenant_rows()
+        loader = TenantGraphLoader(InMemoryGraphClient(nodes, edges), page_size=64, max_nodes=100)
+
+        with pytest.raises(TenantGraphTooLargeError):
+            await loader.load("client1", "case1")
+
+
+class TestCaseHierarchy:
+    """Test hierarchical Leiden on streamed graphs."""
+
+    @pytest.mark.asyncio
+    async def test_detect_hierarchy_from_arrays(self):
+        """Detection on the compact graph keeps every leaf within the size cap."""
+        nodes, edges = build_tenant_rows()
+        graph = await TenantGraphLoader(InMemoryGraphClient(nodes, edges)).load("client1", "case1")
+        detector = CommunityDetector(max_community_size=30, coherence_threshold=0.0)
+
+        hierarchy = detector.detect_hierarchy(graph.to_igraph())
+
+        assert hierarchy
+        assert max(node["level"] for node in hierarchy) >= 1
+        for node in hierarchy:
+            if not node["children"]:
+                assert len(node["members"]) <= detector.max_community_size
+            if node["parent"] is not None:
+                assert node["members"] <= hierarchy[node["parent"]]["members"]
+
+
+class InMemoryCommunityTable(InMemoryGraphTable):
+    """Community tables with insert, delete and LIKE (backslash escapes) support."""
+
+    def __init__(self, rows, calls, fail_inserts=False):
+        super().__init__(rows, calls)
+        self.fail_inserts = fail_inserts
+        self.deleting = False
+        self.inserting = None
+
+    def like(self, column, pattern):
+        regex = "".join(
+            {"%": ".*", "_": "."}.get(token, re.escape(token[-1]))
+            for token in re.findall(r"\\.|.", pattern)
+        )
+        self.filters.append(lambda row: re.fullmatch(regex, row.get(column) or "") is not None)
+        return self
+
+    def is_(self, column, value):
+        self.filters.append(lambda row: row.get(column) is None)
+        return self
+
+    def in_(self, column, values):
+        self.filters.append(lambda row: row.get(column) in values)
+        return self
+
+    def insert(self, data):
+        self.inserting = data
+        return self
+
+    def delete(self):
+        self.deleting = True
+        return self
+
+    async def execute(self):
+        if self.inserting is not None:
+            if self.fail_inserts:
+                raise RuntimeError("insert failed")
+            self.rows.extend(dict(row) for row in self.inserting)
+            return type("Response", (), {"data": self.inserting})()
+        if self.deleting:
+            self.rows[:] = [row for row in self.rows if not all(f(row) for f in self.filters)]
+            return type("Response", (), {"data": []})()
+        return await super().execute()
+
+
+class InMemoryCommunityClient(InMemoryGraphClient):
+    def __init__(self):
+        super().__init__([], [])
+        self.tables.update({"communities": [], "node_communities": []})
+        self.failing_table = None
+
+    def table(self, name):
+        return InMemoryCommunityTable(self.tables[name], self.calls, fail_inserts=name == self.failing_table)
+
+
+class TestCaseCommunityStore:
+    """Test tenant-scoped replacement of stored case hierarchies."""
+
+    HIERARCHY = [
+        {"level": 1, "parent": None, "children": [1], "members": {"n1", "n2"}},
+        {"level": 0, "parent": 0, "children": [], "members": {"n1"}}
+    ]
+
+    def build_runner(self, client):
+        return CaseCommunityJobRunner(GraphRAGSettings(), client, CommunityDetector())
+
+    @pytest.mark.asyncio
+    async def test_replace_only_touches_own_tenant(self):
+        """A rerun replaces the tenant's rows; a tenant whose prefix extends ours is untouched."""
+        client = InMemoryCommunityClient()
+        runner = self.build_runner(client)
+
+        await runner._store_hierarchy(self.HIERARCHY, "abcd", None)
+        other_ids = {row["community_id"] for row in client.tables["communities"]}
+        await runner._store_hierarchy(self.HIERARCHY, "abc", None)
+        info = await runner._store_hierarchy(self.HIERARCHY, "abc", None)
+
+        communities = client.tables["communities"]
+        own = [row for row in communities if row["client_id"] == "abc"]
+        assert info["stale_communities_removed"] == 2
+        assert len(own) == 2
+        assert other_ids <= {row["community_id"] for row in communities}
+        assert len(client.tables["node_communities"]) == 6
+
+    @pytest.mark.asyncio
+    async def test_failed_write_keeps_previous_hierarchy(self):
+        """If membership inserts fail, the previous run's rows survive and partial rows are removed."""
+        client = InMemoryCommunityClient()
+        runner = self.build_runner(client)
+        await runner._store_hierarchy(self.HIERARCHY, "abc", "case1")
+        before = [dict(row) for row in client.tables["communities"]]
+
+        client.failing_table = "node_communities"
+        with pytest.raises(RuntimeError):
+            await runner._store_hierarchy(self.HIERARCHY, "abc", "case1")
+
+        assert client.tables["communities"] == before
+        assert len(client.tables["node_communities"]) == 3
+
+
+class TestIncrementalCommunityStore:
+    """Test replacement of stored communities by incremental runs."""
+
+    def build_constructor(self):
+        client = InMemoryCommunityClient()
+        client.tables["communities"].extend([
+            {"community_id": "comm_000", "parent_community_id": None, "level": 1, "client_id": "c1", "case_id": None},
+            {"community_id": "comm_000_00", "parent_community_id": "comm_000", "level": 0, "client_id": "c1", "case_id": None},
+            {"community_id": "comm_001", "parent_community_id": None, "level": 1, "client_id": "c1", "case_id": None},
+            {"community_id": "comm_001_00", "parent_community_id": "comm_001", "level": 0, "client_id": "c1", "case_id": None},
+            {"community_id": "comm_009", "parent_community_id": None, "level": 0, "client_id": "c2", "case_id": None}
+        ])
+        client.tables["node_communities"].extend([
+            {"node_id": "n1", "community_id": "comm_000"},
+            {"node_id": "n1", "community_id": "comm_000_00"},
+            {"node_id": "n2", "community_id": "comm_001"},
+            {"node_id": "n2", "community_id": "comm_001_00"},
+            {"node_id": "n2", "community_id": "comm_009"},
+            {"node_id": "m1", "community_id": "comm_000"}
+        ])
+        client.tables["nodes"].extend([
+            {"node_id": "n1", "client_id": "c1", "case_id": None},
+            {"node_id": "n2", "client_id": "c1", "case_id": None},
+            {"node_id": "m1", "client_id": "c2", "case_id": None}
+        ])
+        constructor = GraphConstructor(GraphRAGSettings(log_service_url=""))
+        constructor.supabase_client = client
+        return constructor, client
+
+    @pytest.mark.asyncio
+    async def test_rewrite_clears_memberships_and_removed_subtrees(self):
+        """Rewritten communities lose their tenant's memberships; removed roots go with their children."""
+        constructor, client = self.build_constructor()
+
+        removed = await constructor._clear_replaced_communities(["comm_000"], ["comm_001"], "c1", None)
+
+        assert removed == 3
+        assert [row["community_id"] for row in client.tables["communities"]] == ["comm_000", "comm_009"]
+        assert client.tables["node_communities"] == [
+            {"node_id": "n2", "community_id": "comm_009"},
+            {"node_id": "m1", "community_id": "comm_000"}  # another tenant's comm_000 membership
+        ]
+
+    @pytest.mark.asyncio
+    async def test_previous_membership_is_tenant_scoped(self):
+        """Only the tenant's top-level communities seed the warm start."""
+        constructor, _ = self.build_constructor()
+
+        assert await constructor._load_previous_membership(["n1", "n2"], "c1") == {"n1": "comm_000", "n2": "comm_001"}
+        assert await constructor._load_previous_membership(["n1", "n2"], "c2") == {"n2": "comm_009"}
+
+
+class InMemoryStorageClient(InMemoryCommunityClient):
+    """Adds the wrapper upsert/update calls used by GraphConstructor._store_graph_data."""
+
+    def __init__(self):
+        super().__init__()
+        self.tables["document_registry"] = []
+
+    async def upsert(self, table, records, on_conflict=None, admin_operation=False):
+        rows = self.tables[table.split(".", 1)[1]]
+        keys = on_conflict.split(",")
+        for record in records:
+            rows[:] = [row for row in rows if any(row.get(k) != record.get(k) for k in keys)]
+            rows.append(dict(record))
+        return records
+
+    async def update(self, table, data, filters, admin_operation=False):
+        return []
+
+
+class TestConstructedGraphStore:
+    """Test that stored construction output is visible to tenant-scoped readers."""
+
+    @pytest.mark.asyncio
+    async def test_constructed_graph_loads_by_tenant(self):
+        """Nodes and edges carry client_id/case_id columns, so TenantGraphLoader finds them."""
+        client = InMemoryStorageClient()
+        constructor = GraphConstructor(GraphRAGSettings(log_service_url=""))
+        constructor.supabase_client = client
+        entities = [
+            {"entity_id": f"e{i}", "entity_text": f"Entity {i}", "entity_type": "PERSON"} for i in range(3)
+        ]
+        relationships = [
+            {"source_entity": "e0", "target_entity": "e1", "relationship_type": "RELATED", "confidence": 0.8},
+            {"source_entity": "e1", "target_entity": "e2", "relationship_type": "RELATED", "confidence": 0.6}
+        ]
+
+        await constructor._store_graph_data("g1", "doc1", entities, relationships, [], None, "c1", "case1")
+        graph = await TenantGraphLoader(client, page_size=2).load("c1", "case1")
+
+        assert sorted(graph.node_ids) == ["e0", "e1", "e2"]
+        assert graph.edge_count == 2
+        assert (await TenantGraphLoader(client).load("c2")).node_count == 0
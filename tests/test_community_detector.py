@@ -0,0 +1,219 @@
+"""
+Unit Tests for Community Detection
+Tests for hierarchical Leiden community detection
+"""
+
+import pytest
+import random
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.community_detector import CommunityDetector
+from src.core import worker_pool
+
+
+def build_clustered_graph(groups: int = 4, group_size: int = 50, seed: int = 1):
+    """Build entities and relationships for dense, weakly linked clusters."""
+    rng = random.Random(seed)
+    entities = [
+        {"entity_id": f"e{i}", "entity_text": f"Entity {i}", "entity_type": "PARTY"}
+        for i in range(groups * group_size)
+    ]
+    relationships = []
+    for g in range(groups):
+        base = g * group_size
+        for i in range(group_size):
+            for j in range(i + 1, group_size):
+                same_block = i // 10 == j // 10
+                if rng.random() < 0.3 or (same_block and (j - i) % 10 == 0):
+                    relationships.append({
+                        "source_entity": f"e{base + i}",
+                        "target_entity": f"e{base + j}",
+                        "relationship_type": "RELATED",
+                        "confidence": 0.9 if same_block else 0.3
+                    })
+    return entities, relationships
+
+
+class TestHierarchicalCommunities:
+    """Test recursive Leiden refinement of oversized communities."""
+
+    @pytest.mark.asyncio
+    async def test_oversized_communities_are_refined_not_truncated(self):
+        """Oversized communities become parents whose children keep every member."""
+        entities, relationships = build_clustered_graph()
+        detector = CommunityDetector(max_community_size=30, coherence_threshold=0.0)
+
+        communities, metadata = await detector.detect_communities(entities, relationships)
+        by_id = {c["community_id"]: c for c in communities}
+
+        assert metadata["hierarchy_levels"] >= 2
+        for community in communities:
+            if community["child_community_ids"]:
+                children = [by_id[cid] for cid in community["child_community_ids"]]
+                assert all(child["level"] < community["level"] for child in children)
+                assert max(child["level"] for child in children) == community["level"] - 1
+                assert all(child["parent_community_id"] == community["community_id"] for child in children)
+                child_members = set().union(*(set(child["entity_ids"]) for child in children))
+                assert child_members <= set(community["entity_ids"])
+            else:
+                assert community["level"] == 0
+                assert community["entity_count"] <= detector.max_community_size
+
+    @pytest.mark.asyncio
+    async def test_hierarchical_levels_grouped(self):
+        """Hierarchical output groups a single detection run by level."""
+        entities, relationships = build_clustered_graph()
+        detector = CommunityDetector(max_community_size=30, coherence_threshold=0.0)
+
+        levels = await detector.calculate_hierarchical_communities(entities, relationships)
+
+        assert [level["level"] for level in levels] == sorted(level["level"] for level in levels)
+        assert levels[0]["level"] == 0
+        assert all(not c["child_community_ids"] for c in levels[0]["communities"])
+        assert all(c["parent_community_id"] is None for c in levels[-1]["communities"])
+        assert detector.resolution == 1.0
+
+
+class TestIncrementalCommunities:
+    """Test warm-started community detection."""
+
+    @pytest.mark.asyncio
+    async def test_new_node_only_changes_its_community(self):
+        """Adding one node keeps ids stable and reports only its community as changed."""
+        entities, relationships = build_clustered_graph(groups=4, group_size=20)
+        detector = CommunityDetector(max_community_size=30, coherence_threshold=0.0)
+        communities, _ = await detector.detect_communities(entities, relationships)
+        previous = {
+            entity_id: c["community_id"]
+            for c in communities if c["parent_community_id"] is None
+            for entity_id in c["entity_ids"]
+        }
+
+        entities.append({"entity_id": "new1", "entity_text": "New", "entity_type": "PARTY"})
+        relationships.extend(
+            {"source_entity": "new1", "target_entity": f"e{i}", "confidence": 0.9}
+            for i in range(5)
+        )
+        updated, metadata = await detector.detect_communities_incremental(
+            entities, relationships, previous
+        )
+
+        home = previous["e0"]
+        assert metadata["incremental"] is True
+        assert metadata["changed_community_ids"] == [home]
+        assert len(metadata["unchanged_community_ids"]) == len(communities) - 1
+        assert "new1" in next(c for c in updated if c["community_id"] == home)["entity_ids"]
+
+
+class TestCitationHubs:
+    """Test citation hub representation of shared citations."""
+
+    def test_citation_edges_are_linear_in_entities(self):
+        """A citing document adds one hub edge per entity instead of a clique."""
+        entities = [
+            {"entity_id": f"e{i}", "entity_text": f"Entity {i}", "document_ids": ["doc1"]}
+            for i in range(200)
+        ]
+        citations = [{"document_id": "doc1", "citation_text": "554 U.S. 570"}]
+        detector = CommunityDetector()
+
+        graph = detector._build_networkx_graph(entities, [], citations)
+
+        assert graph.number_of_edges() == 200
+        assert detector._graph_metrics(graph)["citation_hubs"] == 1
+        assert detector._graph_metrics(graph)["nodes"] == 200
+
+    @pytest.mark.asyncio
+    async def test_hubs_excluded_from_communities(self):
+        """Hub nodes never appear as community members."""
+        entities, relationships = build_clustered_graph(groups=2, group_size=20)
+        for entity in entities:
+            entity["document_ids"] = ["doc1"]
+        citations = [{"document_id": "doc1", "citation_text": "554 U.S. 570"}]
+        detector = CommunityDetector(coherence_threshold=0.0)
+
+        communities, _ = await detector.detect_communities(entities, relationships, citations)
+
+        members = set().union(*(set(c["entity_ids"]) for c in communities))
+        assert members
+        assert not any(m.startswith(CommunityDetector.CITATION_HUB_PREFIX) for m in members)
+
+
+class TestResolutionSweep:
+    """Test parallel multi-resolution Leiden sweeps."""
+
+    @pytest.mark.asyncio
+    async def test_sweep_matches_single_run_and_keeps_state(self):
+        """Each level matches a single run at that resolution; detector state is untouched."""
+        entities, relationships = build_clustered_graph(groups=4, group_size=20)
+        detector = CommunityDetector(max_community_size=30, coherence_threshold=0.0)
+
+        levels = await detector.sweep_resolutions(
+            entities, relationships, resolutions=[2.0, 0.5, 1.0], max_workers=2
+        )
+        single, _ = await detector.detect_communities(entities, relationships)
+
+        assert [level["resolution"] for level in levels] == [0.5, 1.0, 2.0]
+        assert sum(level["is_best"] for level in levels) == 1
+        assert detector.resolution == 1.0
+        at_default = next(level for level in levels if level["resolution"] == 1.0)
+        assert sorted(map(sorted, (c["entity_ids"] for c in at_default["communities"]))) == \
+            sorted(map(sorted, (c["entity_ids"] for c in single)))
+
+    @pytest.mark.asyncio
+    async def test_best_only(self):
+        """best_only returns the single highest-scoring level."""
+        entities, relationships = build_clustered_graph(groups=3, group_size=20)
+        detector = CommunityDetector(coherence_threshold=0.0)
+
+        levels = await detector.sweep_resolutions(entities, relationships, best_only=True)
+        pool = worker_pool._process_pool
+        all_levels = await detector.sweep_resolutions(entities, relationships)
+
+        assert len(levels) == 1
+        assert levels[0]["score"] == max(level["score"] for level in all_levels)
+        assert pool is not None and worker_pool._process_pool is pool  # one long-lived pool, not one per sweep
+
+
+class TestCommunityStatistics:
+    """Test single-pass community statistics."""
+
+    def test_coherence_matches_subgraph_definition(self):
+        """Segment-sum coherence equals internal weight over possible edges per subgraph."""
+        entities, relationships = build_clustered_graph(groups=3, group_size=20)
+        detector = CommunityDetector()
+        nx_graph = detector._build_networkx_graph(entities, relationships, None)
+        ig_graph = detector._convert_to_igraph(nx_graph)
+        communities = [
+            {f"e{i}" for i in range(0, 20)},
+            {f"e{i}" for i in range(20, 40)},
+            {f"e{i}" for i in range(40, 45)}
+        ]
+
+        stats = detector._community_statistics(communities, ig_graph)
+
+        for position, community in enumerate(communities):
+            subgraph = nx_graph.subgraph(community)
+            possible = len(community) * (len(community) - 1) / 2
+            expected = sum(d["weight"] for _, _, d in subgraph.edges(data=True)) / possible
+            assert stats["internal_edges"][position] == subgraph.number_of_edges()
+            assert stats["coherence"][position] == pytest.approx(expected)
+
+    @pytest.mark.asyncio
+    async def test_community_metadata_from_statistics(self):
+        """Type histograms, counts and central entities come from the precomputed arrays."""
+        entities, relationships = build_clustered_graph(groups=3, group_size=20)
+        for entity in entities[:10]:
+            entity["entity_type"] = "COURT"
+        detector = CommunityDetector(coherence_threshold=0.0)
+
+        communities, _ = await detector.detect_communities(entities, relationships)
+
+        for community in communities:
+            assert sum(community["metadata"]["entity_types"].values()) == community["entity_count"]
+            assert set(community["central_entities"]) <= set(community["entity_ids"])
+            assert community["metadata"]["avg_confidence"] == pytest.approx(0.95)
@@ -0,0 +1,132 @@
+"""
+Unit Tests for Embedding Client
+Tests for micro-batched, cached query embeddings
+"""
+
+import asyncio
+import json
+import pytest
+import sys
+import os
+
+import httpx
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.clients.embedding_client import (
+    BatchingEmbedder, EmbeddingCache, EmbeddingProvider, HttpEmbeddingProvider, LocalEmbeddingProvider
+)
+
+
+class TestEmbeddingProvider:
+    """Test the provider interface."""
+
+    def test_provider_must_implement_embed_batch(self):
+        """A provider without embed_batch cannot be instantiated."""
+        class IncompleteProvider(EmbeddingProvider):
+            model = "incomplete"
+            dimensions = 8
+
+        with pytest.raises(TypeError):
+            IncompleteProvider()
+
+
+class TestBatchingEmbedder:
+    """Test batching, deduplication and caching."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_share_one_call(self):
+        """Concurrent cache misses are coalesced into a single provider call."""
+        provider = LocalEmbeddingProvider(dimensions=8)
+        embedder = BatchingEmbedder(provider, batch_window_ms=5)
+
+        texts = [f"query {i}" for i in range(10)] + ["query  1", "query 2"]
+        vectors = await asyncio.gather(*[embedder.embed(text) for text in texts])
+
+        assert provider.calls == 1
+        assert vectors[10] == vectors[1]  # whitespace-normalized duplicate
+        assert vectors[0] == (await provider.embed_batch(["query 0"]))[0]
+
+        await embedder.embed("query 3")
+        assert embedder.provider_calls == 1
+        assert embedder.cache.hits == 1
+
+    @pytest.mark.asyncio
+    async def test_large_batches_are_split(self):
+        """Requests beyond max_batch_size are flushed in several provider calls."""
+        provider = LocalEmbeddingProvider(dimensions=4)
+        embedder = BatchingEmbedder(provider, max_batch_size=4)
+
+        vectors = await embedder.embed_many([f"text {i}" for i in range(10)])
+
+        assert len(vectors) == 10
+        assert provider.calls == 3
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_cancel_others(self):
+        """A caller cancelled while waiting leaves the shared embedding to the other waiters."""
+        provider = LocalEmbeddingProvider(dimensions=4)
+        embedder = BatchingEmbedder(provider, batch_window_ms=20)
+
+        first = asyncio.create_task(embedder.embed("shared query"))
+        second = asyncio.create_task(embedder.embed("shared query"))
+        await asyncio.sleep(0)
+        first.cancel()
+
+        assert await second == (await provider.embed_batch(["shared query"]))[0]
+        assert first.cancelled()
+        assert embedder.cache.get(embedder.cache_key("shared query")) is not None
+
+    @pytest.mark.asyncio
+    async def test_provider_errors_reach_every_waiter(self):
+        """A failed batch raises for its callers and nothing is cached."""
+        class FailingProvider(LocalEmbeddingProvider):
+            async def embed_batch(self, texts):
+                raise RuntimeError("embeddings service unavailable")
+
+        embedder = BatchingEmbedder(FailingProvider(dimensions=4))
+
+        results = await asyncio.gather(embedder.embed("a"), embedder.embed("b"), return_exceptions=True)
+
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert len(embedder.cache) == 0
+
+    def test_cache_evicts_lru_and_expired(self):
+        """The cache keeps at most max_size entries and drops expired ones."""
+        cache = EmbeddingCache(max_size=2, ttl=60)
+        cache.put(("a", "m", 4), [1.0])
+        cache.put(("b", "m", 4), [2.0])
+        cache.get(("a", "m", 4))
+        cache.put(("c", "m", 4), [3.0])
+
+        assert cache.get(("b", "m", 4)) is None
+        assert cache.get(("a", "m", 4)) == [1.0]
+
+        cache.ttl = -1
+        cache.put(("d", "m", 4), [4.0])
+        assert cache.get(("d", "m", 4)) is None
+
+
+class TestHttpEmbeddingProvider:
+    """Test the OpenAI-compatible request format."""
+
+    @pytest.mark.asyncio
+    async def test_posts_batch_and_orders_by_index(self):
+        """One request carries all inputs; vectors are returned in input order."""
+        requests = []
+
+        def handler(request):
+            body = json.loads(request.content)
+            requests.append(body)
+            data = [{"index": i, "embedding": [float(i)]} for i in range(len(body["input"]))]
+            return httpx.Response(200, json={"data": list(reversed(data))})
+
+        client = httpx.AsyncClient(base_url="http://embeddings", transport=httpx.MockTransport(handler))
+        provider = HttpEmbeddingProvider(model="test-model", dimensions=1, client=client)
+
+        vectors = await provider.embed_batch(["x", "y", "z"])
+        await provider.close()
+
+        assert vectors == [[0.0], [1.0], [2.0]]
+        assert requests == [{"model": "test-model", "input": ["x", "y", "z"], "dimensions": 1}]
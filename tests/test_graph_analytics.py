@@ -0,0 +1,298 @@
+"""
+Unit Tests for Graph Analytics
+Tests for analytics tiers, approximations and time budgets
+"""
+
+import pytest
+import random
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.graph_analytics import GraphAnalytics
+
+
+def build_graph_data(nodes: int = 60, extra_edges: int = 90, seed: int = 7):
+    """Build a connected random graph (a path plus random chords) as entities/relationships."""
+    rng = random.Random(seed)
+    entities = [
+        {"entity_id": f"n{i}", "entity_text": f"Node {i}", "entity_type": "PARTY", "confidence": 0.9}
+        for i in range(nodes)
+    ]
+    pairs = {(i, i + 1) for i in range(nodes - 1)}
+    while len(pairs) < nodes - 1 + extra_edges:
+        a, b = sorted(rng.sample(range(nodes), 2))
+        pairs.add((a, b))
+    relationships = [
+        {"source_entity": f"n{a}", "target_entity": f"n{b}", "relationship_type": "RELATED", "confidence": 0.8}
+        for a, b in sorted(pairs)
+    ]
+    return entities, relationships
+
+
+class TestAnalyticsTiers:
+    """Test tiered analytics and approximations."""
+
+    @pytest.mark.asyncio
+    async def test_minimal_tier_skips_expensive_metrics(self):
+        """Minimal tier keeps counts, degree and PageRank only."""
+        entities, relationships = build_graph_data()
+        analytics = await GraphAnalytics(tier="minimal").analyze_graph(entities, relationships, [])
+
+        centrality = analytics["centrality_analysis"]
+        assert set(centrality) == {"degree_centrality", "pagerank"}
+        assert analytics["basic_metrics"]["diameter"] == -1
+        assert "node_connectivity" not in analytics["connectivity_analysis"]
+        assert analytics["analytics_profile"]["tier"] == "minimal"
+
+    @pytest.mark.asyncio
+    async def test_exact_below_threshold(self):
+        """Small graphs get exact metrics and nothing is flagged approximate."""
+        entities, relationships = build_graph_data()
+        analytics = await GraphAnalytics(tier="full").analyze_graph(entities, relationships, [])
+
+        assert analytics["analytics_profile"]["approximate_metrics"] == []
+        assert "betweenness_centrality" in analytics["centrality_analysis"]
+        assert "closeness_centrality" in analytics["centrality_analysis"]
+        assert "node_connectivity" in analytics["connectivity_analysis"]
+        assert analytics["basic_metrics"]["diameter"] > 0
+
+    @pytest.mark.asyncio
+    async def test_approximations_above_threshold(self):
+        """Large graphs use sampled betweenness and double-sweep diameter, and say so."""
+        entities, relationships = build_graph_data()
+        exact = await GraphAnalytics().analyze_graph(entities, relationships, [])
+        approx = await GraphAnalytics(approximation_threshold=10, betweenness_samples=20).analyze_graph(
+            entities, relationships, []
+        )
+
+        profile = approx["analytics_profile"]
+        assert {"betweenness_centrality", "diameter", "radius", "pagerank"} <= set(profile["approximate_metrics"])
+        assert "closeness_centrality" in profile["skipped_metrics"]
+        assert approx["basic_metrics"]["diameter"] <= exact["basic_metrics"]["diameter"]
+        assert approx["basic_metrics"]["radius"] >= exact["basic_metrics"]["radius"]
+
+    @pytest.mark.asyncio
+    async def test_exhausted_budget_skips_remaining_metrics(self):
+        """With no time left, expensive metrics are skipped and reported."""
+        entities, relationships = build_graph_data()
+        analytics = await GraphAnalytics(tier="full").analyze_graph(
+            entities, relationships, [], time_budget_seconds=0.0
+        )
+
+        skipped = analytics["analytics_profile"]["skipped_metrics"]
+        assert "diameter" in skipped
+        assert "betweenness_centrality" in skipped
+        assert "degree_centrality" in analytics["centrality_analysis"]
+
+
+class TestIGraphBackend:
+    """Test parity of the igraph/SciPy backend with NetworkX."""
+
+    @staticmethod
+    def assert_values_close(expected, actual, tolerance):
+        assert set(expected) == set(actual)
+        for node_id, value in expected.items():
+            assert actual[node_id] == pytest.approx(value, abs=tolerance)
+
+    @pytest.mark.asyncio
+    async def test_parity_with_networkx(self):
+        """Both backends return the same keys and matching values."""
+        entities, relationships = build_graph_data(nodes=80, extra_edges=60)
+        # Pendant nodes create bridges and articulation points
+        entities += [{"entity_id": f"leaf{i}", "entity_type": "COURT"} for i in range(5)]
+        relationships += [
+            {"source_entity": f"n{i}", "target_entity": f"leaf{i}", "confidence": 0.5} for i in range(5)
+        ]
+        communities = [
+            {"entity_ids": [e["entity_id"] for e in entities[:40]], "entity_count": 40},
+            {"entity_ids": [e["entity_id"] for e in entities[40:]], "entity_count": len(entities) - 40}
+        ]
+
+        reference = await GraphAnalytics(tier="full").analyze_graph(entities, relationships, communities)
+        vectorized = await GraphAnalytics(tier="full", backend="igraph").analyze_graph(
+            entities, relationships, communities
+        )
+
+        for section in ("basic_metrics", "centrality_analysis", "connectivity_analysis"):
+            assert set(reference[section]) == set(vectorized[section])
+        for key in ("nodes", "edges", "components", "diameter", "radius"):
+            assert reference["basic_metrics"][key] == vectorized["basic_metrics"][key]
+        for key in ("density", "clustering_coefficient", "transitivity"):
+            assert vectorized["basic_metrics"][key] == pytest.approx(reference["basic_metrics"][key])
+
+        for metric in ("degree_centrality", "betweenness_centrality", "closeness_centrality"):
+            self.assert_values_close(
+                reference["centrality_analysis"][metric]["values"],
+                vectorized["centrality_analysis"][metric]["values"],
+                1e-9
+            )
+        for metric in ("pagerank", "eigenvector_centrality"):
+            self.assert_values_close(
+                reference["centrality_analysis"][metric]["values"],
+                vectorized["centrality_analysis"][metric]["values"],
+                1e-6
+            )
+
+        ref_conn, vec_conn = reference["connectivity_analysis"], vectorized["connectivity_analysis"]
+        for key in ("num_components", "component_sizes", "num_bridges", "num_articulation_points",
+                    "node_connectivity", "edge_connectivity"):
+            assert ref_conn[key] == vec_conn[key]
+        assert vec_conn["degree_assortativity"] == pytest.approx(ref_conn["degree_assortativity"])
+        assert vectorized["community_analysis"]["modularity"] == pytest.approx(
+            reference["community_analysis"]["modularity"]
+        )
+        assert vectorized["legal_metrics"]["court_network_density"] == pytest.approx(
+            reference["legal_metrics"]["court_network_density"]
+        )
+
+    @pytest.mark.asyncio
+    async def test_sampled_betweenness_parity(self):
+        """Sampled betweenness draws the same pivots and scaling as NetworkX."""
+        entities, relationships = build_graph_data()
+        kwargs = {"approximation_threshold": 10, "betweenness_samples": 15}
+        reference = await GraphAnalytics(**kwargs).analyze_graph(entities, relationships, [])
+        vectorized = await GraphAnalytics(backend="igraph", **kwargs).analyze_graph(entities, relationships, [])
+
+        self.assert_values_close(
+            reference["centrality_analysis"]["betweenness_centrality"]["values"],
+            vectorized["centrality_analysis"]["betweenness_centrality"]["values"],
+            1e-9
+        )
+        assert reference["basic_metrics"]["diameter"] == vectorized["basic_metrics"]["diameter"]
+
+
+class TestMetricsCache:
+    """Test memoization of metrics by graph fingerprint."""
+
+    @pytest.mark.asyncio
+    async def test_importance_scores_reuse_analysis(self):
+        """Importance scores after analyze_graph are served from the cache."""
+        entities, relationships = build_graph_data()
+        engine = GraphAnalytics()
+        await engine.analyze_graph(entities, relationships, [])
+        cached = dict(engine.metrics_cache[engine.fingerprint])
+
+        scores = await engine.calculate_importance_scores(entities)
+
+        assert set(scores) == {e["entity_id"] for e in entities}
+        assert engine.metrics_cache[engine.fingerprint] == cached
+
+    @pytest.mark.asyncio
+    async def test_importance_scores_keep_analysis_profile(self):
+        """Importance scores leave the last analysis profile untouched."""
+        entities, relationships = build_graph_data()
+        engine = GraphAnalytics(tier="full")
+        await engine.analyze_graph(entities, relationships, [])
+        profile = engine.profile
+
+        await engine.calculate_importance_scores(entities)
+
+        assert engine.profile is profile
+        assert engine.profile["tier"] == "full"
+        assert engine.profile["cache_hits"] == 0
+
+    @pytest.mark.asyncio
+    async def test_fingerprint_tracks_structure(self):
+        """Same structure in any order shares a fingerprint; weight changes do not."""
+        entities, relationships = build_graph_data()
+        engine = GraphAnalytics()
+        first = await engine.analyze_graph(entities, relationships, [])
+        shuffled = await engine.analyze_graph(entities[::-1], relationships[::-1], [])
+
+        assert shuffled["analytics_profile"]["graph_fingerprint"] == first["analytics_profile"]["graph_fingerprint"]
+        assert shuffled["analytics_profile"]["cache_hits"] > 0
+        assert shuffled["centrality_analysis"]["pagerank"]["values"] == first["centrality_analysis"]["pagerank"]["values"]
+
+        reweighted = [dict(relationships[0], confidence=0.1)] + relationships[1:]
+        changed = await engine.analyze_graph(entities, reweighted, [])
+        assert changed["analytics_profile"]["graph_fingerprint"] != first["analytics_profile"]["graph_fingerprint"]
+        assert changed["analytics_profile"]["cache_hits"] == 0
+
+    @pytest.mark.asyncio
+    async def test_invalidate_and_bound(self):
+        """Invalidation forces recomputation and the cache keeps a bounded number of graphs."""
+        entities, relationships = build_graph_data()
+        engine = GraphAnalytics(max_cached_graphs=2)
+        await engine.analyze_graph(entities, relationships, [])
+        fingerprint = engine.fingerprint
+
+        engine.invalidate_cache(fingerprint)
+        again = await engine.analyze_graph(entities, relationships, [])
+        assert again["analytics_profile"]["cache_hits"] == 0
+
+        for seed in (1, 2, 3):
+            await engine.analyze_graph(*build_graph_data(seed=seed), [])
+        assert len(engine.metrics_cache) == 2
+        assert fingerprint not in engine.metrics_cache
+
+        engine.invalidate_cache()
+        assert not engine.metrics_cache
+
+
+class TestComponentAnalytics:
+    """Test component-decomposed metrics on disconnected graphs."""
+
+    @staticmethod
+    def build_disconnected_data(components: int = 6):
+        entities, relationships = [], []
+        for c in range(components):
+            part_entities, part_relationships = build_graph_data(nodes=10 + 5 * c, extra_edges=8, seed=c)
+            for e in part_entities:
+                entities.append(dict(e, entity_id=f"c{c}_{e['entity_id']}"))
+            for r in part_relationships:
+                relationships.append(dict(
+                    r, source_entity=f"c{c}_{r['source_entity']}", target_entity=f"c{c}_{r['target_entity']}"
+                ))
+        entities += [{"entity_id": f"isolated{i}", "entity_type": "COURT"} for i in range(3)]
+        return entities, relationships
+
+    @pytest.mark.asyncio
+    async def test_matches_networkx_on_disconnected_graph(self):
+        """Per-component diameter and rescaled closeness match whole-graph NetworkX."""
+        import networkx as nx
+
+        entities, relationships = self.build_disconnected_data()
+        graph = nx.Graph()
+        graph.add_nodes_from(e["entity_id"] for e in entities)
+        graph.add_edges_from((r["source_entity"], r["target_entity"]) for r in relationships)
+
+        for backend in ("networkx", "igraph"):
+            analytics = await GraphAnalytics(backend=backend).analyze_graph(entities, relationships, [])
+
+            components = [graph.subgraph(c) for c in nx.connected_components(graph) if len(c) > 1]
+            assert analytics["basic_metrics"]["diameter"] == max(nx.diameter(c) for c in components)
+            assert analytics["basic_metrics"]["radius"] == min(nx.radius(c) for c in components)
+
+            closeness = analytics["centrality_analysis"]["closeness_centrality"]["values"]
+            for node_id, value in nx.closeness_centrality(graph).items():
+                assert closeness[node_id] == pytest.approx(value, abs=1e-9)
+
+            summary = analytics["component_analysis"]
+            assert summary["non_trivial_components"] == 6
+            assert summary["isolated_nodes"] == 3
+            assert summary["exact"]
+
+    @pytest.mark.asyncio
+    async def test_threshold_applies_per_component(self):
+        """Components under the threshold stay exact even when the whole graph is above it."""
+        entities, relationships = self.build_disconnected_data()
+        analytics = await GraphAnalytics(approximation_threshold=40).analyze_graph(entities, relationships, [])
+
+        assert "diameter" not in analytics["analytics_profile"]["approximate_metrics"]
+        assert "closeness_centrality" in analytics["centrality_analysis"]
+
+    @pytest.mark.asyncio
+    async def test_parallel_matches_sequential(self):
+        """Worker-process component analysis returns the same aggregate."""
+        entities, relationships = self.build_disconnected_data()
+        sequential = await GraphAnalytics().analyze_graph(entities, relationships, [])
+        parallel = await GraphAnalytics(component_parallel_threshold=1, max_workers=2).analyze_graph(
+            entities, relationships, []
+        )
+
+        assert parallel["component_analysis"]["parallel"]
+        for key in ("max_diameter", "size_weighted_diameter", "size_weighted_radius"):
+            assert parallel["component_analysis"][key] == sequential["component_analysis"][key]
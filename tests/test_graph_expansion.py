@@ -0,0 +1,190 @@
+"""
+Unit Tests for Graph Expansion
+Tests for k-hop neighbour scoring over cached tenant adjacency
+"""
+
+import asyncio
+import numpy as np
+import pytest
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.clients.embedding_client import LocalEmbeddingProvider
+from src.core.config import GraphRAGSettings
+from src.core.graph_expansion import AdjacencyCache, TenantAdjacency, expand_neighbourhood, subgraph_edges
+from src.core.tenant_graph_loader import TenantGraph
+from src.core.vector_search_service import SearchQuery, SearchScope, SearchType, VectorSearchService
+from tests.test_case_community_job import InMemoryGraphClient, InMemoryGraphTable, build_tenant_rows
+from tests.test_vector_search_service import InMemoryRpcClient
+
+
+NODES = ["node_0", "a", "b", "c", "other"]
+EDGES = [("node_0", "a", 0.9), ("node_0", "b", 0.1), ("a", "c", 1.0), ("a", "a", 5.0)]
+RANK_SCORES = {"b": 1.0}
+
+
+def build_adjacency():
+    index = {node_id: i for i, node_id in enumerate(NODES)}
+    graph = TenantGraph(
+        client_id="c1",
+        case_id=None,
+        node_ids=NODES,
+        sources=np.array([index[s] for s, _, _ in EDGES], dtype=np.int32),
+        targets=np.array([index[t] for _, t, _ in EDGES], dtype=np.int32),
+        weights=np.array([w for _, _, w in EDGES], dtype=np.float32)
+    )
+    return TenantAdjacency.from_tenant_graph(graph, RANK_SCORES)
+
+
+class InMemoryNodeTable(InMemoryGraphTable):
+    def in_(self, column, values):
+        self.filters.append(lambda row: row.get(column) in values)
+        return self
+
+
+class InMemoryTenantGraphClient(InMemoryGraphClient):
+    def table(self, name):
+        return InMemoryNodeTable(self.tables[name], self.calls)
+
+
+class InMemoryGraphRpcClient(InMemoryRpcClient):
+    """Search RPCs plus fluent graph.nodes / graph.edges reads."""
+
+    def __init__(self, nodes, edges):
+        super().__init__()
+        self.graph = InMemoryTenantGraphClient(nodes, edges)
+
+    def schema(self, name, admin_operation=False):
+        return self.graph
+
+
+class TestExpandNeighbourhood:
+    """Test neighbour scoring."""
+
+    def test_one_and_two_hop_scores(self):
+        """Scores follow edge-weight shares, decay per hop and the rank_score boost."""
+        adjacency = build_adjacency()
+
+        one_hop = expand_neighbourhood(adjacency, {"node_0": 0.95}, hops=1)
+        assert [n["node_id"] for n in one_hop] == ["a", "b"]
+        assert one_hop[0]["score"] == pytest.approx(0.95 * 0.9)
+        assert one_hop[1]["score"] == pytest.approx(0.95 * 0.1 * 1.5)
+        assert one_hop[0]["seed_edge_weight"] == pytest.approx(0.9)
+
+        two_hop = expand_neighbourhood(adjacency, {"node_0": 0.95}, hops=2, max_neighbors=2)
+        assert [n["node_id"] for n in two_hop] == ["a", "c"]
+        assert two_hop[1]["hops"] == 2
+        assert two_hop[1]["score"] == pytest.approx(0.95 * 0.9 * (1.0 / 1.9) * 0.5)
+
+    def test_unknown_seeds_and_subgraph_edges(self):
+        """Seeds outside the graph expand to nothing; self-loops are dropped from the edge list."""
+        adjacency = build_adjacency()
+
+        assert expand_neighbourhood(adjacency, {"missing": 1.0}, hops=2) == []
+        edges = subgraph_edges(adjacency, ["node_0", "a", "c"])
+        assert [(e["source_node_id"], e["target_node_id"]) for e in edges] == [("a", "c"), ("node_0", "a")]
+        assert adjacency.edge_count == 3
+
+
+class TestAdjacencyCache:
+    """Test lazy loading and invalidation."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_gets_share_one_load(self):
+        """Concurrent callers share a load; invalidate forces a reload."""
+        nodes, edges = build_tenant_rows()
+        client = InMemoryGraphClient(nodes, edges)
+        cache = AdjacencyCache(client, page_size=100)
+
+        first, second = await asyncio.gather(cache.get("client1"), cache.get("client1"))
+        assert first is second
+        assert first.node_count == 200
+        assert cache.loads == 1
+
+        assert await cache.get("client1") is first
+        cache.invalidate("client1")
+        assert await cache.get("client1") is not first
+        assert cache.loads == 2
+
+
+def build_expansion_service():
+    nodes = [
+        {"node_id": node_id, "client_id": "c1", "name": node_id.upper(), "type": "PERSON",
+         "description": f"{node_id} description", "rank_score": RANK_SCORES.get(node_id)}
+        for node_id in NODES
+    ]
+    edges = [
+        {"edge_id": f"e{i}", "source_node_id": s, "target_node_id": t, "weight": w, "client_id": "c1"}
+        for i, (s, t, w) in enumerate(EDGES)
+    ]
+    client = InMemoryGraphRpcClient(nodes, edges)
+    service = VectorSearchService(GraphRAGSettings(), embedding_provider=LocalEmbeddingProvider(dimensions=8))
+    service.supabase_client = client
+    service.adjacency_cache.supabase_client = client
+    return service, client
+
+
+class TestSearchExpansion:
+    """Test expansion through VectorSearchService.search."""
+
+    @pytest.mark.asyncio
+    async def test_search_returns_expanded_context(self):
+        """Top node hits are expanded; neighbour details come from one batched query."""
+        service, client = build_expansion_service()
+        await service.adjacency_cache.get("c1")
+
+        result = await service.search(
+            SearchQuery(query_text="q", client_id="c1", search_scope=SearchScope.NODES, limit=1, expand_hops=2)
+        )
+
+        context = result.expanded_context
+        assert context["seed_node_ids"] == ["node_0"]
+        assert [n["node_id"] for n in context["entities"]] == ["a", "c", "b"]
+        assert context["entities"][0]["name"] == "A"
+        assert ("node_0", "a") in {(e["source_node_id"], e["target_node_id"]) for e in context["relationships"]}
+        assert result.search_metadata["expand_hops"] == 2
+
+        graph_reads = len(client.graph.calls)
+        await service.search(SearchQuery(query_text="q2", client_id="c1", search_scope=SearchScope.NODES, limit=1, expand_hops=1))
+        assert len(client.graph.calls) == graph_reads + 1  # node details only; adjacency is cached
+
+        plain = await service.search(SearchQuery(query_text="q3", client_id="c1", search_scope=SearchScope.NODES, limit=1))
+        assert plain.expanded_context is None
+
+    @pytest.mark.asyncio
+    async def test_cold_tenant_is_not_expanded_until_loaded(self):
+        """A cold search does not wait for the adjacency load and is not cached; a repeat is expanded."""
+        service, _ = build_expansion_service()
+        query = SearchQuery(query_text="q", client_id="c1", search_scope=SearchScope.NODES, limit=1, expand_hops=1)
+
+        cold = await service.search(query)
+        assert cold.expanded_context is None
+        assert cold.search_metadata["expand_hops"] == 0 and cold.search_metadata["expansion_skipped"]
+
+        await asyncio.gather(*service.adjacency_cache._loading.values())
+        warm = await service.search(query)
+        assert warm.search_metadata["expand_hops"] == 1 and "expansion_skipped" not in warm.search_metadata
+        assert warm.expanded_context["seed_node_ids"] == ["node_0"]
+        assert service.adjacency_cache.loads == 1
+
+    @pytest.mark.asyncio
+    async def test_local_search_seeds_from_entity_hits(self):
+        """LOCAL rows carry node ids, so the community filter and expansion both work."""
+        service, client = build_expansion_service()
+        await service.adjacency_cache.get("c1")
+
+        result = await service.search(
+            SearchQuery(query_text="q", client_id="c1", search_type=SearchType.LOCAL,
+                        filters={"community_id": "comm_7"}, limit=1)
+        )
+
+        name, params = client.calls[-1]
+        assert name == "search_local_entities"
+        assert params["filter_community_id"] == "comm_7" and "entity_id" not in params
+        assert result.results[0].metadata["node_id"] == "node_0"
+        assert result.results[0].metadata["community_id"] == "comm_7"
+        assert result.expanded_context["seed_node_ids"] == ["node_0"]
+        assert [n["node_id"] for n in result.expanded_context["entities"]] == ["a", "b"]
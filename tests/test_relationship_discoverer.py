@@ -0,0 +1,359 @@
+"""
+Unit Tests for Relationship Discoverer
+Tests for relationship discovery strategies and cross-document links
+"""
+
+import pytest
+import random
+import sys
+import os
+import threading
+import time
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.relationship_discoverer import (
+    DISCOVERY_STRATEGIES, DiscoveryStrategy, RelationshipDiscoverer, check_strategy_deadline, register_discovery_strategy
+)
+from src.models.requests import GraphOptions
+
+
+def build_entity(entity_id, text, doc_ids=("doc1",), confidence=0.8, entity_type="PERSON"):
+    return {
+        "entity_id": entity_id,
+        "entity_text": text,
+        "entity_type": entity_type,
+        "confidence": confidence,
+        "document_ids": list(doc_ids)
+    }
+
+
+class TestCitationDiscovery:
+    """Test indexed citation matching and fan-out capping."""
+
+    @pytest.mark.asyncio
+    async def test_matches_overlapping_mentions(self):
+        """Every entity whose text occurs in the citation is found, including nested and prefix texts."""
+        discoverer = RelationshipDiscoverer(max_citation_fanout=None)
+        entities = [
+            build_entity("e1", "Acme"),
+            build_entity("e2", "Acme Corp"),
+            build_entity("e3", "Corp"),
+            build_entity("e4", "Smith"),
+            build_entity("e5", "Unrelated"),
+            build_entity("e6", "Acme", doc_ids=("doc2",))
+        ]
+        citations = [{"document_id": "doc1", "citation_text": "Smith v. ACME CORP, 123 F.3d 456", "citation_type": "case"}]
+
+        relationships = await discoverer._discover_citation_relationships(entities, citations, set())
+
+        sources = {rel["source_entity"] for rel in relationships}
+        assert sources == {"e1", "e2", "e3", "e4"}
+        assert {rel["target_entity"] for rel in relationships if rel["source_entity"] == "e1"} == {"e2", "e3", "e4", "e5"}
+        assert all(rel["document_id"] == "doc1" for rel in relationships)
+        assert len({(rel["source_entity"], rel["target_entity"]) for rel in relationships}) == len(relationships)
+
+    @pytest.mark.asyncio
+    async def test_fanout_is_capped(self):
+        """Large documents link each cited entity to co-cited entities first, then the most confident."""
+        discoverer = RelationshipDiscoverer(max_citation_fanout=3)
+        entities = [build_entity(f"e{i}", f"party {i:03d}", confidence=i / 500) for i in range(400)]
+        citations = [
+            {"document_id": "doc1", "citation_text": "party 001 and party 002 cited", "citation_type": "case"}
+        ]
+
+        relationships = await discoverer._discover_citation_relationships(entities, citations, set())
+
+        targets = [rel["target_entity"] for rel in relationships if rel["source_entity"] == "e1"]
+        assert targets == ["e2", "e399", "e398"]
+        assert len(relationships) == 6
+
+
+class TestCooccurrenceDiscovery:
+    """Test sparse co-occurrence accumulation."""
+
+    @pytest.mark.asyncio
+    async def test_counts_match_bruteforce(self):
+        """Pair counts, thresholding and ordering match a direct count over chunks."""
+        rng = random.Random(7)
+        entities = [build_entity(f"e{i}", f"name{i:02d}x") for i in range(40)]
+        chunks = [
+            {"content": " ".join(f"Name{rng.randrange(40):02d}X" for _ in range(6))}
+            for _ in range(200)
+        ]
+        discoverer = RelationshipDiscoverer()
+        discoverer.COOCCURRENCE_FLUSH_PAIRS = 50  # exercise merging
+
+        relationships = await discoverer._discover_cooccurrence_relationships(entities, chunks, set())
+
+        expected = []
+        for i in range(40):
+            for j in range(i + 1, 40):
+                count = sum(
+                    1 for chunk in chunks
+                    if f"name{i:02d}x" in chunk["content"].lower() and f"name{j:02d}x" in chunk["content"].lower()
+                )
+                if count >= 3:
+                    expected.append((f"e{i}", f"e{j}", count))
+        assert expected
+        assert [(r["source_entity"], r["target_entity"], r["cooccurrence_count"]) for r in relationships] == expected
+
+
+def reference_relationship_type(discoverer, entity1, entity2, context):
+    """Pattern scan as originally written: substring checks per pattern and pair."""
+    pair = (entity1.get("entity_type", ""), entity2.get("entity_type", ""))
+    if pair in discoverer.INFERENCE_RULES:
+        return discoverer.INFERENCE_RULES[pair]
+    if pair[::-1] in discoverer.INFERENCE_RULES:
+        return discoverer.INFERENCE_RULES[pair[::-1]]
+    entity1_text = entity1.get("entity_text", "").lower()
+    entity2_text = entity2.get("entity_text", "").lower()
+    for rel_type, patterns in discoverer.LEGAL_RELATIONSHIP_PATTERNS.items():
+        for pattern in patterns:
+            if pattern in context and entity1_text in context and entity2_text in context:
+                pos1 = context.find(entity1_text)
+                pos2 = context.find(entity2_text)
+                if min(pos1, pos2) < context.find(pattern) < max(pos1, pos2):
+                    return rel_type
+    return None
+
+
+class TestInferenceDiscovery:
+    """Test the compiled pattern engine against the original scan."""
+
+    def test_pattern_engine_parity(self):
+        """Inferred relationship types are identical to the per-pattern substring scan."""
+        rng = random.Random(13)
+        discoverer = RelationshipDiscoverer()
+        patterns = [p for group in discoverer.LEGAL_RELATIONSHIP_PATTERNS.values() for p in group]
+        names = ["alpha", "beta", "gamma", "delta", "al", ""]
+        types = ["PERSON", "PARTY", "ATTORNEY", "ORGANIZATION", "CASE", "COURT"]
+
+        compared = 0
+        for _ in range(300):
+            words = [rng.choice(patterns + names + ["the", "and", "owners", "subsidiary"]) for _ in range(12)]
+            context = " ".join(words).lower()
+            context_index = discoverer._index_context(context)
+            for _ in range(10):
+                entity1 = {"entity_text": rng.choice(names), "entity_type": rng.choice(types)}
+                entity2 = {"entity_text": rng.choice(names + ["missing"]), "entity_type": rng.choice(types)}
+                expected = reference_relationship_type(discoverer, entity1, entity2, context)
+                assert discoverer._infer_relationship_type(entity1, entity2, context, context_index) == expected
+                assert discoverer._infer_relationship_type(entity1, entity2, context) == expected
+                compared += expected is not None
+        assert compared
+
+
+class TestCrossDocumentLinks:
+    """Test inverted-index cross-document link detection."""
+
+    @pytest.mark.asyncio
+    async def test_links_match_pairwise_intersection(self):
+        """Only document pairs sharing entities are linked, with the pairwise counts and link types."""
+        rng = random.Random(21)
+        types = ["PERSON", "PARTY", "COURT", "CASE", "CONTRACT", "ORGANIZATION"]
+        entities = [
+            build_entity(
+                f"e{i}", f"name {i}",
+                doc_ids=rng.sample([f"doc{d}" for d in range(30)], rng.randint(1, 3)),
+                entity_type=rng.choice(types)
+            )
+            for i in range(60)
+        ]
+        discoverer = RelationshipDiscoverer()
+
+        links = await discoverer.identify_cross_document_links([], entities, [])
+
+        doc_entities = {}
+        for entity in entities:
+            for doc_id in entity["document_ids"]:
+                doc_entities.setdefault(doc_id, set()).add(entity["entity_id"])
+        type_of = {entity["entity_id"]: entity["entity_type"] for entity in entities}
+        doc_ids = list(doc_entities)
+        expected = []
+        for i, doc1 in enumerate(doc_ids):
+            for doc2 in doc_ids[i + 1:]:
+                shared = doc_entities[doc1] & doc_entities[doc2]
+                if shared:
+                    shared_types = {type_of[e] for e in shared}
+                    if "CASE" in shared_types:
+                        link_type = "CITATION_LINK"
+                    elif "PARTY" in shared_types:
+                        link_type = "SHARED_PARTY"
+                    elif "COURT" in shared_types:
+                        link_type = "SAME_JURISDICTION"
+                    elif "CONTRACT" in shared_types:
+                        link_type = "RELATED_CONTRACT"
+                    else:
+                        link_type = "GENERAL_REFERENCE"
+                    strength = len(shared) / min(len(doc_entities[doc1]), len(doc_entities[doc2]))
+                    expected.append((doc1, doc2, link_type, shared, strength))
+
+        assert expected
+        assert [
+            (link["source_document_id"], link["target_document_id"], link["link_type"],
+             set(link["shared_entities"]), link["strength"])
+            for link in links
+        ] == expected
+
+
+def build_discovery_inputs():
+    entities = [
+        build_entity("e1", "Alpha Corp", doc_ids=("doc1", "doc2"), entity_type="ORGANIZATION"),
+        build_entity("e2", "Beta", doc_ids=("doc1", "doc2"), entity_type="PERSON"),
+        build_entity("e3", "Gamma", doc_ids=("doc1",), entity_type="PERSON"),
+    ]
+    for entity in entities:
+        entity["source_chunk_id"] = "c1"
+    citations = [{"document_id": "doc1", "citation_text": "Beta v. Alpha Corp", "citation_type": "case"}]
+    chunks = [
+        {"chunk_id": f"c{i}", "content": "Beta works for Alpha Corp with Gamma"} for i in range(1, 4)
+    ]
+    return entities, citations, chunks
+
+
+class TestDiscoveryStrategies:
+    """Test the concurrent strategy pipeline."""
+
+    @pytest.mark.asyncio
+    async def test_merge_matches_sequential_run(self):
+        """Concurrent strategies merge to the relationships a sequential run produces."""
+        entities, citations, chunks = build_discovery_inputs()
+        discoverer = RelationshipDiscoverer()
+
+        relationships, metadata = await discoverer.discover_relationships(entities, [], citations, chunks)
+
+        index = set()
+        expected = []
+        expected += await discoverer._discover_citation_relationships(entities, citations, index)
+        expected += await discoverer._discover_cross_document_relationships(entities, index)
+        expected += await discoverer._infer_relationships_from_context(entities, chunks, index)
+        expected += await discoverer._discover_cooccurrence_relationships(entities, chunks, index)
+
+        fields = ("relationship_id", "source_entity", "target_entity", "relationship_type", "confidence")
+        assert [tuple(r[f] for f in fields) for r in relationships] == [tuple(r[f] for f in fields) for r in expected]
+        assert all(m["status"] == "completed" for m in metadata["strategy_metrics"].values())
+        assert metadata["discovery_breakdown"]["cooccurrence"] > 0
+
+    @pytest.mark.asyncio
+    async def test_strategy_options(self):
+        """Disabled strategies are skipped, edge caps apply, and unknown names are rejected by GraphOptions."""
+        entities, citations, chunks = build_discovery_inputs()
+        discoverer = RelationshipDiscoverer()
+
+        relationships, metadata = await discoverer.discover_relationships(
+            entities, [], citations, chunks,
+            strategy_options={"cooccurrence": {"enabled": False}, "citation": {"max_edges": 1}}
+        )
+
+        metrics = metadata["strategy_metrics"]
+        assert metrics["cooccurrence"]["status"] == "disabled"
+        assert metrics["citation"]["accepted"] == 1 and metrics["citation"]["capped"]
+        assert not any(r["discovery_method"] == "cooccurrence" for r in relationships)
+
+        with pytest.raises(ValueError):
+            GraphOptions(relationship_strategies={"bogus": {}})
+        assert GraphOptions(relationship_strategies={"citation": {"max_edges": 1}}).relationship_strategies
+
+    @pytest.mark.asyncio
+    async def test_timed_out_strategy_stops_its_worker(self):
+        """A strategy past its budget is reported as timed out and stops at its next deadline check."""
+        stopped = threading.Event()
+
+        async def slow_strategy(discoverer, context):
+            try:
+                while True:
+                    check_strategy_deadline()
+                    time.sleep(0.005)
+            finally:
+                stopped.set()
+
+        register_discovery_strategy(DiscoveryStrategy("slow", "rel_slow", slow_strategy))
+        try:
+            entities, citations, chunks = build_discovery_inputs()
+            _, metadata = await RelationshipDiscoverer().discover_relationships(
+                entities, [], citations, chunks, strategy_options={"slow": {"time_budget_seconds": 0.05}}
+            )
+        finally:
+            DISCOVERY_STRATEGIES.pop("slow")
+
+        assert metadata["strategy_metrics"]["slow"]["status"] == "timed_out"
+        assert metadata["strategy_metrics"]["citation"]["status"] == "completed"
+        assert stopped.wait(1.0)
+
+
+class TestEdgePruning:
+    """Test per-node top-k relationship pruning."""
+
+    @pytest.mark.parametrize("rule", ["either", "both"])
+    def test_prune_matches_reference(self, rule):
+        """Edges survive within the top-k (by type priority and confidence) of either or both endpoints."""
+        rng = random.Random(5)
+        discoverer = RelationshipDiscoverer(edge_prune_rule=rule)
+        types = ["REPRESENTS", "CITED_TOGETHER", "FREQUENTLY_COOCCURS", "CROSS_DOCUMENT_ASSOCIATION"]
+        relationships = [
+            {
+                "source_entity": "hub" if rng.random() < 0.5 else f"n{rng.randrange(15)}",
+                "target_entity": f"n{rng.randrange(15)}",
+                "relationship_type": rng.choice(types),
+                "confidence": round(rng.random(), 2)
+            }
+            for _ in range(200)
+        ]
+
+        pruned = discoverer.prune_edges_per_node(relationships, 5)
+
+        def sort_key(idx):
+            rel = relationships[idx]
+            return (discoverer.RELATIONSHIP_TYPE_PRIORITY.get(rel["relationship_type"], 0), -rel["confidence"], idx)
+
+        top = {}
+        for idx, rel in enumerate(relationships):
+            for node in (rel["source_entity"], rel["target_entity"]):
+                if idx not in top.setdefault(node, []):
+                    top[node].append(idx)
+        top = {node: set(sorted(ids, key=sort_key)[:5]) for node, ids in top.items()}
+        combine = any if rule == "either" else all
+        expected = [
+            rel for idx, rel in enumerate(relationships)
+            if combine(idx in top[node] for node in (rel["source_entity"], rel["target_entity"]))
+        ]
+
+        assert pruned == expected
+        if rule == "both":
+            degree = {}
+            for rel in pruned:
+                for node in {rel["source_entity"], rel["target_entity"]}:
+                    degree[node] = degree.get(node, 0) + 1
+            assert max(degree.values()) <= 5
+        assert discoverer.prune_edges_per_node(relationships, None) is relationships
+
+    def test_hub_is_capped_by_default(self):
+        """A star hub keeps at most k edges under the default rule."""
+        relationships = [
+            {"source_entity": "hub", "target_entity": f"n{i}", "relationship_type": "REPRESENTS",
+             "confidence": round(0.5 + i / 1000, 3)}
+            for i in range(200)
+        ]
+
+        pruned = RelationshipDiscoverer().prune_edges_per_node(relationships, 50)
+
+        assert sum(rel["source_entity"] == "hub" for rel in pruned) <= 50
+        assert {rel["target_entity"] for rel in pruned} == {f"n{i}" for i in range(150, 200)}
+
+    def test_either_rule_keeps_leaf_on_hub(self):
+        """A leaf whose only edge ranks low for a busy hub is not isolated under the either rule."""
+        relationships = [
+            {"source_entity": "hub", "target_entity": f"n{i}", "relationship_type": "REPRESENTS", "confidence": 0.9}
+            for i in range(5)
+        ] + [{"source_entity": "hub", "target_entity": "leaf", "relationship_type": "REPRESENTS", "confidence": 0.1}]
+
+        either = RelationshipDiscoverer(edge_prune_rule="either").prune_edges_per_node(relationships, 3)
+        both = RelationshipDiscoverer().prune_edges_per_node(relationships, 3)
+
+        assert "leaf" in {rel["target_entity"] for rel in either}
+        assert len(either) == 6
+        assert [rel["target_entity"] for rel in both] == ["n0", "n1", "n2"]
+        with pytest.raises(ValueError):
+            RelationshipDiscoverer(edge_prune_rule="sometimes")
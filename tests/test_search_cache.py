@@ -0,0 +1,67 @@
+"""
+Unit Tests for Search Result Cache
+Tests for query hashing, LRU/TTL eviction, tenant quotas and invalidation
+"""
+
+import pytest
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.search_cache import SearchResultCache
+from src.core.vector_search_service import SearchQuery, SearchScope
+
+
+class TestSearchResultCache:
+    """Test cache keys, eviction and invalidation."""
+
+    def test_key_covers_full_query(self):
+        """Queries differing beyond the first 50 characters or in any parameter get distinct keys."""
+        base = SearchQuery(query_text="x" * 60, client_id="c1")
+        variants = [
+            SearchQuery(query_text="x" * 60 + "y", client_id="c1"),
+            SearchQuery(query_text="x" * 60, client_id="c1", limit=20),
+            SearchQuery(query_text="x" * 60, client_id="c1", similarity_threshold=0.5),
+            SearchQuery(query_text="x" * 60, client_id="c1", search_scope=SearchScope.ALL),
+            SearchQuery(query_text="x" * 60, client_id="c1", alpha=0.7),
+            SearchQuery(query_text="x" * 60, client_id="c2"),
+        ]
+        keys = {SearchResultCache.build_key(query) for query in variants}
+
+        assert len(keys) == len(variants)
+        assert SearchResultCache.build_key(base) not in keys
+        assert SearchResultCache.build_key(base) == SearchResultCache.build_key(SearchQuery(query_text="x" * 60, client_id="c1"))
+
+    def test_lru_ttl_and_counters(self):
+        """Least recently used entries go first, expired entries miss, and hits/misses are counted."""
+        cache = SearchResultCache(max_entries=2, ttl=60)
+        cache.put("a", "c1", {"v": 1})
+        cache.put("b", "c1", {"v": 2})
+        assert cache.get("a") == {"v": 1}
+        cache.put("c", "c1", {"v": 3})
+
+        assert cache.get("b") is None
+        assert cache.get("c") == {"v": 3}
+        assert cache.stats["hits"] == 2 and cache.stats["misses"] == 1
+
+        cache.ttl = -1
+        cache.put("d", "c1", {"v": 4})
+        assert cache.get("d") is None
+        assert "d" not in cache._entries
+
+    def test_tenant_quota_and_invalidation(self):
+        """A tenant over its quota evicts its own oldest entries; invalidation removes only that tenant."""
+        cache = SearchResultCache(max_entries=100, ttl=60, tenant_quota_bytes=250)
+        for i in range(5):
+            cache.put(f"c1-{i}", "c1", {"payload": "x" * 80})
+        cache.put("c2-0", "c2", {"payload": "y"})
+
+        assert cache._tenant_bytes["c1"] <= 250
+        assert cache.get("c1-4") is not None and cache.get("c1-0") is None
+
+        assert cache.invalidate_client("c1") > 0
+        assert cache.get("c1-4") is None
+        assert cache.get("c2-0") == {"payload": "y"}
+        assert cache.stats["tenants"] == 1
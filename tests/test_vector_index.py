@@ -0,0 +1,199 @@
+"""
+Unit Tests for In-Process Vector Index
+Tests for exact / IVF search, write freshness and lazy tenant hydration
+"""
+
+import asyncio
+import numpy as np
+import pytest
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.clients.embedding_client import LocalEmbeddingProvider
+from src.core.config import GraphRAGSettings
+from src.core.vector_index import TenantVectorIndex, VectorIndexManager
+from src.core.vector_search_service import VectorSearchService
+from tests.test_case_community_job import InMemoryGraphClient
+from tests.test_vector_search_service import InMemoryRpcClient
+
+
+def random_vectors(count, dimensions=32, seed=0):
+    vectors = np.random.default_rng(seed).standard_normal((count, dimensions)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def chunk_rows(vectors, client_id="c1"):
+    return [
+        {
+            "id": f"uuid_{i}",
+            "chunk_id": f"chunk_{i:05d}",
+            "document_id": "doc1",
+            "chunk_index": i,
+            "content": f"chunk {i}",
+            "client_id": client_id,
+            "embeddings": "[" + ",".join(f"{x:.6f}" for x in vector) + "]",
+            "created_at": "2026-01-01T00:00:00"
+        }
+        for i, vector in enumerate(vectors)
+    ]
+
+
+class TestTenantVectorIndex:
+    """Test search accuracy and in-place maintenance."""
+
+    def test_exact_search_matches_brute_force(self):
+        """Below the IVF threshold results equal a full cosine scan."""
+        vectors = random_vectors(500)
+        index = TenantVectorIndex(32, ivf_min_rows=10000)
+        index.upsert([f"k{i}" for i in range(500)], vectors * 3.0, [{"key": f"k{i}"} for i in range(500)])
+
+        query = random_vectors(1, seed=1)[0]
+        expected = np.argsort(-(vectors @ query))[:5]
+        results = index.search(query, limit=5)
+
+        assert not index.is_ivf
+        assert [row["key"] for row in results] == [f"k{i}" for i in expected]
+        assert results[0]["similarity"] == pytest.approx(float(vectors[expected[0]] @ query), abs=1e-5)
+        assert all(row["similarity"] >= 0.2 for row in index.search(query, limit=50, threshold=0.2))
+
+    def test_ivf_search_recalls_nearest(self):
+        """IVF lists still find a stored vector from a slightly perturbed query."""
+        vectors = random_vectors(4000)
+        index = TenantVectorIndex(32, ivf_min_rows=2000, nprobe=8)
+        index.upsert([f"k{i}" for i in range(4000)], vectors, [{"key": f"k{i}"} for i in range(4000)])
+
+        noise = random_vectors(200, seed=2) * 0.05
+        found = sum(
+            index.search(vectors[i] + noise[i], limit=1)[0]["key"] == f"k{i}"
+            for i in range(200)
+        )
+
+        assert index.is_ivf
+        assert found >= 190
+
+    def test_upserts_and_removes_stay_consistent(self):
+        """Replaced vectors move, removed keys disappear, and compaction keeps lookups right."""
+        vectors = random_vectors(2000)
+        index = TenantVectorIndex(32, ivf_min_rows=1000)
+        index.upsert([f"k{i}" for i in range(2000)], vectors, [{"key": f"k{i}"} for i in range(2000)])
+
+        index.upsert(["k0"], vectors[1:2], [{"key": "k0", "version": 2}])
+        assert {row["key"] for row in index.search(vectors[1], limit=2)} == {"k0", "k1"}
+
+        index.remove([f"k{i}" for i in range(1, 1200)])
+        assert len(index) == 801
+        assert index.search(vectors[1], limit=1)[0]["key"] == "k0"
+        assert index.search(vectors[1500], limit=1)[0]["key"] == "k1500"
+        assert "k5" not in index
+
+
+class TestVectorIndexManager:
+    """Test lazy hydration, write hooks and RPC fallback."""
+
+    @pytest.mark.asyncio
+    async def test_first_search_falls_back_then_serves(self):
+        """A cold tenant returns None while its index loads; later searches are served in-process."""
+        vectors = random_vectors(50)
+        client = InMemoryGraphClient([], [])
+        client.tables["chunks"] = chunk_rows(vectors) + chunk_rows(random_vectors(5, seed=3), client_id="c2")
+        manager = VectorIndexManager(client, dimensions=32, page_size=20)
+
+        assert await manager.search("c1", "chunks", vectors[7].tolist(), 3, 0.5) is None
+        index = await manager.warm("c1", "chunks")
+        assert len(index) == 50
+
+        results = await manager.search("c1", "chunks", vectors[7].tolist(), 3, 0.5)
+        assert results[0]["id"] == "uuid_7"
+        assert results[0]["document_id"] == "doc1"
+        assert "embeddings" not in results[0]
+        assert manager.stats["hits"] == 1 and manager.stats["fallbacks"] == 1
+
+    @pytest.mark.asyncio
+    async def test_writes_reach_loaded_index(self):
+        """Node upserts and deletes are applied without a reload."""
+        vectors = random_vectors(3)
+        client = InMemoryGraphClient([], [])
+        manager = VectorIndexManager(client, dimensions=32)
+        await manager.warm("c1", "nodes")
+
+        manager.upsert("c1", "nodes", [
+            {"node_id": "n1", "name": "Alice", "embedding": vectors[0].tolist()},
+            {"node_id": "n2", "name": "No embedding"}
+        ])
+        results = await manager.search("c1", "nodes", vectors[0].tolist(), 5, 0.9)
+        assert [row["node_id"] for row in results] == ["n1"]
+
+        manager.remove("c1", "nodes", ["n1"])
+        assert await manager.search("c1", "nodes", vectors[0].tolist(), 5, 0.0) == []
+
+    @pytest.mark.asyncio
+    async def test_service_serves_chunks_from_index(self):
+        """With the index enabled a warm tenant's chunk search makes no RPC call."""
+        settings = GraphRAGSettings(enable_vector_index=True, embedding_dimensions=8)
+        service = VectorSearchService(settings, embedding_provider=LocalEmbeddingProvider(dimensions=8))
+        service.supabase_client = InMemoryRpcClient()
+
+        query_vector = np.asarray(await service.embedder.embed("breach"), dtype=np.float32)
+        vectors = np.vstack([query_vector, random_vectors(9, dimensions=8)])
+        service.vector_index.supabase_client = InMemoryGraphClient([], [])
+        service.vector_index.supabase_client.tables["chunks"] = chunk_rows(vectors)
+
+        cold = await service.semantic_search_chunks("c1", "breach", limit=2, similarity_threshold=0.5)
+        assert len(service.supabase_client.calls) == 1
+        assert cold[0].id == "chunk_0"
+
+        await service.vector_index.warm("c1", "chunks")
+        warm = await service.semantic_search_chunks("c1", "breach", limit=2, similarity_threshold=0.5)
+        assert len(service.supabase_client.calls) == 1
+        assert warm[0].id == "uuid_0"
+        assert warm[0].score == pytest.approx(1.0, abs=1e-5)
+
+    @pytest.mark.asyncio
+    async def test_rebuild_runs_off_the_write_path(self):
+        """Deletes past the compaction threshold are compacted in the background, keeping later writes."""
+        vectors = random_vectors(1600)
+        client = InMemoryGraphClient([], [])
+        manager = VectorIndexManager(client, dimensions=32, ivf_min_rows=1000)
+        await manager.warm("c1", "nodes")
+        manager.upsert("c1", "nodes", [
+            {"node_id": f"n{i}", "embedding": vectors[i].tolist()} for i in range(1200)
+        ])
+        await asyncio.gather(*manager._rebuilding.values())
+        index = manager._indexes[("c1", "nodes")]
+        assert index.is_ivf
+
+        manager.remove("c1", "nodes", [f"n{i}" for i in range(600)])
+        assert manager._indexes[("c1", "nodes")] is index and index.needs_rebuild()
+        assert manager.stats["rebuilding"] == 1
+        manager.upsert("c1", "nodes", [{"node_id": "n1500", "embedding": vectors[1500].tolist()}])
+        manager.remove("c1", "nodes", ["n700"])
+
+        await asyncio.gather(*manager._rebuilding.values())
+        rebuilt = manager._indexes[("c1", "nodes")]
+        assert rebuilt is not index and not rebuilt.needs_rebuild()
+        assert len(rebuilt) == 600 and "n1500" in rebuilt and "n700" not in rebuilt
+        assert rebuilt.is_ivf
+        assert (await manager.search("c1", "nodes", vectors[900].tolist(), 1, 0.0))[0]["node_id"] == "n900"
+
+    @pytest.mark.asyncio
+    async def test_memory_budget_evicts_least_recent(self):
+        """Indexes beyond max_bytes are dropped oldest first; a tenant over the whole budget stays on the RPC."""
+        client = InMemoryGraphClient([], [])
+        client.tables["chunks"] = chunk_rows(random_vectors(100), "c1") + chunk_rows(random_vectors(100), "c2")
+        one_index = TenantVectorIndex(32)
+        one_index.upsert([f"k{i}" for i in range(100)], random_vectors(100), [{}] * 100)
+        manager = VectorIndexManager(client, dimensions=32, max_bytes=int(one_index.nbytes * 1.5))
+
+        await manager.warm("c1", "chunks")
+        await manager.warm("c2", "chunks")
+        assert list(manager._indexes) == [("c2", "chunks")]
+        assert manager.stats["bytes"] <= manager.max_bytes
+
+        client.tables["chunks"] += chunk_rows(random_vectors(100), "c3")
+        manager.max_bytes = 1000
+        assert await manager.warm("c3", "chunks") is None
+        assert await manager.search("c3", "chunks", random_vectors(1)[0].tolist(), 1, 0.0) is None
+        assert ("c3", "chunks") not in manager._loading
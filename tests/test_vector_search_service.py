@@ -0,0 +1,216 @@
+"""
+Unit Tests for Vector Search Service
+Tests for result caching and search routing with an in-memory RPC backend
+"""
+
+import asyncio
+import pytest
+import sys
+import os
+from datetime import datetime
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.clients.embedding_client import LocalEmbeddingProvider
+from src.core.config import GraphRAGSettings
+from src.core.vector_search_service import SearchQuery, SearchScope, VectorSearchService
+
+
+class InMemoryRpcClient:
+    """Records RPC calls and answers search functions with fixed rows."""
+
+    def __init__(self, failing=()):
+        self.calls = []
+        self.failing = set(failing)
+        self.active = 0
+        self.max_active = 0
+
+    async def execute_function(self, name, params):
+        self.calls.append((name, params))
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(0)
+        finally:
+            self.active -= 1
+        if name in self.failing:
+            raise RuntimeError(f"{name} unavailable")
+        if name == "search_similar_nodes":
+            return [
+                {
+                    "node_id": f"node_{i}",
+                    "name": f"Entity {i}",
+                    "type": "PERSON",
+                    "description": f"entity {i}",
+                    "rank_score": 0.5,
+                    "similarity": 0.95 - i * 0.1
+                }
+                for i in range(params["match_count"])
+            ]
+        if name == "search_local_entities":
+            return [
+                {
+                    "node_id": f"node_{i}",
+                    "name": f"Entity {i}",
+                    "type": "PERSON",
+                    "description": f"entity {i}",
+                    "community_id": params["filter_community_id"] or "community_0",
+                    "relationship_count": 2,
+                    "similarity": 0.9 - i * 0.1
+                }
+                for i in range(params["match_count"])
+            ]
+        if name == "search_similar_communities":
+            return [
+                {
+                    "community_id": f"community_{i}",
+                    "title": f"Community {i}",
+                    "summary": f"community {i} summary",
+                    "level": 0,
+                    "size": 5,
+                    "similarity": 0.8 - i * 0.1
+                }
+                for i in range(params["match_count"])
+            ]
+        if name == "search_similar_chunks":
+            return [
+                {
+                    "id": f"chunk_{i}",
+                    "content": f"chunk {i} for {params['filter_client_id']}",
+                    "similarity": 0.9 - i * 0.1,
+                    "document_id": "doc1",
+                    "chunk_index": i,
+                    "created_at": datetime(2026, 1, 1).isoformat()
+                }
+                for i in range(params["match_count"])
+            ]
+        return []
+
+
+def build_service(**client_kwargs):
+    service = VectorSearchService(GraphRAGSettings(), embedding_provider=LocalEmbeddingProvider(dimensions=8))
+    service.supabase_client = InMemoryRpcClient(**client_kwargs)
+    return service
+
+
+class TestSearchResultCaching:
+    """Test result cache behaviour through VectorSearchService.search."""
+
+    @pytest.mark.asyncio
+    async def test_repeat_is_cached_until_invalidated(self):
+        """A repeated query is served from cache; invalidating the tenant forces a new RPC."""
+        service = build_service()
+        query = SearchQuery(query_text="breach of contract", client_id="c1", limit=3)
+
+        first = await service.search(query)
+        second = await service.search(SearchQuery(query_text="breach of contract", client_id="c1", limit=3))
+        assert second is first
+        assert len(service.supabase_client.calls) == 1
+
+        await service.search(SearchQuery(query_text="breach of contract", client_id="c1", limit=4))
+        assert len(service.supabase_client.calls) == 2
+
+        service.invalidate_client("c1")
+        await service.search(query)
+        assert len(service.supabase_client.calls) == 3
+        assert service.performance_metrics["result_cache"]["hits"] == 1
+
+
+class TestSearchScopes:
+    """Test scope routing and multi-scope fusion."""
+
+    @pytest.mark.asyncio
+    async def test_single_scopes_call_their_rpc(self):
+        """Nodes and communities scopes query their own similarity functions."""
+        service = build_service()
+
+        nodes = await service.search(SearchQuery(query_text="q", client_id="c1", search_scope=SearchScope.NODES, limit=2))
+        communities = await service.search(
+            SearchQuery(query_text="q", client_id="c1", search_scope=SearchScope.COMMUNITIES, limit=2)
+        )
+
+        assert [call[0] for call in service.supabase_client.calls] == ["search_similar_nodes", "search_similar_communities"]
+        assert nodes.results[0].id == "node_0"
+        assert nodes.results[0].metadata["entity_type"] == "PERSON"
+        assert communities.results[0].content == "community 0 summary"
+
+    @pytest.mark.asyncio
+    async def test_all_scope_fuses_concurrent_searches(self):
+        """ALL runs the three scopes concurrently and orders by weighted reciprocal rank."""
+        service = build_service()
+        query = SearchQuery(
+            query_text="q", client_id="c1", search_scope=SearchScope.ALL, limit=4,
+            scope_weights={"nodes": 1.0, "chunks": 1.02, "communities": 0.5}
+        )
+
+        result = await service.search(query)
+
+        assert service.supabase_client.max_active == 3
+        assert [r.id for r in result.results] == ["chunk_0", "chunk_1", "node_0", "chunk_2"]
+        assert result.results[0].metadata["scope"] == "chunks"
+        assert result.results[0].metadata["similarity"] == pytest.approx(0.9)
+        assert result.results[0].metadata["rrf_score"] == pytest.approx(1.02 / 61)
+        assert result.results[0].score == pytest.approx(1.02 / 2.52)
+
+    @pytest.mark.asyncio
+    async def test_all_scope_tolerates_a_failed_scope(self):
+        """A failing scope is left out; zero-weight scopes are not queried."""
+        service = build_service(failing={"search_similar_communities"})
+        query = SearchQuery(
+            query_text="q", client_id="c1", search_scope=SearchScope.ALL, limit=3,
+            scope_weights={"chunks": 0.0}
+        )
+
+        result = await service.search(query)
+
+        assert {call[0] for call in service.supabase_client.calls} == {"search_similar_nodes", "search_similar_communities"}
+        assert [r.metadata["scope"] for r in result.results] == ["nodes"] * 3
+        assert result.results[0].score == pytest.approx(1.0)
+
+    @pytest.mark.asyncio
+    async def test_all_zero_weights_return_nothing(self):
+        """With every scope weighted 0 no search runs and no results come back."""
+        service = build_service()
+        query = SearchQuery(
+            query_text="q", client_id="c1", search_scope=SearchScope.ALL,
+            scope_weights={"nodes": 0.0, "chunks": 0.0, "communities": 0.0}
+        )
+
+        assert await service.multi_scope_search(query) == []
+        assert service.supabase_client.calls == []
+
+
+class TestSearchMany:
+    """Test batched search execution."""
+
+    @pytest.mark.asyncio
+    async def test_batch_shares_embedding_and_dedupes(self):
+        """Distinct texts are embedded in one call, duplicates run once, concurrency is bounded."""
+        service = build_service()
+        queries = [SearchQuery(query_text=f"question {i}", client_id="c1", limit=2) for i in range(6)]
+        queries.append(SearchQuery(query_text="question 0", client_id="c1", limit=2))
+
+        outcomes = await service.search_many(queries, max_concurrency=2)
+
+        assert service.embedder.provider.calls == 1
+        assert len(service.supabase_client.calls) == 6
+        assert service.supabase_client.max_active <= 2
+        assert [outcome.query for outcome in outcomes] == [query.query_text for query in queries]
+        assert outcomes[6] is outcomes[0]
+
+    @pytest.mark.asyncio
+    async def test_failures_are_reported_per_query(self):
+        """A failing query returns its exception while the others succeed."""
+        service = build_service(failing={"search_similar_nodes"})
+        queries = [
+            SearchQuery(query_text="a", client_id="c1", limit=2),
+            SearchQuery(query_text="b", client_id="c1", search_scope=SearchScope.NODES, limit=2),
+            SearchQuery(query_text="c", client_id="c2", limit=2)
+        ]
+
+        outcomes = await service.search_many(queries)
+
+        assert isinstance(outcomes[1], RuntimeError)
+        assert [r.id for r in outcomes[0].results] == ["chunk_0", "chunk_1"]
+        assert outcomes[2].results[0].content == "chunk 0 for c2"